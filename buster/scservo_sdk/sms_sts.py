@@ -5,6 +5,7 @@ from .scservo_def import *
 from .protocol_packet_handler import *
 from .group_sync_read import *
 from .group_sync_write import *
+from .register_codec import RegisterCodec
 
 # define baud rate
 SMS_STS_1M = 0
@@ -61,6 +62,36 @@ SMS_STS_MOVING = 66
 SMS_STS_PRESENT_CURRENT_L = 69
 SMS_STS_PRESENT_CURRENT_H = 70
 
+# registers used by the helpers below, compiled once for O(1) encode/decode
+SMS_STS_REGISTERS = [
+    {"name": "Model", "addr": SMS_STS_MODEL_L, "size": 2, "sign_bit": None},
+    {"name": "ID", "addr": SMS_STS_ID, "size": 1},
+    {"name": "Baudrate", "addr": SMS_STS_BAUD_RATE, "size": 1},
+    {"name": "Min Angle Limit", "addr": SMS_STS_MIN_ANGLE_LIMIT_L, "size": 2},
+    {"name": "Max Angle Limit", "addr": SMS_STS_MAX_ANGLE_LIMIT_L, "size": 2},
+    {"name": "Max Temperature Limit", "addr": SMS_STS_MAX_TEMP_LIMIT, "size": 1, "unit": "C"},
+    {"name": "Max Voltage Limit", "addr": SMS_STS_MAX_INPUT_VOLTAGE, "size": 1, "scale": 0.1, "unit": "V"},
+    {"name": "Min Voltage Limit", "addr": SMS_STS_MIN_INPUT_VOLTAGE, "size": 1, "scale": 0.1, "unit": "V"},
+    {"name": "CW Dead Zone", "addr": SMS_STS_CW_DEAD, "size": 1},
+    {"name": "CCW Dead Zone", "addr": SMS_STS_CCW_DEAD, "size": 1},
+    {"name": "Offset", "addr": SMS_STS_OFS_L, "size": 2, "sign_bit": 11},
+    {"name": "Mode", "addr": SMS_STS_MODE, "size": 1},
+    {"name": "Torque Enable", "addr": SMS_STS_TORQUE_ENABLE, "size": 1},
+    {"name": "Acceleration", "addr": SMS_STS_ACC, "size": 1},
+    {"name": "Goal Position", "addr": SMS_STS_GOAL_POSITION_L, "size": 2},
+    {"name": "Goal Time", "addr": SMS_STS_GOAL_TIME_L, "size": 2, "sign_bit": None},
+    {"name": "Goal Speed", "addr": SMS_STS_GOAL_SPEED_L, "size": 2},
+    {"name": "Lock", "addr": SMS_STS_LOCK, "size": 1},
+    {"name": "Present Position", "addr": SMS_STS_PRESENT_POSITION_L, "size": 2},
+    {"name": "Present Speed", "addr": SMS_STS_PRESENT_SPEED_L, "size": 2},
+    {"name": "Present Load", "addr": SMS_STS_PRESENT_LOAD_L, "size": 2, "sign_bit": 10, "scale": 0.1, "unit": "%"},
+    {"name": "Present Voltage", "addr": SMS_STS_PRESENT_VOLTAGE, "size": 1, "scale": 0.1, "unit": "V"},
+    {"name": "Present Temperature", "addr": SMS_STS_PRESENT_TEMPERATURE, "size": 1, "unit": "C"},
+    {"name": "Moving", "addr": SMS_STS_MOVING, "size": 1},
+    {"name": "Present Current", "addr": SMS_STS_PRESENT_CURRENT_L, "size": 2, "scale": 6.5, "unit": "mA"},
+]
+SMS_STS_CODEC = RegisterCodec(SMS_STS_REGISTERS)
+
 
 def comm_error_log(comm_result, error, packet_handler):
     """Logs communication errors for motor actions."""
@@ -81,83 +112,102 @@ class sms_sts(protocol_packet_handler):
     def _write_setting(self, scs_id, address, value):
         """ Helper to write a setting that requires unlocking the EPROM. Returns (comm_result, error) """
         self.unLockEprom(scs_id)
-        scs_comm_result, scs_error = self.write1ByteTxRx(scs_id, address, value)
+        data = SMS_STS_CODEC.encode(address, value)
+        scs_comm_result, scs_error = self.writeTxRx(scs_id, address, len(data), data)
         self.LockEprom(scs_id)
         return scs_comm_result, scs_error
 
+    @staticmethod
+    def _pos_ex_packet(position, speed, acc):
+        """acc, goal position, goal time (0), goal speed as one 7-byte block.
+        Position and speed are sent as raw register words, as the PosEx
+        helpers always have: pass sign-magnitude values through to_raw()."""
+        codec = SMS_STS_CODEC
+        return (
+            codec.encode(SMS_STS_ACC, acc)
+            + codec.encode_raw(SMS_STS_GOAL_POSITION_L, position)
+            + codec.encode(SMS_STS_GOAL_TIME_L, 0)
+            + codec.encode_raw(SMS_STS_GOAL_SPEED_L, speed)
+        )
+
+    def _read_register(self, scs_id, address):
+        """Read one register and decode it. Returns (value, comm_result, error) """
+        reg = SMS_STS_CODEC[address]
+        data, scs_comm_result, scs_error = self.readTxRx(scs_id, address, reg.size)
+        if scs_comm_result != COMM_SUCCESS:
+            return 0, scs_comm_result, scs_error
+        return SMS_STS_CODEC.decode(address, bytes(data)), scs_comm_result, scs_error
+
     def WritePosEx(self, scs_id, position, speed, acc):
-        txpacket = [acc, self.scs_lobyte(position), self.scs_hibyte(position), 0, 0, self.scs_lobyte(speed), self.scs_hibyte(speed)]
+        txpacket = self._pos_ex_packet(position, speed, acc)
         return self.writeTxRx(scs_id, SMS_STS_ACC, len(txpacket), txpacket)
 
     def ReadPos(self, scs_id):
-        scs_present_position, scs_comm_result, scs_error = self.read2ByteTxRx(scs_id, SMS_STS_PRESENT_POSITION_L)
-        return self.scs_tohost(scs_present_position, 15), scs_comm_result, scs_error
+        return self._read_register(scs_id, SMS_STS_PRESENT_POSITION_L)
 
     def ReadSpeed(self, scs_id):
-        scs_present_speed, scs_comm_result, scs_error = self.read2ByteTxRx(scs_id, SMS_STS_PRESENT_SPEED_L)
-        return self.scs_tohost(scs_present_speed, 15), scs_comm_result, scs_error
+        return self._read_register(scs_id, SMS_STS_PRESENT_SPEED_L)
     
     def ReadVoltage(self, scs_id):
-        scs_present_voltage, scs_comm_result, scs_error = self.read1ByteTxRx(scs_id, SMS_STS_PRESENT_VOLTAGE)
-        return self.scs_tohost(scs_present_voltage, 15), scs_comm_result, scs_error
+        return self._read_register(scs_id, SMS_STS_PRESENT_VOLTAGE)
     
     def ReadVoltageLimits(self, scs_id):
         """Read voltage limits. Returns (max_voltage, min_voltage, comm_result, error) """
-        max_voltage, scs_comm_result, scs_error = self.read1ByteTxRx(scs_id, SMS_STS_MAX_INPUT_VOLTAGE)
+        max_voltage, scs_comm_result, scs_error = self._read_register(scs_id, SMS_STS_MAX_INPUT_VOLTAGE)
         if scs_comm_result != COMM_SUCCESS:
             return 0, 0, scs_comm_result, scs_error
-        min_voltage, scs_comm_result, scs_error = self.read1ByteTxRx(scs_id, SMS_STS_MIN_INPUT_VOLTAGE)
-        return self.scs_tohost(max_voltage, 15), self.scs_tohost(min_voltage, 15), scs_comm_result, scs_error
+        min_voltage, scs_comm_result, scs_error = self._read_register(scs_id, SMS_STS_MIN_INPUT_VOLTAGE)
+        return max_voltage, min_voltage, scs_comm_result, scs_error
 
     def WriteVoltageLimits(self, scs_id, max_voltage, min_voltage):
         """ Sets max and min voltage limits. Returns (comm_result, error) """
-        scs_max_voltage = self.scs_toscs(max_voltage, 15)
-        scs_min_voltage = self.scs_toscs(min_voltage, 15)
-        comm_result, error = self._write_setting(scs_id, SMS_STS_MAX_INPUT_VOLTAGE, scs_max_voltage)
+        comm_result, error = self._write_setting(scs_id, SMS_STS_MAX_INPUT_VOLTAGE, max_voltage)
         comm_error_log(comm_result, error, self)
-        comm_result, error = self._write_setting(scs_id, SMS_STS_MIN_INPUT_VOLTAGE, scs_min_voltage)
+        comm_result, error = self._write_setting(scs_id, SMS_STS_MIN_INPUT_VOLTAGE, min_voltage)
         comm_error_log(comm_result, error, self)
         return comm_result, error
 
     def ReadTemperature(self, scs_id):
         """Read temperature. Returns (temp, comm_result, error) """
-        temp, scs_comm_result, scs_error = self.read1ByteTxRx(scs_id, SMS_STS_PRESENT_TEMPERATURE)
-        return self.scs_tohost(temp, 15), scs_comm_result, scs_error
+        return self._read_register(scs_id, SMS_STS_PRESENT_TEMPERATURE)
 
     def ReadTemperatureLimit(self, scs_id):
         """Read temperature limits. Returns (max_temp, comm_result, error) """
-        max_temp, scs_comm_result, scs_error = self.read1ByteTxRx(scs_id, SMS_STS_MAX_TEMP_LIMIT)
-        return self.scs_tohost(max_temp, 15), scs_comm_result, scs_error
+        return self._read_register(scs_id, SMS_STS_MAX_TEMP_LIMIT)
 
     def WriteTemperatureLimit(self, scs_id, max_temp):
         """ Sets max temperature limit. Returns (comm_result, error) """
-        scs_max_temp = self.scs_toscs(max_temp, 15)
-        comm_result, error = self._write_setting(scs_id, SMS_STS_MAX_TEMP_LIMIT, scs_max_temp)
+        comm_result, error = self._write_setting(scs_id, SMS_STS_MAX_TEMP_LIMIT, max_temp)
         comm_error_log(comm_result, error, self)
         return comm_result, error
 
     def ReadMotorLimits(self, scs_id):
         """Reads motor angle limits. Returns (min_angle, max_angle, comm_result, error) """
-        min_angle_l, scs_comm_result, scs_error = self.read2ByteTxRx(scs_id, SMS_STS_MIN_ANGLE_LIMIT_L)
-        max_angle_l, scs_comm_result, scs_error = self.read2ByteTxRx(scs_id, SMS_STS_MAX_ANGLE_LIMIT_L)
-        return self.scs_tohost(min_angle_l, 15), self.scs_tohost(max_angle_l, 15), scs_comm_result, scs_error
+        min_angle, scs_comm_result, scs_error = self._read_register(scs_id, SMS_STS_MIN_ANGLE_LIMIT_L)
+        max_angle, scs_comm_result, scs_error = self._read_register(scs_id, SMS_STS_MAX_ANGLE_LIMIT_L)
+        return min_angle, max_angle, scs_comm_result, scs_error
     
     def ReadPosSpeed(self, scs_id):
-        scs_present_position_speed, scs_comm_result, scs_error = self.read4ByteTxRx(scs_id, SMS_STS_PRESENT_POSITION_L)
-        scs_present_position = self.scs_loword(scs_present_position_speed)
-        scs_present_speed = self.scs_hiword(scs_present_position_speed)
-        return self.scs_tohost(scs_present_position, 15), self.scs_tohost(scs_present_speed, 15), scs_comm_result, scs_error
+        data, scs_comm_result, scs_error = self.readTxRx(scs_id, SMS_STS_PRESENT_POSITION_L, 4)
+        if scs_comm_result != COMM_SUCCESS:
+            return 0, 0, scs_comm_result, scs_error
+        data = bytes(data)
+        return (
+            SMS_STS_CODEC.decode(SMS_STS_PRESENT_POSITION_L, data, 0),
+            SMS_STS_CODEC.decode(SMS_STS_PRESENT_SPEED_L, data, 2),
+            scs_comm_result,
+            scs_error,
+        )
 
     def ReadMoving(self, scs_id):
-        moving, scs_comm_result, scs_error = self.read1ByteTxRx(scs_id, SMS_STS_MOVING)
-        return moving, scs_comm_result, scs_error
+        return self._read_register(scs_id, SMS_STS_MOVING)
 
     def SyncWritePosEx(self, scs_id, position, speed, acc):
-        txpacket = [acc, self.scs_lobyte(position), self.scs_hibyte(position), 0, 0, self.scs_lobyte(speed), self.scs_hibyte(speed)]
+        txpacket = list(self._pos_ex_packet(position, speed, acc))
         return self.groupSyncWrite.addParam(scs_id, txpacket)
 
     def RegWritePosEx(self, scs_id, position, speed, acc):
-        txpacket = [acc, self.scs_lobyte(position), self.scs_hibyte(position), 0, 0, self.scs_lobyte(speed), self.scs_hibyte(speed)]
+        txpacket = self._pos_ex_packet(position, speed, acc)
         return self.regWriteTxRx(scs_id, SMS_STS_ACC, len(txpacket), txpacket)
 
     def RegAction(self):
@@ -167,8 +217,8 @@ class sms_sts(protocol_packet_handler):
         return self.write1ByteTxRx(scs_id, SMS_STS_MODE, 1)
 
     def WriteSpec(self, scs_id, speed, acc):
-        speed = self.scs_toscs(speed, 15)
-        txpacket = [acc, 0, 0, 0, 0, self.scs_lobyte(speed), self.scs_hibyte(speed)]
+        speed = SMS_STS_CODEC.to_raw(SMS_STS_GOAL_SPEED_L, speed)
+        txpacket = self._pos_ex_packet(0, speed, acc)
         return self.writeTxRx(scs_id, SMS_STS_ACC, len(txpacket), txpacket)
 
     def LockEprom(self, scs_id):
@@ -1,14 +1,44 @@
+import asyncio
 import threading
 import time
+import struct
+from array import array
 from .feetech import *
-from typing import Dict, Optional, Set
+from .feetech import bus_timing
+from .feetech.replay import CapturePortHandler
+from .state_store import JointStateStore, JointStateSnapshot
+from .shm_channel import SharedStateChannel
+from .bus_cache import DEFAULT_TOPOLOGY_CACHE, TopologyCache
+from .config_batch import ConfigBatch
+from .register_snapshot import read_snapshot
+from .keyframes import KeyframeTrack
+from .trajectory import TrajectoryStreamer
+from .instrumentation import LoopInstrumentation
+from .link_quality import LinkQuality
+from .servo_health import ServoHealth
+from .flight_recorder import (
+    FlightRecorder,
+    FAULT_NO_REPLY,
+    FAULT_OVERRUN,
+    FAULT_QUARANTINED,
+    FAULT_RECOVERED,
+    FAULT_SERVO_ERROR,
+    FAULT_SERVO_STATUS,
+    FAULT_SYNC_READ,
+    FAULT_NAMES,
+)
+from .bus_arbiter import (
+    BusArbiter,
+    PRIORITY_CONFIG,
+    PRIORITY_DIAGNOSTICS,
+)
+from typing import Dict, List, Optional, Set, Tuple
 import os
 import sched
 import platform
 from tabulate import tabulate  # Add this import at the top of the file
 from loguru import logger
 
-# from kos_zbot.utils.latency import get_tracker
 from tqdm import tqdm
 import gc
 
@@ -20,138 +50,79 @@ class NoActuatorsFoundError(Exception):
 ADDR_KP = 21  # Speed loop P gain
 ADDR_KD = 22  # Speed loop D gain
 
+# Sync-read layouts starting at SMS_STS_PRESENT_POSITION_L, one slot per servo:
+# error byte, position, speed[, load, voltage, temperature]
+STATE_STRUCT = struct.Struct("<BHH")
+EXTENDED_STATE_STRUCT = struct.Struct("<BHHHBB")
 
-servoRegs = [
-    {"name": "Model", "addr": SMS_STS_MODEL_L, "size": 2, "type": "uint16"},
-    {"name": "ID", "addr": SMS_STS_ID, "size": 1, "type": "uint8"},
-    {"name": "Baudrate", "addr": SMS_STS_BAUD_RATE, "size": 1, "type": "uint8"},
-    {"name": "Return Delay", "addr": 7, "size": 1, "type": "uint8"},
-    {"name": "Response Status Level", "addr": 8, "size": 1, "type": "uint8"},
-    {
-        "name": "Min Angle Limit",
-        "addr": SMS_STS_MIN_ANGLE_LIMIT_L,
-        "size": 2,
-        "type": "uint16",
-    },
-    {
-        "name": "Max Angle Limit",
-        "addr": SMS_STS_MAX_ANGLE_LIMIT_L,
-        "size": 2,
-        "type": "uint16",
-    },
-    {"name": "Max Temperature Limit", "addr": 13, "size": 1, "type": "uint8"},
-    {"name": "Max Voltage Limit", "addr": 14, "size": 1, "type": "uint8"},
-    {"name": "Min Voltage Limit", "addr": 15, "size": 1, "type": "uint8"},
-    {"name": "Max Torque Limit", "addr": 16, "size": 2, "type": "uint16"},
-    {"name": "Phase", "addr": 18, "size": 1, "type": "uint8"},
-    {"name": "Unloading Condition", "addr": 19, "size": 1, "type": "uint8"},
-    {"name": "LED Alarm Condition", "addr": 20, "size": 1, "type": "uint8"},
-    {"name": "P Coefficient", "addr": 21, "size": 1, "type": "uint8"},
-    {"name": "D Coefficient", "addr": 22, "size": 1, "type": "uint8"},
-    {"name": "I Coefficient", "addr": 23, "size": 1, "type": "uint8"},
-    {"name": "Minimum Startup Force", "addr": 24, "size": 2, "type": "uint16"},
-    {"name": "CW Dead Zone", "addr": SMS_STS_CW_DEAD, "size": 1, "type": "uint8"},
-    {"name": "CCW Dead Zone", "addr": SMS_STS_CCW_DEAD, "size": 1, "type": "uint8"},
-    {"name": "Protection Current", "addr": 28, "size": 2, "type": "uint16"},
-    {"name": "Angular Resolution", "addr": 30, "size": 1, "type": "uint8"},
-    {"name": "Offset", "addr": SMS_STS_OFS_L, "size": 2, "type": "uint16"},
-    {"name": "Mode", "addr": SMS_STS_MODE, "size": 1, "type": "uint8"},
-    {"name": "Protective Torque", "addr": 34, "size": 1, "type": "uint8"},
-    {"name": "Protection Time", "addr": 35, "size": 1, "type": "uint8"},
-    {"name": "Overload Torque", "addr": 36, "size": 1, "type": "uint8"},
-    {
-        "name": "Speed closed loop P proportional coefficient",
-        "addr": 37,
-        "size": 1,
-        "type": "uint8",
-    },
-    {"name": "Over Current Protection Time", "addr": 38, "size": 1, "type": "uint8"},
-    {
-        "name": "Velocity closed loop I integral coefficient",
-        "addr": 39,
-        "size": 1,
-        "type": "uint8",
-    },
-    {
-        "name": "Torque Enable",
-        "addr": SMS_STS_TORQUE_ENABLE,
-        "size": 1,
-        "type": "uint8",
-    },
-    {"name": "Acceleration", "addr": SMS_STS_ACC, "size": 1, "type": "uint8"},
-    {
-        "name": "Goal Position",
-        "addr": SMS_STS_GOAL_POSITION_L,
-        "size": 2,
-        "type": "uint16",
-    },
-    {"name": "Goal Time", "addr": SMS_STS_GOAL_TIME_L, "size": 2, "type": "uint16"},
-    {"name": "Goal Speed", "addr": SMS_STS_GOAL_SPEED_L, "size": 2, "type": "int16"},
-    {"name": "Lock", "addr": SMS_STS_LOCK, "size": 1, "type": "uint8"},
-    {
-        "name": "Present Position",
-        "addr": SMS_STS_PRESENT_POSITION_L,
-        "size": 2,
-        "type": "uint16",
-    },
-    {
-        "name": "Present Speed",
-        "addr": SMS_STS_PRESENT_SPEED_L,
-        "size": 2,
-        "type": "int16",
-    },
-    {
-        "name": "Present Load",
-        "addr": SMS_STS_PRESENT_LOAD_L,
-        "size": 2,
-        "type": "int16",
-    },
-    {
-        "name": "Present Voltage",
-        "addr": SMS_STS_PRESENT_VOLTAGE,
-        "size": 1,
-        "type": "uint8",
-    },
-    {
-        "name": "Present Temperature",
-        "addr": SMS_STS_PRESENT_TEMPERATURE,
-        "size": 1,
-        "type": "uint8",
-    },
-    {"name": "Status", "addr": 65, "size": 1, "type": "uint8"},
-    {"name": "Moving", "addr": SMS_STS_MOVING, "size": 1, "type": "uint8"},
-    {
-        "name": "Present Current",
-        "addr": SMS_STS_PRESENT_CURRENT_L,
-        "size": 2,
-        "type": "uint16",
-    },
-    {
-        "name": "Default Moving Threshold",
-        "addr": SMS_STS_DEFAULT_MOVING_THRESHOLD,
-        "size": 1,
-        "type": "uint8",
-    },
-    {"name": "Default DTS", "addr": SMS_STS_DEFAULT_DTS_MS, "size": 1, "type": "uint8"},
-    {"name": "Default VK", "addr": SMS_STS_DEFAULT_VK_MS, "size": 1, "type": "uint8"},
-    {"name": "Default VMIN", "addr": SMS_STS_DEFAULT_VMIN, "size": 1, "type": "uint8"},
-    {"name": "Default VMAX", "addr": SMS_STS_DEFAULT_VMAX, "size": 1, "type": "uint8"},
-    {"name": "Default AMAX", "addr": SMS_STS_DEFAULT_AMAX, "size": 1, "type": "uint8"},
-    {"name": "Default KACC", "addr": SMS_STS_DEFAULT_KACC, "size": 1, "type": "uint8"},
-]
+# Slow telemetry block at SMS_STS_PRESENT_VOLTAGE (62–70): voltage, temperature,
+# async write flag, status, moving, 2 reserved, current
+TELEMETRY_STRUCT = struct.Struct("<BBBBBxxH")
+
+# Firmware major/minor, (reserved), model number: read in one go during discovery
+SERVO_INFO_ADDR = 0
+SERVO_INFO_LEN = 5
+
+# Configuration registers whose last written value is cached (on disk too)
+# so unchanged values are not rewritten: EEPROM settings plus acceleration.
+# Torque enable and the goal/status area change under us and are not cached.
+CACHED_REGISTER_ADDRS = frozenset(range(9, 40)) | {SMS_STS_ACC}
+DEFAULT_CONFIG_ADDRS = (ADDR_KP, ADDR_KD, SMS_STS_TORQUE_ENABLE, SMS_STS_ACC)
+
+# A fault that repeats every tick is logged on its first occurrence and then
+# every FAULT_LOG_EVERY occurrences; the flight recorder keeps all of them.
+FAULT_LOG_EVERY = 100
+
+
+def _log_due(count: int) -> bool:
+    return count == 1 or count % FAULT_LOG_EVERY == 0
+
+
+# the SMS/STS memory table and its compiled codec live in kos/feetech/sms_sts.py
+servoRegs = SMS_STS_REGISTERS
+REGISTER_CODEC = SMS_STS_CODEC
+
+# sign bits of the sync-read state fields, for the inlined per-tick decode
+POSITION_SIGN = REGISTER_CODEC[SMS_STS_PRESENT_POSITION_L].sign_mask
+VELOCITY_SIGN = REGISTER_CODEC[SMS_STS_PRESENT_SPEED_L].sign_mask
+LOAD_SIGN = REGISTER_CODEC[SMS_STS_PRESENT_LOAD_L].sign_mask
 
 
 class SCSMotorController:
     def __init__(
-        self, device="/dev/ttyAMA5", baudrate=500000, rate=50, actuator_ids=None, robot_metadata=None
+        self,
+        device="/dev/ttyAMA5",
+        baudrate=500000,
+        rate=50,
+        actuator_ids=None,
+        robot_metadata=None,
+        extended_state=False,
+        telemetry_rate=1.0,
+        read_first=False,
+        topology_cache=DEFAULT_TOPOLOGY_CACHE,
+        cpu_core=1,
+        capture=None,
+        rescan=False,
     ):
-        """Initialize the motor controller with minimal setup"""
+        """Initialize the motor controller with minimal setup
+
+        actuator_ids limits the controller to those servos (one shard of a
+        MultiBusController); cpu_core is the core the update loop is pinned
+        to, None to leave the affinity alone.  capture is a file that
+        records every byte on the port for replay (kos/feetech/replay.py).
+        rescan ignores the cached bus topology and scans the bus.
+        """
 
         self.log = logger
         self.rate = rate
         self.period = 1.0 / rate
         self.scheduler = sched.scheduler(time.time, time.sleep)
 
+        self.cpu_core = cpu_core
+        # Optional tick grid shared with other controllers: ticks start at
+        # tick_epoch_ns + k * period (see MultiBusController)
+        self.tick_epoch_ns: Optional[int] = None
+
         self.last_config_time = 0
         self.CONFIG_GRACE_PERIOD = 2.0  # Wait 1 second after configs
 
@@ -166,7 +137,9 @@ class SCSMotorController:
         self.last_commanded_velocities = {}
         self.next_velocity_batch = None
 
-        self.port_handler = PortHandler(device)
+        self.port_handler = (
+            CapturePortHandler(device, capture) if capture else PortHandler(device)
+        )
         self.packet_handler = sms_sts(self.port_handler)
 
         self.port_handler.setBaudRate(baudrate)
@@ -174,44 +147,115 @@ class SCSMotorController:
             raise RuntimeError("failed to open the port")
         self.log.info(f"port opened at {self.port_handler.getBaudRate()} baud")
 
+        # extended_state also reads load, voltage and temperature every tick
+        self.extended_state = extended_state
+        self._state_struct = EXTENDED_STATE_STRUCT if extended_state else STATE_STRUCT
         self.group_sync_read = GroupSyncRead(
-            self.packet_handler, SMS_STS_PRESENT_POSITION_L, 4
+            self.packet_handler,
+            SMS_STS_PRESENT_POSITION_L,
+            self._state_struct.size - 1,
         )
         self.group_sync_write = GroupSyncWrite(
             self.packet_handler, SMS_STS_GOAL_POSITION_L, 2
         )
 
+        # per-servo reply latency / timeout / CRC statistics; learns the
+        # sync-read deadlines (kos/link_quality.py)
+        self.link_quality = LinkQuality(
+            floor_us=bus_timing.status_bytes(self._state_struct.size - 1)
+            * bus_timing.byte_time_us(baudrate),
+            cap_us=MAX_BUSY_US,
+        )
+        # servos that stop answering leave the sync-read until a probe
+        # finds them again (kos/servo_health.py)
+        self.health = ServoHealth()
+
         # State variables
         self.running = False
 
-        # Double buffer for positions
-        self._positions_a = {}
-        self._positions_b = {}
-        self._active_positions = self._positions_a
-        self._velocities_a = {}
-        self._velocities_b = {}
-        self._active_velocities = self._velocities_a
-
-        # Locks
-        self._control_lock = threading.Lock()
-        self._positions_lock = threading.Lock()
+        self._max_servo_cnt = 20  # worst‑case number of IDs you’ll ever have
+
+        # Decoded state, one slot per actuator; readers never take a lock
+        self.state_store = JointStateStore(self._max_servo_cnt)
+
+        # servo-side trajectory being streamed (see kos/trajectory.py)
+        self.trajectory: Optional[TrajectoryStreamer] = None
+
+        # keyframes interpolated every tick by the update loop (see kos/keyframes.py)
+        self.keyframes: Optional[KeyframeTrack] = None
+
+        # Optional shared-memory channel for policies in another process
+        self.shm_channel: Optional[SharedStateChannel] = None
+        self._shm_ids = None
+        self._slot_block = None  # gsr.data_block the slot map below was built for
+        self._block_slots = []
+
+        # Bus access: the update loop first, everything else in its idle time
+        self.bus = BusArbiter()
         self._target_positions_lock = threading.Lock()
 
         self.read_error_counts = {}  # Track read errors per servo
         self.error_reset_period = 5.0  # Reset error counts after 5 seconds of success
         self.last_error_time = {}  # Track when error count was last incremented
         self.fault_history = {}  # Track fault history
+        self._sync_read_failures = 0  # failed sync-reads in a row
+
+        # Binary ring log of per-tick state, commands and faults; off until
+        # open_recorder() (see kos/flight_recorder.py)
+        self.recorder: Optional[FlightRecorder] = None
+
+        # Slow telemetry, polled one servo at a time in the bus time left at
+        # the end of each control tick; telemetry_rate is per servo (0 = off)
+        self.telemetry_rate = telemetry_rate
+        self.telemetry: Dict[int, dict] = {}
+        self._telemetry_next_ns: Dict[int, int] = {}
+        self._telemetry_read_ns = 0  # running average of one telemetry read
+        self.return_delay_us = 0.0  # largest servo Return Delay (register 7)
+
+        # read_first samples state before sending the tick's commands, so the
+        # commands are computed from feedback that is as fresh as possible
+        self.read_first = read_first
+        # per-phase tick timings (see kos/instrumentation.py)
+        self.instrumentation = LoopInstrumentation()
 
-        self._max_servo_cnt = 20  # worst‑case number of IDs you’ll ever have
         self._tx_buf = bytearray(
             self._max_servo_cnt * 7
         )  # id, pos_lo, pos_hi, time_lo, time_hi, vel_lo, vel_hi
+        self._tx_len = 0  # bytes of _tx_buf sent this tick (0: no sync-write)
+        self._tx_start_ns = 0  # see _write_commands / _wait_bus_idle
+        self._tx_done_ns = 0
         self._last_sent_pos = {}  # id → counts  (keeps GC stable)
 
-        # self.latency_tracker = get_tracker("actuator_loop")
         time.sleep(1)
 
-        available_actuators = self.scan_servos(range(0, 254))
+        # Last-known bus layout (None disables the cache)
+        self.topology_cache = (
+            TopologyCache(topology_cache) if topology_cache is not None else None
+        )
+        self._reg_cache: Dict[int, Dict[int, int]] = {}  # live-verified values
+        self._reg_snapshot: Dict[int, Dict[int, int]] = {}  # startup values, used once
+        self._reg_dirty: Dict[int, Dict[int, int]] = {}  # written, not yet on disk
+        self._config_writes = 0
+        wanted_ids = set(actuator_ids) if actuator_ids is not None else None
+        # servos the cached topology must contain to be trusted
+        expected_ids = set(wanted_ids or ())
+        if robot_metadata is not None:
+            metadata_ids = {
+                joint.id
+                for joint in robot_metadata.joint_name_to_metadata.values()
+                if joint.id is not None
+            }
+            expected_ids |= metadata_ids & wanted_ids if wanted_ids is not None else metadata_ids
+        available_actuators = self.discover_servos(
+            sorted(wanted_ids) if wanted_ids is not None else range(0, 254),
+            expected_ids=expected_ids,
+            force_scan=rescan,
+        )
+        if wanted_ids is not None:
+            available_actuators = [a for a in available_actuators if a["id"] in wanted_ids]
+            missing = wanted_ids - {a["id"] for a in available_actuators}
+            if missing:
+                self.log.error(f"actuators {sorted(missing)} not found on {device}")
         self.log.info(f"{len(available_actuators)} actuators found")
 
         if not available_actuators:
@@ -236,6 +280,9 @@ class SCSMotorController:
             for joint_name, joint_metadata in self.metadata.joint_name_to_metadata.items():
                 if joint_metadata.id is not None:
                     metadata_actuator_ids.add(joint_metadata.id)
+            if wanted_ids is not None:
+                # other joints of the robot live on other buses
+                metadata_actuator_ids &= wanted_ids
             
             discovered_actuator_ids = {actuator["id"] for actuator in available_actuators}
             
@@ -275,44 +322,59 @@ class SCSMotorController:
         else:
             self.log.warning("No robot metadata available. Running without limit enforcement.")
 
-        with self._control_lock:
+        with self.bus.transaction(PRIORITY_CONFIG):
             for actuator in available_actuators:
                 self._add_actuator(actuator["id"])
 
+        self._snapshot_registers(available_actuators)
         self._apply_default_gains()
+        self._save_register_cache()
+        self._read_return_delay()
 
         # Initialize thread
         self.thread = threading.Thread(target=self._update_loop, daemon=True)
 
+    def _read_return_delay(self):
+        """Largest Return Delay (register 7) across the actuators, in µs"""
+        delays = []
+        for actuator_id in sorted(self.actuator_ids):
+            values, result, _ = self.packet_handler.ReadRegs(actuator_id, SMS_STS_RETURN_DELAY)
+            if result == COMM_SUCCESS:
+                delays.append(values[0])
+        if delays:
+            self.return_delay_us = max(delays) * bus_timing.RETURN_DELAY_UNIT_US
+        self.log.info(f"servo return delay {self.return_delay_us:.0f} us")
+
     def _apply_default_gains(self, actuator_id: int = None) -> bool:
         """Apply default/metadata gains to specific actuator or all actuators"""
-        if actuator_id is not None:
-            # Apply to specific actuator
-            if actuator_id not in self.actuator_gains:
-                self.log.warning(f"No gains configured for actuator {actuator_id}")
-                return False
-                
-            gains = self.actuator_gains[actuator_id]
-            config = {
+        ids = [actuator_id] if actuator_id is not None else sorted(self.actuator_ids)
+        configs = {}
+        for aid in ids:
+            if aid not in self.actuator_gains:
+                self.log.warning(f"No gains configured for actuator {aid}")
+                continue
+            gains = self.actuator_gains[aid]
+            configs[aid] = {
                 'kp': gains['kp'],
                 'kd': gains['kd'],
                 'torque_enabled': True,
                 'acceleration': 1000
             }
-            return self.configure_actuator(actuator_id, config)
-        else:
-            # Apply to all actuators
-            success = True
-            for aid in self.actuator_ids:
-                if not self._apply_default_gains(aid):
-                    success = False
-            return success
+        # one batch for all actuators: a couple of sync-writes + one sync-read
+        results = self.configure_actuators(configs)
+        return len(configs) == len(ids) and all(results.values())
 
     def _add_actuator(self, actuator_id: int) -> bool:
         """Add a new actuator to the controller"""
         if actuator_id in self.actuator_ids:
             return True
 
+        if len(self.state_store) >= self._max_servo_cnt:
+            self.log.error(
+                f"[id:{actuator_id:03d}] more than {self._max_servo_cnt} actuators"
+            )
+            return False
+
         if not self.group_sync_read.addParam(actuator_id):
             self.log.error(f"[id:{actuator_id:03d}] groupsyncread addparam failed")
             return False
@@ -321,10 +383,7 @@ class SCSMotorController:
         self.actuator_ids.add(actuator_id)
         self.last_commanded_positions[actuator_id] = 0
         self.last_commanded_velocities[actuator_id] = 0
-
-        # Double-buffered positions: initialize both buffers
-        self._positions_a[actuator_id] = 0
-        self._positions_b[actuator_id] = 0
+        self.state_store.add(actuator_id)
         return True
 
     def _remove_actuator(
@@ -336,33 +395,74 @@ class SCSMotorController:
             self.commanded_ids.discard(actuator_id)
             self.actuator_ids.remove(actuator_id)
             self.last_commanded_positions.pop(actuator_id, None)
+            self.telemetry.pop(actuator_id, None)
+            self._telemetry_next_ns.pop(actuator_id, None)
 
-            # Double-buffered positions: cleanup both buffers
-            self._positions_a.pop(actuator_id, None)
-            self._positions_b.pop(actuator_id, None)
+            self.state_store.remove(actuator_id)
+            self.group_sync_read.removeParam(actuator_id)
 
             # Cleanup error tracking
             self.read_error_counts.pop(actuator_id, None)
             self.last_error_time.pop(actuator_id, None)
-
-    def _record_fault(self, actuator_id: int, message: str):
-        """Record a fault for the given actuator."""
+            self.link_quality.forget(actuator_id)
+            self.health.forget(actuator_id)
+
+    def _reset_link_state(self, actuator_id: int):
+        """Forget the health and link timing of a servo whose link changed
+        (e.g. new baud rate) and put it back in the sync-read"""
+        if self.health.is_quarantined(actuator_id):
+            self.group_sync_read.addParam(actuator_id)
+        self.health.reset(actuator_id)
+        self.link_quality.forget(actuator_id)
+        self.read_error_counts.pop(actuator_id, None)
+        self.last_error_time.pop(actuator_id, None)
+
+    def _record_fault(
+        self, actuator_id: int, code: int, detail: int = 0, record: bool = True
+    ) -> int:
+        """Record a fault for the given actuator; returns its fault count.
+
+        Runs on the update thread: stores the code only, the message is
+        formatted when the history is read.  `record` also appends the
+        fault to the flight recorder, if one is open.
+        """
         now = time.time()
-        if actuator_id not in self.fault_history:
-            self.fault_history[actuator_id] = {
-                "last_fault_message": message,
-                "total_faults": 1,
-                "last_fault_time": now,
-            }
-        else:
-            fh = self.fault_history[actuator_id]
-            fh["last_fault_message"] = message
-            fh["total_faults"] += 1
-            fh["last_fault_time"] = now
+        fh = self.fault_history.get(actuator_id)
+        if fh is None:
+            fh = self.fault_history[actuator_id] = {"total_faults": 0}
+        fh["last_fault_code"] = code
+        fh["last_fault_detail"] = detail
+        fh["total_faults"] += 1
+        fh["last_fault_time"] = now
+        if record and self.recorder is not None:
+            self.recorder.fault(actuator_id, code, detail)
+        return fh["total_faults"]
+
+    def _fault_message(self, code: int, detail: int) -> str:
+        if code == FAULT_SYNC_READ:
+            return self.packet_handler.getTxRxResult(detail)
+        if code == FAULT_SERVO_ERROR:
+            return f"servo error code: {detail}"
+        if code == FAULT_SERVO_STATUS:
+            return f"servo status: {detail:#04x}"
+        if code == FAULT_NO_REPLY:
+            return "no data received"
+        if code == FAULT_QUARANTINED:
+            return "quarantined: no reply"
+        return FAULT_NAMES.get(code, f"fault {code}")
 
     def get_faults(self, actuator_id: int):
         """Retrieve fault history for a given actuator."""
-        return self.fault_history.get(actuator_id)
+        fh = self.fault_history.get(actuator_id)
+        if fh is None:
+            return None
+        return {
+            "last_fault_message": self._fault_message(
+                fh["last_fault_code"], fh["last_fault_detail"]
+            ),
+            "total_faults": fh["total_faults"],
+            "last_fault_time": fh["last_fault_time"],
+        }
 
     def get_limits(self, actuator_id: int) -> Optional[dict]:
         """Get current min/max position limits for a specific actuator"""
@@ -381,120 +481,218 @@ class SCSMotorController:
 
     def configure_actuator(self, actuator_id: int, config: dict):
         """Configure actuator parameters. Only parameters present in config are written."""
+        return self.configure_actuators({actuator_id: config}).get(actuator_id, False)
+
+    def _config_registers(self, config: dict) -> Optional[list]:
+        """[(addr, value, label)] a config asks for, or None if a value is out of range"""
+        writes = []
+
+        # KP
+        if "kp" in config:
+            kp = int(config["kp"])
+            if not (0 <= kp <= 255):
+                self.log.error(f"kp out of range: {kp}")
+                return None
+            writes.append((ADDR_KP, kp, f"kp={kp}"))
+
+        # KD
+        if "kd" in config:
+            kd = int(config["kd"])
+            if not (0 <= kd <= 255):
+                self.log.error(f"kd out of range: {kd}")
+                return None
+            writes.append((ADDR_KD, kd, f"kd={kd}"))
+
+        # Acceleration
+        if "acceleration" in config:
+            acceleration = config["acceleration"]
+            # Convert if needed
+            if acceleration != 0:
+                acceleration = (
+                    self._degrees_to_counts(acceleration, offset=0.0) / 100.0
+                )
+            acceleration = int(acceleration)
+            if not (0 <= acceleration <= 255):
+                self.log.error(f"acceleration out of range: {acceleration}")
+                return None
+            writes.append((SMS_STS_ACC, acceleration, f"acc={acceleration}"))
+
+        # Torque enable
+        if "torque_enabled" in config:
+            torque_enabled = bool(config["torque_enabled"])
+            writes.append(
+                (
+                    SMS_STS_TORQUE_ENABLE,
+                    1 if torque_enabled else 0,
+                    f"torque={'on' if torque_enabled else 'off'}",
+                )
+            )
+        return writes
+
+    def _config_est_us(self, servo_count: int) -> float:
+        """Rough bus time of a batched configuration: two sync-writes and one
+        verifying sync-read over the kp..acceleration span (see ConfigBatch)"""
+        baudrate = self.port_handler.getBaudRate()
+        span = SMS_STS_ACC - ADDR_KP + 1
+        return 2 * bus_timing.sync_write_us(baudrate, servo_count, span) + bus_timing.sync_read_us(
+            baudrate, servo_count, span, self.return_delay_us
+        )
+
+    def configure_actuators(self, configs: Dict[int, dict]) -> Dict[int, bool]:
+        """Configure several actuators at once.
+
+        Register changes of all actuators are coalesced into contiguous-range
+        sync-writes and verified with one sync-read (see ConfigBatch); servos
+        that fail verification fall back to per-register writeReg_Verify.
+        Returns {actuator_id: success}.
+        """
+        results = {}
         try:
+            previous_config_time = self.last_config_time
             self.last_config_time = time.monotonic()
-            changes = []
+            config_writes = self._config_writes
+            changes = {}
+
+            with self.bus.transaction(PRIORITY_CONFIG, est_us=self._config_est_us(len(configs))):
+                batch = ConfigBatch(self.packet_handler, REGISTER_CODEC)
+                for actuator_id, config in configs.items():
+                    # Only configure if actuator is already registered
+                    if actuator_id not in self.actuator_ids:
+                        self.log.error(
+                            f"cannot configure unregistered actuator {actuator_id}"
+                        )
+                        results[actuator_id] = False
+                        continue
 
-            with self._control_lock:
-                time.sleep(0.002)
+                    writes = self._config_registers(config)
+                    if writes is None:
+                        results[actuator_id] = False
+                        continue
 
-                # Only configure if actuator is already registered
-                if actuator_id not in self.actuator_ids:
-                    self.log.error(
-                        f"cannot configure unregistered actuator {actuator_id}"
+                    changes[actuator_id] = [label for _, _, label in writes]
+                    for addr, value, _ in writes:
+                        raw = REGISTER_CODEC.to_raw(addr, value)
+                        if not self._register_holds(actuator_id, addr, raw):
+                            batch.set(actuator_id, addr, raw)
+
+                pending = {aid: dict(regs) for aid, regs in batch.pending.items()}
+                verified = batch.commit()
+                for actuator_id, regs in pending.items():
+                    if verified.get(actuator_id):
+                        for addr, value in regs.items():
+                            self._register_written(actuator_id, addr, value)
+                        continue
+                    self.log.warning(
+                        f"batched config of actuator {actuator_id} not verified, "
+                        "writing registers one by one"
                     )
-                    return False
-
-                success = True
-
-                # KP
-                if "kp" in config:
-                    kp = int(config["kp"])
-                    if not (0 <= kp <= 255):
-                        self.log.error(f"kp out of range: {kp}")
-                        return False
-                    success &= self.writeReg_Verify(actuator_id, ADDR_KP, kp)
-                    changes.append(f"kp={kp}")
-
-                # KD
-                if "kd" in config:
-                    kd = int(config["kd"])
-                    if not (0 <= kd <= 255):
-                        self.log.error(f"kd out of range: {kd}")
-                        return False
-                    success &= self.writeReg_Verify(actuator_id, ADDR_KD, kd)
-                    changes.append(f"kd={kd}")
-
-                # Acceleration
-                if "acceleration" in config:
-                    acceleration = config["acceleration"]
-                    # Convert if needed
-                    if acceleration != 0:
-                        acceleration = (
-                            self._degrees_to_counts(acceleration, offset=0.0) / 100.0
-                        )
-                    acceleration = int(acceleration)
-                    if not (0 <= acceleration <= 255):
-                        self.log.error(f"acceleration out of range: {acceleration}")
-                        return False
-                    success &= self.writeReg_Verify(
-                        actuator_id, SMS_STS_ACC, acceleration
+                    ok = True
+                    for addr, value in regs.items():
+                        ok &= self.writeReg_Verify(actuator_id, addr, value)
+                    results[actuator_id] = ok
+
+                for actuator_id, config in configs.items():
+                    if actuator_id not in changes:
+                        continue
+                    results.setdefault(actuator_id, True)
+
+                    if "torque_enabled" in config:
+                        if bool(config["torque_enabled"]):
+                            if actuator_id not in self.torque_enabled_ids:
+                                # Read current position and set as target to prevent jump
+                                sample = self.state_store.read(actuator_id)
+                                current_counts = sample[0] if sample is not None else None
+                                self.last_commanded_positions[actuator_id] = current_counts
+                            self.torque_enabled_ids.add(actuator_id)
+                        else:
+                            self.torque_enabled_ids.discard(actuator_id)
+
+                    # Zero position
+                    if config.get("zero_position", False):
+                        self.set_zero_position(actuator_id)
+                        changes[actuator_id].append("zeroed")
+
+            if self._config_writes == config_writes:
+                # every value was already in place: no need to hold off the bus
+                self.last_config_time = previous_config_time
+            self._save_register_cache()
+
+            for actuator_id, labels in changes.items():
+                if results[actuator_id]:
+                    self.log.info(
+                        f"actuator {actuator_id} configured: " + ", ".join(labels)
                     )
-                    changes.append(f"acc={acceleration}")
-
-                # Torque enable
-                if "torque_enabled" in config:
-                    torque_enabled = bool(config["torque_enabled"])
-                    was_enabled = actuator_id in self.torque_enabled_ids
-                    success &= self.writeReg_Verify(
-                        actuator_id, SMS_STS_TORQUE_ENABLE, 1 if torque_enabled else 0
+                else:
+                    self.log.error(
+                        f"actuator {actuator_id} configuration failed: "
+                        + ", ".join(labels)
                     )
-                    if torque_enabled:
-                        if not was_enabled:
-                            # Read current position and set as target to prevent jump
-                            with self._positions_lock:
-                                positions = self._active_positions
-                                current_counts = positions.get(actuator_id)
-                            self.last_commanded_positions[actuator_id] = current_counts
-                        self.torque_enabled_ids.add(actuator_id)
-                    else:
-                        self.torque_enabled_ids.discard(actuator_id)
-                    changes.append(f"torque={'on' if torque_enabled else 'off'}")
+            return results
 
-                # Zero position
-                if config.get("zero_position", False):
-                    self.set_zero_position(actuator_id)
-                    changes.append("zeroed")
+        except Exception as e:
+            self.log.error(f"error configuring actuators {sorted(configs)}: {str(e)}")
+            return {actuator_id: False for actuator_id in configs}
 
-            if success:
-                self.log.info(
-                    f"actuator {actuator_id} configured: " + ", ".join(changes)
-                )
-            else:
-                self.log.error(
-                    f"actuator {actuator_id} configuration failed: "
-                    + ", ".join(changes)
-                )
-            return success
+    async def _verify_config(self, actuator_id: int, config: dict):
+        """Verify that configuration was applied correctly.
 
-        except Exception as e:
-            self.log.error(f"error configuring actuator {actuator_id}: {str(e)}")
+        The port belongs to the update thread, so the read-back runs in a
+        worker thread that waits for a diagnostics slot on the bus and only
+        the awaiting coroutine is suspended.  Services that own a port of their own should use
+        kos/feetech/aio.py instead.
+        """
+        writes = self._config_registers(config)
+        if writes is None:
             return False
 
-    # TODO: Make this comprehensive and put into use
-    async def _verify_config(self, actuator_id: int, config: dict):
-        """Verify that configuration was applied correctly."""
-        try:
-            if "acceleration" in config:
-                # Read back acceleration value
-                actual_acc = packet_handler.read1ByteTxRx(actuator_id, SMS_STS_ACC)
-                if actual_acc != config["acceleration"]:
-                    self.log.error(
-                        f"acceleration mismatch: expected {config['acceleration']}, got {actual_acc}"
+        def read_back():
+            with self.bus.transaction(PRIORITY_DIAGNOSTICS, est_us=len(writes) * 1_000):
+                return [
+                    (
+                        addr,
+                        value,
+                        label,
+                        self.packet_handler.readTxRx(
+                            actuator_id, addr, REGISTER_CODEC[addr].size
+                        ),
                     )
-                    return False
-
-            # Add other configuration verifications here
-            return True
+                    for addr, value, label in writes
+                ]
 
+        try:
+            readings = await asyncio.to_thread(read_back)
         except Exception as e:
             self.log.error(f"verification error: {str(e)}")
             return False
 
+        ok = True
+        for addr, value, label, (data, result, _) in readings:
+            if result != COMM_SUCCESS:
+                self.log.error(f"failed to read back {label} from actuator {actuator_id}")
+                ok = False
+            elif REGISTER_CODEC.decode(addr, bytes(data)) != value:
+                self.log.error(
+                    f"{label} mismatch on actuator {actuator_id}: "
+                    f"got {REGISTER_CODEC.decode(addr, bytes(data))}"
+                )
+                ok = False
+        return ok
+
     def start(self):
         """Start the motor controller update loop with real-time priority"""
         self.running = True
 
+        budget_us = self.bus_budget_us()
+        if budget_us > self.period * 1e6:
+            self.log.warning(
+                f"bus time per tick {budget_us:.0f} us exceeds the "
+                f"{self.period * 1e6:.0f} us period at {self.rate} Hz"
+            )
+        else:
+            self.log.info(
+                f"bus time per tick {budget_us:.0f} us of {self.period * 1e6:.0f} us"
+            )
+
         # Set real-time priority if possible
         if platform.system() == "Linux":
             try:
@@ -509,6 +707,57 @@ class SCSMotorController:
         if self.thread.is_alive():
             self.thread.join()
         self.port_handler.closePort()
+        if isinstance(self.port_handler, CapturePortHandler):
+            self.port_handler.closeCapture()
+        if self.shm_channel is not None:
+            self.shm_channel.close()
+            self.shm_channel = None
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def open_shm_channel(self, name: Optional[str] = None) -> SharedStateChannel:
+        """Expose state and accept target batches through shared memory.
+
+        Every tick publishes the latest state into the segment and applies
+        the last batch a client sent, exactly as set_targets() would.
+        Attach from the policy process with SharedStateChannel.attach(name).
+        """
+        if self.shm_channel is None:
+            self.shm_channel = SharedStateChannel.create(name, self._max_servo_cnt)
+            self._shm_ids = None
+            self._publish_shm()
+            self.log.info(f"shared-memory channel {self.shm_channel.name}")
+        return self.shm_channel
+
+    def open_recorder(self, path: Optional[str] = None, seconds: float = 60.0) -> FlightRecorder:
+        """Record every tick (state store + sync-write params) and every
+        fault into a binary ring log holding the last `seconds` of ticks.
+
+        `path` is memory-mapped, so the log survives a crash of this
+        process; None keeps it in anonymous memory.  Decode it offline with
+        kos.flight_recorder.read_log() or `python -m kos.flight_recorder`.
+        """
+        if self.recorder is None:
+            self.recorder = FlightRecorder(
+                path, max(1, int(seconds * self.rate)), self._max_servo_cnt
+            )
+            self.log.info(f"flight recorder: {path or 'memory'}, {seconds:.0f} s")
+        return self.recorder
+
+    def _publish_shm(self):
+        """Copy the current state store into the shared-memory channel"""
+        channel = self.shm_channel
+        snap = self.state_store.snapshot()
+        if snap.ids != self._shm_ids:
+            channel.set_ids(snap.ids)
+            self._shm_ids = snap.ids
+        channel.publish_state(
+            array("d", [self._counts_to_degrees(c, offset=180.0) for c in snap.positions]),
+            array("d", [self._counts_to_degrees(c, offset=0.0) for c in snap.velocities]),
+            snap.timestamps,
+            snap.valid,
+        )
 
     def _update_loop(self):
         """
@@ -519,73 +768,243 @@ class SCSMotorController:
         SPIN_US = 100  # busy‑wait window (µs) – tune on your CPU
         SPIN_NS = SPIN_US * 1_000
 
-        # self.latency_tracker.set_period(PERIOD_NS)
-
-        # pin to core 1
-        os.sched_setaffinity(0, {1})
+        if self.cpu_core is not None:
+            os.sched_setaffinity(0, {self.cpu_core})
         allowed = os.sched_getaffinity(0)
         self.log.info(f"feetech _update_loop running on CPUs: {sorted(allowed)}")
         gc.set_threshold(
             700, 10, 5
         )  # Increase the gen-2 frequency to mitigate pileup ? TODO: investigate
 
+        inst = self.instrumentation
+        inst.install_gc_hook()
         init_time = time.monotonic_ns()
-        while self.running:
-            # self.latency_tracker.record_iteration()
-            now_ns = time.monotonic_ns()
+        scheduling = False
+        try:
+            while self.running:
+                now_ns = time.monotonic_ns()
+                inst.begin_tick()
+
+                if now_ns - init_time < 1_000_000_000:  # Wait 1 second after init
+                    with self.bus.control():
+                        self._read_states(ignore_errors=True)
+                    time.sleep(0.01)
+                    next_time = self._next_tick_ns(time.monotonic_ns(), PERIOD_NS)
+                    continue
+                if not scheduling:
+                    # from here on other bus users wait for the idle time of a tick
+                    self.bus.start_scheduling()
+                    scheduling = True
+                    # the first scheduled tick starts on the grid point chosen above
+                    while time.monotonic_ns() < next_time:
+                        time.sleep(0.0005)
+                    now_ns = time.monotonic_ns()
+
+                # ── CONFIG‑GRACE CHECK ──────────────────────────────
+                in_grace = (now_ns - self.last_config_time * 1e9) < (
+                    self.CONFIG_GRACE_PERIOD * 1e9
+                )
 
-            if now_ns - init_time < 1_000_000_000:  # Wait 1 second after init
-                self._read_states(ignore_errors=True)
-                time.sleep(0.01)
-                next_time = time.monotonic_ns()
+                # never skipped: at most waits for a transaction already on the wire
+                with self.bus.control():
+                    inst.lap("bus_wait", now_ns)
+                    try:
+                        if in_grace:
+                            self._read_states(ignore_errors=True)
+                        elif self.actuator_ids:
+                            inst.add("tick_jitter_us", (now_ns - next_time) / 1_000)
+                            if self.read_first:
+                                self._read_states()
+                                self._write_commands()
+                            else:
+                                tx_bytes = self._write_commands()
+                                if tx_bytes:
+                                    self._wait_bus_idle(
+                                        self._tx_start_ns, self._tx_done_ns, tx_bytes
+                                    )
+                                read_ns = time.monotonic_ns()
+                                self._read_states()
+                                if self._tx_done_ns:
+                                    inst.add(
+                                        "write_read_gap_us",
+                                        (read_ns - self._tx_done_ns) / 1_000,
+                                    )
+                            inst.add("tick_work_us", (time.monotonic_ns() - now_ns) / 1_000)
+                            if self.recorder is not None:
+                                t = time.monotonic_ns()
+                                self.recorder.record_tick(
+                                    now_ns, self.state_store, self._tx_buf, self._tx_len
+                                )
+                                inst.lap("record", t)
+                            if self.telemetry_rate > 0:
+                                # this tick started at next_time; leave the spin window
+                                t = time.monotonic_ns()
+                                self._poll_telemetry(next_time + PERIOD_NS - SPIN_NS)
+                                inst.lap("telemetry", t)
+                            if self.health.quarantined:
+                                t = time.monotonic_ns()
+                                self._probe_quarantined(next_time + PERIOD_NS - SPIN_NS)
+                                inst.lap("probe", t)
+                    except Exception as e:
+                        self.log.error(f"error in update loop: {e}")
+
+                # configuration/diagnostics transactions in the rest of the period
+                t = time.monotonic_ns()
+                self.bus.serve(next_time + PERIOD_NS - SPIN_NS)
+
+                # -- Schedule Next Tick --
+                next_time += PERIOD_NS
+                now_ns = inst.lap("serve", t)  # refresh after work
+                sleep_ns = next_time - now_ns - SPIN_NS  # leave SPIN_NS to spin
+
+                if sleep_ns > 0:
+                    # coarse sleep (GIL released)
+                    time.sleep(sleep_ns / 1e9)
+                t = inst.lap("sleep", now_ns)
+
+                # fine spin – last ≤ SPIN_US
+                while time.monotonic_ns() < next_time:
+                    pass  # CPU‑bound for ≤ 100 µs
+
+                end_ns = inst.lap("spin", t)
+                over_ns = end_ns - next_time
+                if over_ns > 0:
+                    next_time = self._next_tick_ns(end_ns, PERIOD_NS)
+                    # on a shared tick grid the next point can still be ahead
+                    delay_ns = next_time - time.monotonic_ns()
+                    if delay_ns > 0:
+                        time.sleep(delay_ns / 1e9)
+                        while time.monotonic_ns() < next_time:
+                            pass
+
+                if not in_grace:
+                    over_us = over_ns / 1_000  # ns → µs
+                    kind = inst.overrun(over_us)
+                    if kind is not None and kind != "minor" and self.recorder is not None:
+                        self.recorder.fault(0, FAULT_OVERRUN, int(over_us), end_ns)
+                    if kind == "hard":
+                        self.log.error(f"hard overrun {over_us/1000:.2f} ms ({inst.worst_phases()})")
+                    elif kind == "overrun":
+                        self.log.warning(f"overrun      {over_us/1000:.2f} ms ({inst.worst_phases()})")
+                    elif kind == "minor":
+                        self.log.debug(f"minor jitter {over_us/1000:.2f} ms")
+        finally:
+            # also when the loop dies: otherwise every later transaction()
+            # waits for a serve() that never comes
+            inst.remove_gc_hook()
+            self.bus.stop_scheduling()
+
+    def _next_tick_ns(self, now_ns: int, period_ns: int) -> int:
+        """`now_ns`, or the next point of the shared tick grid if there is one"""
+        epoch = self.tick_epoch_ns
+        if epoch is None:
+            return now_ns
+        return now_ns + (epoch - now_ns) % period_ns
+
+    def _wait_bus_idle(self, tx_start_ns: int, tx_done_ns: int, tx_bytes: int):
+        """Wait until `tx_bytes` of unanswered frames, handed to the port from
+        `tx_start_ns` until the write returned at `tx_done_ns`, have left the
+        wire, plus a bus turnaround, instead of a fixed sleep.
+
+        Nothing answers a SYNC WRITE, so the servos' Return Delay is no part
+        of this gap.
+        """
+        baudrate = self.port_handler.getBaudRate()
+        wire_ns = int(tx_bytes * bus_timing.byte_time_us(baudrate) * 1_000)
+        # the port accepted the bytes at tx_done_ns; what is left on the wire
+        # is the frame time not already spent inside the write call
+        deadline = max(tx_start_ns + wire_ns, tx_done_ns) + int(
+            bus_timing.turnaround_us(baudrate) * 1_000
+        )
+        remaining = deadline - time.monotonic_ns()
+        if remaining > 200_000:
+            time.sleep((remaining - 100_000) / 1e9)
+        while time.monotonic_ns() < deadline:
+            pass
+        self.instrumentation.lap("gap", tx_done_ns)
+
+    def get_timing_stats(self) -> Dict[str, Optional[dict]]:
+        """Summary (µs) of every loop phase, tick jitter, bus work per tick and
+        the write→read gap (see kos/instrumentation.py)"""
+        return self.instrumentation.summary()
+
+    def get_health(self) -> Dict[int, dict]:
+        """Health state of every servo that ever missed a reply
+        (see kos/servo_health.py)"""
+        return self.health.summary()
+
+    def get_link_stats(self) -> Dict[int, dict]:
+        """Per-servo reply latency (µs), timeout and CRC failure rates and the
+        learned sync-read deadline (see kos/link_quality.py)"""
+        return self.link_quality.summary()
+
+    def dump_timing_stats(self):
+        """Log the phase histograms and the latest overruns"""
+        self.log.info(f"update loop timing\n{self.instrumentation.dump()}")
+
+    def bus_budget_us(self) -> float:
+        """Estimated wire time of one control tick (sync-write + sync-read)"""
+        n = len(self.actuator_ids)
+        baudrate = self.port_handler.getBaudRate()
+        return bus_timing.sync_write_us(baudrate, n, 6) + bus_timing.sync_read_us(
+            baudrate, n, self._state_struct.size - 1, self.return_delay_us
+        )
+
+    def _poll_telemetry(self, deadline_ns: int):
+        """Read telemetry of the servos that are due, while the bus time before
+        `deadline_ns` still fits another read"""
+        now = time.monotonic_ns()
+        due = [
+            aid
+            for aid in self.actuator_ids
+            if self._telemetry_next_ns.get(aid, 0) <= now
+            and not self.health.is_quarantined(aid)
+        ]
+        if not due:
+            return
+
+        wire_ns = int(
+            bus_timing.read_us(
+                self.port_handler.getBaudRate(),
+                TELEMETRY_STRUCT.size,
+                self.return_delay_us,
+            )
+            * 1_000
+        )
+        interval_ns = int(1e9 / self.telemetry_rate)
+        due.sort(key=lambda aid: self._telemetry_next_ns.get(aid, 0))
+        for actuator_id in due:
+            # host overhead dominates at high baud: budget what a read really took
+            if now + max(wire_ns, self._telemetry_read_ns) > deadline_ns:
+                break
+            data, result, error = self.packet_handler.readTxRx(
+                actuator_id, SMS_STS_PRESENT_VOLTAGE, TELEMETRY_STRUCT.size
+            )
+            done = time.monotonic_ns()
+            self._telemetry_read_ns += (done - now - self._telemetry_read_ns) // 8
+            self._telemetry_next_ns[actuator_id] = done + interval_ns
+            now = done
+            if result != COMM_SUCCESS or len(data) != TELEMETRY_STRUCT.size:
                 continue
 
-            # ── CONFIG‑GRACE CHECK ──────────────────────────────
-            in_grace = (now_ns - self.last_config_time * 1e9) < (
-                self.CONFIG_GRACE_PERIOD * 1e9
+            voltage, temperature, _, status, moving, current = (
+                TELEMETRY_STRUCT.unpack(bytes(data))
             )
+            self.telemetry[actuator_id] = {
+                "voltage": voltage / 10.0,  # V
+                "temperature": temperature,  # °C
+                "status": status,
+                "moving": bool(moving),
+                "current": REGISTER_CODEC.to_host(SMS_STS_PRESENT_CURRENT_L, current),
+                "timestamp": done / 1e9,
+            }
+            if status:
+                self._record_fault(actuator_id, FAULT_SERVO_STATUS, status)
 
-            if not in_grace and self._control_lock.acquire(blocking=False):
-                try:
-                    if self.actuator_ids:
-                        self._write_commands()
-                        time.sleep(0.002)
-                        self._read_states()
-                except Exception as e:
-                    self.log.error(f"error in update loop: {e}")
-                finally:
-                    self._control_lock.release()
-            elif not self._control_lock.locked():
-                self._read_states(ignore_errors=True)
-            
-            # else:
-            #    self.latency_tracker.reset()
-
-            # -- Schedule Next Tick --
-            next_time += PERIOD_NS
-            now_ns = time.monotonic_ns()  # refresh after work
-            sleep_ns = next_time - now_ns - SPIN_NS  # leave SPIN_NS to spin
-
-            if sleep_ns > 0:
-                # coarse sleep (GIL released)
-                time.sleep(sleep_ns / 1e9)
-
-            # fine spin – last ≤ SPIN_US
-            while time.monotonic_ns() < next_time:
-                pass  # CPU‑bound for ≤ 100 µs
-
-            over_ns = time.monotonic_ns() - next_time
-            if over_ns > 0:
-                next_time = time.monotonic_ns()
-
-            if not in_grace:
-                over_us = over_ns / 1_000  # ns → µs
-                if over_us > 5_000:
-                    self.log.error(f"hard overrun {over_us/1000:.2f} ms")
-                elif over_us > 2_000:
-                    self.log.warning(f"overrun      {over_us/1000:.2f} ms")
-                elif over_us > 500:
-                    self.log.debug(f"minor jitter {over_us/1000:.2f} ms")
+    def get_telemetry(self, actuator_id: int) -> Optional[dict]:
+        """Latest slow telemetry (voltage, temperature, status, moving, current)"""
+        telemetry = self.telemetry.get(actuator_id)
+        return dict(telemetry) if telemetry is not None else None
 
     def _get_params(self, actuator_id: int) -> dict:
         """Read current KP, KD, and acceleration parameters from a servo
@@ -597,39 +1016,23 @@ class SCSMotorController:
             Dictionary containing the current parameters, or None if read fails
         """
         try:
-            # Read KP
-            kp_result, kp_error, kp = self.packet_handler.read1ByteTxRx(
-                actuator_id, ADDR_KP
-            )
-            if kp_result != 0:
-                self.log.error(f"failed to read kp from actuator {actuator_id}")
-                return None
-
-            # Read KD
-            kd_result, kd_error, kd = self.packet_handler.read1ByteTxRx(
-                actuator_id, ADDR_KD
-            )
-            if kd_result != 0:
-                self.log.error(f"failed to read kd from actuator {actuator_id}")
-                return None
-
-            # Read Acceleration
-            acc_result, acc_error, acc = self.packet_handler.read1ByteTxRx(
-                actuator_id, SMS_STS_ACC
-            )
-            if acc_result != 0:
-                self.log.error(f"failed to read acc from actuator {actuator_id}")
+            # Read KP and KD (adjacent registers)
+            gains, result, _ = self.packet_handler.ReadRegs(actuator_id, ADDR_KP, 2)
+            if result != COMM_SUCCESS:
+                self.log.error(f"failed to read kp/kd from actuator {actuator_id}")
                 return None
+            kp, kd = gains
 
-            # Read torque enable state
-            torque_result, torque_error, torque = self.packet_handler.read1ByteTxRx(
-                actuator_id, SMS_STS_TORQUE_ENABLE
+            # Read torque enable state and acceleration (adjacent registers)
+            values, result, _ = self.packet_handler.ReadRegs(
+                actuator_id, SMS_STS_TORQUE_ENABLE, 2
             )
-            if torque_result != 0:
+            if result != COMM_SUCCESS:
                 self.log.error(
-                    f"failed to read torque enable from actuator {actuator_id}"
+                    f"failed to read torque enable/acc from actuator {actuator_id}"
                 )
                 return None
+            torque, acc = values
 
             params = {
                 "kp": kp,
@@ -653,88 +1056,202 @@ class SCSMotorController:
         """Read and display parameters for all configured actuators"""
         self.log.info("reading parameters for all actuators")
         for actuator_id in sorted(self.actuator_ids):
-            self._get_params(actuator_id)
+            with self.bus.transaction(PRIORITY_DIAGNOSTICS, est_us=4_000):
+                self._get_params(actuator_id)
 
     def _read_states(self, ignore_errors: bool = False):
         """Read current positions and velocities from all servos"""
-        current_time = time.monotonic()
-        new_positions = {}
-        new_velocities = {}
+        gsr = self.group_sync_read
+        inst = self.instrumentation
+        if not gsr.data_dict:
+            return  # every servo is quarantined
 
         # Attempt group sync read
-        scs_comm_result = self.group_sync_read.txRxPacket()
+        t = time.monotonic_ns()
+        scs_comm_result = gsr.txRxPacket()
+        t = inst.lap("read", t)
+        if scs_comm_result in (COMM_SUCCESS, COMM_RX_TIMEOUT, COMM_RX_CORRUPT):
+            self.link_quality.record_sync_read(gsr)
+            for actuator_id in self.health.update(gsr.param, gsr.received_ids):
+                self._quarantine(actuator_id)
         if scs_comm_result != 0:
+            self._sync_read_failures += 1
             if not ignore_errors:
-                self.log.error(
-                    f"GroupSyncRead: {self.packet_handler.getTxRxResult(scs_comm_result)}"
-                )
+                if self.recorder is not None:
+                    self.recorder.fault(BROADCAST_ID, FAULT_SYNC_READ, scs_comm_result)
                 for actuator_id in list(self.actuator_ids):
                     self._record_fault(
-                        actuator_id,
-                        f"{self.packet_handler.getTxRxResult(scs_comm_result)}",
-                    )
-            return
-
-        # If group sync read succeeded, check individual servos
-        for actuator_id in list(self.actuator_ids):  # Create copy to allow modification
-            data_result, error = self.group_sync_read.isAvailable(
-                actuator_id, SMS_STS_PRESENT_POSITION_L, 4
-            )
-            if data_result:
-                if error == 0:
-                    data = self.group_sync_read.getData(
-                        actuator_id, SMS_STS_PRESENT_POSITION_L, 4
+                        actuator_id, FAULT_SYNC_READ, scs_comm_result, record=False
                     )
-                    position = self.packet_handler.scs_tohost(data & 0xFFFF, 15)
-                    velocity = self.packet_handler.scs_tohost((data >> 16) & 0xFFFF, 15)
-                    new_positions[actuator_id] = position
-                    new_velocities[actuator_id] = velocity
-                else:
-                    # Data received, but servo reported an error
-                    self._record_fault(actuator_id, f"servo error code: {error}")
+                if _log_due(self._sync_read_failures):
                     self.log.error(
-                        f"Servo {actuator_id} responded with error code: {error:#04x}"
+                        f"GroupSyncRead: {self.packet_handler.getTxRxResult(scs_comm_result)}"
+                        f" ({self._sync_read_failures} in a row)"
                     )
-            else:
-                # No data received for this actuator
-                self.read_error_counts[actuator_id] = (
-                    self.read_error_counts.get(actuator_id, 0) + 1
-                )
-                self.last_error_time[actuator_id] = current_time
-                self._record_fault(actuator_id, "no data received")
-                self.log.error(
-                    f"No data received from actuator {actuator_id} (error count: {self.read_error_counts[actuator_id]})"
-                )
+            return
+        self._sync_read_failures = 0
+
+        block = gsr.data_block
+        if self._slot_block is not block:
+            # gsr.param order changed (re-layout): re-map block index → slot
+            self._slot_block = block
+            self._block_slots = [self.state_store.slot(aid) for aid in gsr.param]
+        slots = self._block_slots
+
+        store = self.state_store
+        positions, velocities, valid = store.positions, store.velocities, store.valid
+        stale = store.stale
+        timestamps, stamps = store.timestamps, gsr.stamp_dict
+        rows = self._state_struct.iter_unpack(block)
+        pos_sign, vel_sign, load_sign = POSITION_SIGN, VELOCITY_SIGN, LOAD_SIGN
+
+        store.begin_write()
+
+        if len(gsr.received_ids) == len(slots) and not self.extended_state:
+            # Fast path: every servo answered this tick
+            for actuator_id, slot, (error, position, velocity) in zip(
+                gsr.param, slots, rows
+            ):
+                if error:
+                    self._servo_error(slot, actuator_id, error)
+                    continue
+                # sign-magnitude (REGISTER_CODEC.to_host, inlined)
+                positions[slot] = -(position ^ pos_sign) if position & pos_sign else position
+                velocities[slot] = -(velocity ^ vel_sign) if velocity & vel_sign else velocity
+                timestamps[slot] = stamps[actuator_id]
+                valid[slot] = 1
+                stale[slot] = 0
+        else:
+            current_time = time.monotonic()
+            max_age = gsr.max_age_s
+            received = gsr.received_ids
+            extended = self.extended_state
+            for actuator_id, slot, fields in zip(gsr.param, slots, rows):
+                if actuator_id not in received and (
+                    current_time - stamps.get(actuator_id, 0.0) > max_age
+                ):
+                    # No data received for this actuator
+                    valid[slot] = 0
+                    self.read_error_counts[actuator_id] = (
+                        self.read_error_counts.get(actuator_id, 0) + 1
+                    )
+                    self.last_error_time[actuator_id] = current_time
+                    count = self.read_error_counts[actuator_id]
+                    self._record_fault(actuator_id, FAULT_NO_REPLY, count)
+                    if _log_due(count):
+                        self.log.error(
+                            f"No data received from actuator {actuator_id} (error count: {count})"
+                        )
+                    continue
+
+                error = fields[0]
+                if error:
+                    self._servo_error(slot, actuator_id, error)
+                    continue
+
+                position, velocity = fields[1], fields[2]
+                positions[slot] = -(position ^ pos_sign) if position & pos_sign else position
+                velocities[slot] = -(velocity ^ vel_sign) if velocity & vel_sign else velocity
+                if extended:
+                    load = fields[3]
+                    store.loads[slot] = -(load ^ load_sign) if load & load_sign else load
+                    store.voltages[slot] = fields[4]
+                    store.temperatures[slot] = fields[5]
+                timestamps[slot] = stamps[actuator_id]
+                valid[slot] = 1
+                stale[slot] = 0
+
+        t = inst.lap("decode", t)
+        store.end_write()
+
+        if self.shm_channel is not None:
+            self._publish_shm()
+        inst.lap("swap", t)
+
+    def _quarantine(self, actuator_id: int):
+        """Take a servo that stopped answering out of the sync-read; its last
+        good state stays in the store, flagged stale"""
+        self.health.quarantine(actuator_id, time.monotonic_ns())
+        self.group_sync_read.removeParam(actuator_id)
+        slot = self.state_store.slot(actuator_id)
+        if slot is not None:
+            self.state_store.begin_write()
+            self.state_store.valid[slot] = 0
+            self.state_store.stale[slot] = 1
+            self.state_store.end_write()
+        self._record_fault(actuator_id, FAULT_QUARANTINED)
+        self.log.warning(
+            f"actuator {actuator_id} quarantined after {self.health.quarantine_after} "
+            f"sync-reads without a reply; probing it in idle time"
+        )
 
-            # Write to the inactive buffer
-            inactive_positions = (
-                self._positions_b
-                if self._active_positions is self._positions_a
-                else self._positions_a
-            )
-            inactive_velocities = (
-                self._velocities_b
-                if self._active_velocities is self._velocities_a
-                else self._velocities_a
-            )
-            inactive_positions.clear()
-            inactive_positions.update(new_positions)
-            inactive_velocities.clear()
-            inactive_velocities.update(new_velocities)
+    def _probe_quarantined(self, deadline_ns: int):
+        """Probe one quarantined servo if a probe is due and a timed-out read
+        still fits before `deadline_ns`.
 
-            # Swap the active buffer
-            with self._positions_lock:
-                self._active_positions = inactive_positions
-                self._active_velocities = inactive_velocities
+        The probe reads the sync-read's state block: it only counts as
+        answered with a clean reply inside the servo's learned sync-read
+        deadline, since a servo that answers a PING can still miss every
+        sync-read.
+        """
+        now = time.monotonic_ns()
+        actuator_id = self.health.next_probe(now)
+        if actuator_id is None or now + 2 * MIN_TIMEOUT_US * 1_000 > deadline_ns:
+            return
+        length = self._state_struct.size - 1
+        data, result, error = self.packet_handler.readTxRx(
+            actuator_id, SMS_STS_PRESENT_POSITION_L, length
+        )
+        done = time.monotonic_ns()
+        answered = result == COMM_SUCCESS and not error and len(data) == length
+        limit_us = self.link_quality.deadline_us.get(actuator_id)
+        if answered and limit_us is not None and (done - now) / 1_000 > limit_us:
+            answered = False  # too slow for the sync-read
+        if self.health.probe_result(actuator_id, answered, done):
+            self.group_sync_read.addParam(actuator_id)
+            self.read_error_counts.pop(actuator_id, None)
+            if self.recorder is not None:
+                self.recorder.fault(actuator_id, FAULT_RECOVERED)
+            self.log.info(f"actuator {actuator_id} answers again; back in the sync-read")
+
+    def _servo_error(self, slot: int, actuator_id: int, error: int):
+        """Data received, but servo reported an error"""
+        self.state_store.valid[slot] = 0
+        if _log_due(self._record_fault(actuator_id, FAULT_SERVO_ERROR, error)):
+            self.log.error(f"Servo {actuator_id} responded with error code: {error:#04x}")
 
     def _write_commands(self):
         """
         Allocation‑free Sync‑WRITE.
         • Builds the payload in a pre‑allocated bytearray (`self._tx_buf`)
         • Sends a packet only if at least one position changed since the last TX
+        • Returns the number of bytes put on the wire (0 when nothing was sent)
         """
+        inst = self.instrumentation
+        t = time.monotonic_ns()
+        self._tx_len = 0
+        self._tx_start_ns = 0  # first unanswered frame of this tick handed to the port
+        self._tx_done_ns = 0  # last one returned from the port
+        if self.shm_channel is not None:
+            targets = self.shm_channel.take_targets()
+            if targets:
+                self.set_targets(targets)
+
+        tx_bytes = 0
+        trajectory_ns = 0
+        streamer = self.trajectory
+        if streamer is not None:
+            start = time.monotonic_ns()
+            tx_bytes = streamer.tick(start, int(self.period * 1e9))
+            if tx_bytes:
+                self._tx_start_ns = start
+                self._tx_done_ns = time.monotonic_ns()
+            if not streamer.active:
+                self._end_trajectory(streamer)
+            trajectory_ns = inst.lap("trajectory", start) - start
+
         if not self.torque_enabled_ids:
-            return
+            return tx_bytes
 
         # 1) Merge any newly queued target batch -------------------------------
         with self._target_positions_lock:
@@ -744,9 +1261,22 @@ class SCSMotorController:
                 self.next_position_batch = None
                 self.next_velocity_batch = None
 
+        track = self.keyframes
+        if track is not None and track.sample(time.monotonic()):
+            positions, velocities = self.last_commanded_positions, self.last_commanded_velocities
+            for aid, counts, speed in zip(track.ids, track.positions, track.speeds):
+                positions[aid] = int(counts)
+                velocities[aid] = int(speed)  # >= 1: goal speed 0 is full speed
+            self.commanded_ids.update(track.ids)
+
         write_ids = self.torque_enabled_ids & self.commanded_ids
+        if self.trajectory is not None:
+            write_ids = write_ids.difference(self.trajectory.ids)
+        now = time.monotonic_ns()
+        inst.add("merge", (now - t - trajectory_ns) / 1_000)
+        t = now
         if not write_ids:
-            return
+            return tx_bytes
 
         # 2) Serialise {id → counts} into the shared bytearray -----------------
         buf_idx = 0
@@ -778,16 +1308,74 @@ class SCSMotorController:
             buf_idx += 7
 
         if not changed:
-            return  # nothing new → no TX
+            return tx_bytes  # nothing new → no TX
 
         # 3) Fire a Sync‑WRITE with *zero* extra allocations -------------------
         #    param_length == number_of_bytes we’re sending (buf_idx)
+        tx_ns = time.monotonic_ns()
         self.packet_handler.syncWriteTxOnly(
             SMS_STS_GOAL_POSITION_L,  # start address
             6,  # bytes per servo (2 for position, 2 for time, 2 for velocity)
             memoryview(self._tx_buf)[:buf_idx],
             buf_idx,  # param_length
         )
+        self._tx_done_ns = time.monotonic_ns()
+        if not self._tx_start_ns:
+            self._tx_start_ns = tx_ns
+        self._tx_len = buf_idx
+        inst.lap("write", t)
+        return tx_bytes + bus_timing.sync_write_bytes(buf_idx // 7, 6)
+
+    def stream_trajectory(self, waypoints, segment_s: float = 0.05) -> TrajectoryStreamer:
+        """Play time-stamped waypoints [(t, {actuator_id: degrees})] with one
+        SYNC WRITE of goal position and speed per segment (see kos/trajectory.py).
+
+        The joints leave the per-tick sync-write while the trajectory runs
+        and hold its last waypoint afterwards.  Replaces any trajectory that
+        is still running.
+        """
+        unknown = set(waypoints[0][1]) - self.actuator_ids
+        if unknown:
+            raise KeyError(f"unknown actuators: {sorted(unknown)}")
+        not_enabled = set(waypoints[0][1]) - self.torque_enabled_ids
+        if not_enabled:
+            self.log.warning(f"streaming to actuators without torque: {sorted(not_enabled)}")
+
+        streamer = TrajectoryStreamer(
+            self.packet_handler,
+            waypoints,
+            lambda actuator_id, position: self._degrees_to_counts(
+                self._limit_position(actuator_id, position), offset=180.0
+            ),
+            segment_s,
+        )
+        with self._target_positions_lock:
+            if self.trajectory is not None:
+                self.trajectory.cancel()
+            self.trajectory = streamer
+        return streamer
+
+    def _end_trajectory(self, streamer: TrajectoryStreamer):
+        """Hand the joints back to the per-tick sync-write"""
+        with self._target_positions_lock:
+            if self.trajectory is streamer:
+                self.trajectory = None
+            for actuator_id in streamer.ids:
+                if streamer.finished:
+                    counts = streamer.final_counts[actuator_id]
+                    self._last_sent_pos[actuator_id] = counts  # already latched
+                else:
+                    # cancelled mid-move: hold where the joint is now
+                    sample = self.state_store.read(actuator_id)
+                    if sample is None:
+                        continue
+                    counts = sample[0]
+                    self._last_sent_pos.pop(actuator_id, None)
+                self.last_commanded_positions[actuator_id] = counts
+                self.last_commanded_velocities[actuator_id] = 0
+                self.commanded_ids.add(actuator_id)
+        if streamer.errors:
+            self.log.warning(f"trajectory finished with {streamer.errors} failed SYNC WRITEs")
 
     def _counts_to_degrees(self, counts: float, offset: float = 180.0) -> float:
         """Convert raw counts to degrees with optional offset"""
@@ -810,54 +1398,131 @@ class SCSMotorController:
                 self.next_velocity_batch = {}
 
             for actuator_id, targets in target_dict.items():
-                position = targets["position"]
-
-                # Apply angle limits if available for this actuator
-                if actuator_id in self.actuator_limits:
-                    limits = self.actuator_limits[actuator_id]
-                    original_position = position
-                    
-                    if limits['min_angle_deg'] is not None and position < limits['min_angle_deg']:
-                        position = limits['min_angle_deg']
-                        self.log.warn(f"Clipped position for actuator {actuator_id} ({limits['joint_name']}) from {original_position:.2f}° to {position:.2f}° (min limit)")
-                    
-                    if limits['max_angle_deg'] is not None and position > limits['max_angle_deg']:
-                        position = limits['max_angle_deg']
-                        self.log.warn(f"Clipped position for actuator {actuator_id} ({limits['joint_name']}) from {original_position:.2f}° to {position:.2f}° (max limit)")
+                position = self._limit_position(actuator_id, targets["position"])
 
                 self.next_position_batch[actuator_id] = self._degrees_to_counts(position, offset=180.0)
                 self.next_velocity_batch[actuator_id] = self._degrees_to_counts(targets["velocity"], offset=0.0)
                 self.commanded_ids.add(actuator_id)
 
+    def set_keyframes(self, keyframes: List[Tuple[float, Dict[int, Dict[str, float]]]]):
+        """Queue keyframes for the update loop to interpolate between.
+        Args:
+        keyframes: [(t, targets)] in time order, t in seconds from now; targets
+            maps every joint of the track to a dictionary containing:
+            - 'position': Target position in degrees
+            - 'velocity': Optional target velocity in degrees/second
+        Keyframes for a different set of joints replace the current track.
+        """
+        now = time.monotonic()
+        ids = sorted(keyframes[0][1])
+        unknown = set(ids) - self.actuator_ids
+        if unknown:
+            raise KeyError(f"unknown actuators: {sorted(unknown)}")
+
+        track = self.keyframes
+        if track is None or track.ids != ids:
+            track = KeyframeTrack(ids, lambda: [self._commanded_counts(aid) for aid in ids])
+        for t, targets in keyframes:
+            if sorted(targets) != ids:
+                raise ValueError("every keyframe must give targets for the same actuators")
+            positions = [
+                self._degrees_to_counts(self._limit_position(aid, targets[aid]["position"]), offset=180.0)
+                for aid in ids
+            ]
+            velocities = None
+            if all("velocity" in targets[aid] for aid in ids):
+                velocities = [self._degrees_to_counts(targets[aid]["velocity"], offset=0.0) for aid in ids]
+            track.push(now + t, positions, velocities)
+        self.keyframes = track
+
+    def _commanded_counts(self, actuator_id: int) -> int:
+        """Current goal of a joint: its last command, else where it is now"""
+        counts = self.last_commanded_positions.get(actuator_id)
+        if counts is None:
+            sample = self.state_store.read(actuator_id)
+            counts = sample[0] if sample is not None else 0
+        return counts
+
+    def clear_keyframes(self):
+        """Stop interpolating; the joints hold their last interpolated targets"""
+        self.keyframes = None
+
+    def _limit_position(self, actuator_id: int, position: float) -> float:
+        """Apply angle limits if available for this actuator"""
+        if actuator_id in self.actuator_limits:
+            limits = self.actuator_limits[actuator_id]
+            original_position = position
+            
+            if limits['min_angle_deg'] is not None and position < limits['min_angle_deg']:
+                position = limits['min_angle_deg']
+                self.log.warn(f"Clipped position for actuator {actuator_id} ({limits['joint_name']}) from {original_position:.2f}° to {position:.2f}° (min limit)")
+            
+            if limits['max_angle_deg'] is not None and position > limits['max_angle_deg']:
+                position = limits['max_angle_deg']
+                self.log.warn(f"Clipped position for actuator {actuator_id} ({limits['joint_name']}) from {original_position:.2f}° to {position:.2f}° (max limit)")
+        return position
+
     def get_position(self, actuator_id: int) -> Optional[float]:
         """Get current position of a specific actuator"""
-        with self._positions_lock:
-            positions = self._active_positions
-        value = positions.get(actuator_id)
+        sample = self.state_store.read(actuator_id)
         return (
-            self._counts_to_degrees(value, offset=180.0) if value is not None else None
+            self._counts_to_degrees(sample[0], offset=180.0)
+            if sample is not None
+            else None
         )
 
     def get_velocity(self, actuator_id: int) -> Optional[float]:
         """Get current velocity of a specific actuator"""
-        with self._positions_lock:
-            velocities = self._active_velocities
-        value = velocities.get(actuator_id)
-        return self._counts_to_degrees(value, offset=0.0) if value is not None else None
+        sample = self.state_store.read(actuator_id)
+        return (
+            self._counts_to_degrees(sample[1], offset=0.0)
+            if sample is not None
+            else None
+        )
 
     def get_state(self, actuator_id: int) -> Optional[dict]:
-        """Get current position and velocity of a specific actuator"""
-        with self._positions_lock:
-            positions = self._active_positions
-            velocities = self._active_velocities
-        pos = positions.get(actuator_id)
-        vel = velocities.get(actuator_id)
-        if pos is None or vel is None:
+        """Get current position and velocity of a specific actuator; "stale" is
+        True while it is quarantined and the values are its last good sample"""
+        if self.extended_state:
+            sample = self.state_store.read_extended(actuator_id)
+        else:
+            sample = self.state_store.read(actuator_id)
+        if sample is None:
             return None
-        return {
-            "position": self._counts_to_degrees(pos, offset=180.0),
-            "velocity": self._counts_to_degrees(vel, offset=0.0),
+        state = {
+            "position": self._counts_to_degrees(sample[0], offset=180.0),
+            "velocity": self._counts_to_degrees(sample[1], offset=0.0),
+            "stale": sample[-1],
         }
+        if self.extended_state:
+            state["load"] = sample[2] / 10.0  # % of max torque
+            state["voltage"] = sample[3] / 10.0  # V
+            state["temperature"] = sample[4]  # °C
+        return state
+
+    def get_states(self) -> Dict[int, Optional[dict]]:
+        """Get a consistent state of every actuator from the same update tick"""
+        snap = self.state_store.snapshot()
+        states = {}
+        for i, actuator_id in enumerate(snap.ids):
+            if not snap.valid[i] and not snap.stale[i]:
+                states[actuator_id] = None
+                continue
+            state = {
+                "position": self._counts_to_degrees(snap.positions[i], offset=180.0),
+                "velocity": self._counts_to_degrees(snap.velocities[i], offset=0.0),
+                "stale": bool(snap.stale[i]),
+            }
+            if self.extended_state:
+                state["load"] = snap.loads[i] / 10.0
+                state["voltage"] = snap.voltages[i] / 10.0
+                state["temperature"] = snap.temperatures[i]
+            states[actuator_id] = state
+        return states
+
+    def get_state_snapshot(self) -> JointStateSnapshot:
+        """Raw counts of every actuator from the same update tick (see JointStateStore)"""
+        return self.state_store.snapshot()
 
     def get_torque_enabled(self, actuator_id: int) -> bool:
         return actuator_id in self.torque_enabled_ids
@@ -870,33 +1535,43 @@ class SCSMotorController:
         self.packet_handler.LockEprom(actuator_id)
         self.log.debug("eeprom locked")
 
+    def _register_holds(self, actuator_id: int, addr: int, value: int) -> bool:
+        """True if the servo is known to already hold `value` at `addr`"""
+        if self._reg_cache.get(actuator_id, {}).get(addr) == value:
+            return True
+        # startup snapshot of volatile registers is good for one use only
+        return self._reg_snapshot.get(actuator_id, {}).pop(addr, None) == value
+
+    def _register_written(self, actuator_id: int, addr: int, value: int):
+        self._config_writes += 1
+        if addr in CACHED_REGISTER_ADDRS:
+            self._reg_cache.setdefault(actuator_id, {})[addr] = value
+            self._reg_dirty.setdefault(actuator_id, {})[addr] = value
+
     def writeReg_Verify(self, actuator_id, regAddr, value):
         """Write to a register with retries. Returns True if successful, False otherwise."""
-        reg = None
-        for r in servoRegs:
-            if r["addr"] == regAddr:
-                reg = r
-                break
-
-        if reg == None:
+        reg = REGISTER_CODEC.get(regAddr)
+        if reg is None:
             self.log.error("unknown register: " + str(regAddr))
             return False  # Return False instead of None
 
-        if reg["size"] == 2:
-            value = [
-                self.packet_handler.scs_lobyte(value),
-                self.packet_handler.scs_hibyte(value),
-            ]
-        else:
-            value = [value]
+        # Cached values are raw register words, as read back from the servo
+        raw = REGISTER_CODEC.to_raw(regAddr, value)
+
+        # Skip the write if the servo already holds this value
+        if self._register_holds(actuator_id, regAddr, raw):
+            return True
+
+        value = reg.fmt.pack(raw)
 
         retries = 3
         while retries > 0:
             comm_result, error = self.packet_handler.writeTxRx(
-                actuator_id, regAddr, reg["size"], value
+                actuator_id, regAddr, reg.size, value
             )
             if comm_result == 0:
                 # print(f"Register {regAddr} written")
+                self._register_written(actuator_id, regAddr, raw)
                 return True
             else:
                 self.log.error(
@@ -909,26 +1584,13 @@ class SCSMotorController:
 
     def writeReg(self, actuator_id, regAddr, value):
         """Write to a register with retries. Returns True if successful, False otherwise."""
-        reg = None
-        for r in servoRegs:
-            if r["addr"] == regAddr:
-                reg = r
-                break
-
-        if reg == None:
+        reg = REGISTER_CODEC.get(regAddr)
+        if reg is None:
             self.log.error("unknown register: " + str(regAddr))
             return False
 
-        if reg["size"] == 2:
-            value = [
-                self.packet_handler.scs_lobyte(value),
-                self.packet_handler.scs_hibyte(value),
-            ]
-        else:
-            value = [value]
-
         comm_result = self.packet_handler.writeTxOnly(
-            actuator_id, regAddr, reg["size"], value
+            actuator_id, regAddr, reg.size, REGISTER_CODEC.encode(regAddr, value)
         )
         if comm_result == 0:
             return True
@@ -945,48 +1607,37 @@ class SCSMotorController:
 
     def read_all_servo_params(self, actuator_id: int):
         """Read and display all relevant parameters for a servo"""
-        try:
-            with self._control_lock:
-                params = {}
-                for reg in servoRegs:
-                    try:
-                        value, comm_result, error = self.packet_handler.readTxRx(
-                            actuator_id, reg["addr"], reg["size"]
-                        )
-
-                        if comm_result == COMM_SUCCESS:
-                            if reg["size"] == 2:
-                                value = self.packet_handler.scs_tohost(
-                                    self.packet_handler.scs_makeword(
-                                        value[0], value[1]
-                                    ),
-                                    15,
-                                )
-                            else:
-                                value = value[0]
-
-                            # Special handling for Model - store the name instead of the number
-                            if reg["name"] == "Model":
-                                value = self._get_model_name(value)
-
-                            params[reg["name"]] = {"value": value, "addr": reg["addr"]}
-                        else:
-                            self.log.error(
-                                f"Read ID: {actuator_id} Register: {reg['addr']} - {self.packet_handler.getTxRxResult(comm_result)}"
-                            )
+        return self.snapshot_servo_params([actuator_id]).get(actuator_id)
 
-                    except Exception as e:
-                        self.log.error(
-                            f"error reading {reg['name']} (addr: {reg['addr']}): {str(e)}"
-                        )
-                        continue
-                return params
+    def snapshot_servo_params(self, actuator_ids) -> Dict[int, Optional[dict]]:
+        """Every register in servoRegs for several servos, read as whole EEPROM
+        and RAM blocks (see kos/register_snapshot.py).
 
-        except Exception as e:
-            self.log.error(
-                f"error reading parameters from actuator {actuator_id}: {str(e)}"
+        Returns {actuator_id: {name: {"value", "addr"}}}, None for a servo that
+        could not be read.
+        """
+        try:
+            snapshot = read_snapshot(
+                self.packet_handler,
+                REGISTER_CODEC,
+                actuator_ids,
+                transaction=lambda est_us: self.bus.transaction(PRIORITY_DIAGNOSTICS, est_us),
             )
-            return None
+        except Exception as e:
+            self.log.error(f"error reading parameters from actuators {actuator_ids}: {str(e)}")
+            return {actuator_id: None for actuator_id in actuator_ids}
+
+        for actuator_id, params in snapshot.items():
+            if params is None:
+                self.log.error(f"Read ID: {actuator_id} - no response to register snapshot")
+                continue
+            missing = [reg["name"] for reg in servoRegs if reg["name"] not in params]
+            if missing:
+                self.log.error(f"Read ID: {actuator_id} - missing registers: {', '.join(missing)}")
+            # Special handling for Model - store the name instead of the number
+            if "Model" in params:
+                params["Model"]["value"] = self._get_model_name(params["Model"]["value"])
+        return snapshot
 
     def compare_actuator_params(self, actuator_ids=None, params_to_compare=None):
         """Compare specific parameters across multiple actuators and show differences."""
@@ -1000,11 +1651,8 @@ class SCSMotorController:
             print("need at least 2 actuators to compare")
             return
 
-        # Read all parameters for specified actuators
-        actuator_params = {}
-        for aid in actuator_ids:
-            actuator_params[aid] = self.read_all_servo_params(aid)
-            time.sleep(0.1)
+        # Read all parameters for specified actuators in one snapshot
+        actuator_params = self.snapshot_servo_params(actuator_ids)
 
         # Create a mapping of parameter names to their register addresses
         reg_addresses = {reg["name"]: reg["addr"] for reg in servoRegs}
@@ -1082,31 +1730,186 @@ class SCSMotorController:
         time.sleep(0.01)
 
         self._lockEEPROM(actuator_id)
+        # the servo rewrote its offset: don't trust cached EEPROM values
+        self._reg_cache.pop(actuator_id, None)
 
         # Set the target and buffers to zero
         self.last_commanded_positions[actuator_id] = self._degrees_to_counts(
             0, offset=180.0
         )
         self.last_commanded_velocities[actuator_id] = 0
-        self._positions_a[actuator_id] = 0
-        self._positions_b[actuator_id] = 0
+        store = self.state_store
+        store.begin_write()
+        store.positions[store.slot(actuator_id)] = 0
+        store.end_write()
+
+    def discover_servos(
+        self, id_range: range, expected_ids: Optional[Set[int]] = None, force_scan: bool = False
+    ) -> list:
+        """Verify the cached topology with one sync-read; scan only if it changed.
+
+        The cache is only trusted when it contains every ID of `expected_ids`
+        (configured actuators / robot metadata): a servo added to the bus or
+        given a new ID is not in it.  `force_scan` skips the cache.
+        """
+        device = self.port_handler.getPortName()
+        baudrate = self.port_handler.getBaudRate()
+        cache = self.topology_cache
+        cached = cache.load(device, baudrate) if cache is not None and not force_scan else None
+        if cached:
+            found = self._verify_topology(cached)
+            missing = set(expected_ids or ()) - {s["id"] for s in found or ()}
+            if found is not None and not missing:
+                self.log.info(
+                    "Cached topology verified: "
+                    + ", ".join(f"[{s['id']} {s['model']}]" for s in found)
+                )
+                return found
+            if found is None:
+                self.log.info("Bus topology changed since last run, rescanning")
+            else:
+                self.log.info(
+                    f"actuators {sorted(missing)} not in the cached topology, rescanning"
+                )
+
+        found = self.scan_servos(id_range)
+        if cache is not None:
+            if found:
+                # replaces the stale entry, keeps registers of servos still there
+                cache.store(device, baudrate, found)
+            else:
+                cache.invalidate(device, baudrate)
+        return found
+
+    def _verify_topology(self, cached: list) -> Optional[list]:
+        """The cached servos if every one answers a sync-read of its model and
+        firmware with the same values, else None"""
+        group = GroupSyncRead(self.packet_handler, SERVO_INFO_ADDR, SERVO_INFO_LEN)
+        for servo in cached:
+            group.addParam(servo["id"])
+        # a partial reply is COMM_SUCCESS too: every cached servo must answer
+        if group.txRxPacket() != COMM_SUCCESS or group.received_ids != group.data_dict.keys():
+            return None
 
-    def scan_servos(self, id_range: range) -> list:
+        found = []
+        for servo in cached:
+            info = self._found_servo(servo["id"], group.data_dict[servo["id"]][1:])
+            if info["model_number"] != servo["model_number"] or (
+                servo["firmware"] is not None and info["firmware"] != servo["firmware"]
+            ):
+                return None
+            info["registers"] = servo["registers"]
+            found.append(info)
+        return found
+
+    def scan_servos(self, id_range: range, batch_size: int = 16) -> list:
+        """Find servos by sync-reading firmware and model number of `batch_size`
+        IDs at a time; a missing ID costs a share of one timeout instead of a
+        whole one.  Falls back to reading them ID by ID if nothing answers."""
         found_servos = []
-        found_strings = []
-        with tqdm(id_range, desc="Scanning servos", unit="ID") as pbar:
-            for servo_id in pbar:
-                model_number, result, error = self.packet_handler.ping(servo_id)
-                if result == 0:
-                    model_name = self._get_model_name(model_number)
-                    found_servos.append({"id": servo_id, "model": model_name})
-                    found_strings.append(f"[{servo_id} {model_name}]")
-        if found_strings:
-            self.log.info("Found servos: " + ", ".join(found_strings))
+        ids = list(id_range)
+        batches = [ids[i : i + batch_size] for i in range(0, len(ids), batch_size)]
+        with tqdm(total=len(ids), desc="Scanning servos", unit="ID") as pbar:
+            for batch in batches:
+                group = GroupSyncRead(
+                    self.packet_handler, SERVO_INFO_ADDR, SERVO_INFO_LEN
+                )
+                for servo_id in batch:
+                    group.addParam(servo_id)
+                # COMM_SUCCESS only means someone answered: use received_ids
+                if group.txRxPacket() == COMM_SUCCESS:
+                    for servo_id in sorted(group.received_ids):
+                        found_servos.append(
+                            self._found_servo(servo_id, group.data_dict[servo_id][1:])
+                        )
+                # a corrupted frame still means a servo is there: ask it alone
+                for servo_id in batch:
+                    if servo_id in group.crc_fail_dict and servo_id not in group.received_ids:
+                        servo = self._read_servo_info(servo_id)
+                        if servo is not None:
+                            found_servos.append(servo)
+                pbar.update(len(batch))
+
+        if not found_servos:
+            # servos without SYNC READ support only answer one at a time
+            self.port_handler.clearPort()
+            with tqdm(ids, desc="Scanning servos (sequential)", unit="ID") as pbar:
+                for servo_id in pbar:
+                    servo = self._read_servo_info(servo_id)
+                    if servo is not None:
+                        found_servos.append(servo)
+
+        if found_servos:
+            self.log.info(
+                "Found servos: "
+                + ", ".join(f"[{s['id']} {s['model']}]" for s in found_servos)
+            )
         else:
             self.log.info("No servos found.")
         return found_servos
 
+    def _read_servo_info(self, servo_id: int) -> Optional[dict]:
+        """Discovery entry of one servo, read on its own; None if it does not
+        answer.  One READ both proves the ID is there and gets its model."""
+        data, result, _ = self.packet_handler.readTxRx(
+            servo_id, SERVO_INFO_ADDR, SERVO_INFO_LEN
+        )
+        if result == COMM_SUCCESS and len(data) == SERVO_INFO_LEN:
+            return self._found_servo(servo_id, data)
+        return None
+
+    def _found_servo(self, servo_id: int, info) -> dict:
+        """Discovery entry from the SERVO_INFO_ADDR block of a servo"""
+        model_number = REGISTER_CODEC.decode(
+            SMS_STS_MODEL_L, bytes(info), SMS_STS_MODEL_L - SERVO_INFO_ADDR
+        )
+        return {
+            "id": servo_id,
+            "model": self._get_model_name(model_number),
+            "model_number": model_number,
+            "firmware": (info[0], info[1]),
+        }
+
+    def _snapshot_registers(self, servos: list, batch_size: int = 8):
+        """Read the live value of every cached and default-configured register
+        so configuration only rewrites the ones that differ"""
+        sizes = REGISTER_CODEC.sizes()
+        wanted = {}
+        for servo in servos:
+            if servo["id"] in self.actuator_ids:
+                addrs = set(servo.get("registers", {})) | set(DEFAULT_CONFIG_ADDRS)
+                wanted[servo["id"]] = sorted(a for a in addrs if a in sizes)
+        if not wanted:
+            return
+
+        start = min(addrs[0] for addrs in wanted.values())
+        end = max(addrs[-1] + sizes[addrs[-1]] for addrs in wanted.values())
+        ids = sorted(wanted)
+        for i in range(0, len(ids), batch_size):
+            group = GroupSyncRead(self.packet_handler, start, end - start)
+            for actuator_id in ids[i : i + batch_size]:
+                group.addParam(actuator_id)
+            if group.txRxPacket() != COMM_SUCCESS:
+                continue
+            for actuator_id in group.received_ids:
+                for addr in wanted[actuator_id]:
+                    value = group.getData(actuator_id, addr, sizes[addr])
+                    if addr in CACHED_REGISTER_ADDRS:
+                        self._reg_cache.setdefault(actuator_id, {})[addr] = value
+                    else:
+                        self._reg_snapshot.setdefault(actuator_id, {})[addr] = value
+        self.log.info(f"register snapshot of {len(self._reg_cache)} actuators")
+
+    def _save_register_cache(self):
+        """Persist registers written since the last save"""
+        if self._reg_dirty and self.topology_cache is not None:
+            self.topology_cache.store_registers(
+                self.port_handler.getPortName(),
+                self.port_handler.getBaudRate(),
+                self._reg_dirty,
+            )
+        self._reg_dirty = {}
+
     def change_baudrate(self, raw_baud: int) -> bool:
         """
         Set bus speed by passing the actual baud rate.
@@ -1131,8 +1934,11 @@ class SCSMotorController:
         self.log.info(f"idx: {idx}")
         success = True
 
-        with self._control_lock:
-            for aid in sorted(self.actuator_ids):
+        # one transaction for the whole change: no control tick may run while
+        # part of the bus is on the new baud rate and part on the old one
+        ids = sorted(self.actuator_ids)
+        with self.bus.transaction(PRIORITY_CONFIG, est_us=len(ids) * 30_000):
+            for aid in ids:
                 self.log.info(f"Changing baudrate for actuator {aid} to {raw_baud}")
                 # unlock EEPROM
                 self._unlockEEPROM(aid)
@@ -1148,6 +1954,10 @@ class SCSMotorController:
                 self._lockEEPROM(aid)
                 time.sleep(0.01)
 
+            # misses and timings learned at the old baud rate no longer apply
+            for aid in ids:
+                self._reset_link_state(aid)
+
         return success
 
     def change_id(self, current_id: int, new_id: int) -> bool:
@@ -1167,19 +1977,21 @@ class SCSMotorController:
         self.log.info(f"Changing servo ID from {current_id} to {new_id}")
         success = True
 
-        with self._control_lock:
-            # unlock EEPROM
+        # unlock EEPROM
+        with self.bus.transaction(PRIORITY_CONFIG):
             self._unlockEEPROM(current_id)
-            time.sleep(0.01)
+        time.sleep(0.01)
 
-            # write new ID
+        # write new ID
+        with self.bus.transaction(PRIORITY_CONFIG):
             if not self.writeReg_Verify(current_id, SMS_STS_ID, new_id):
                 self.log.error(f"Failed to write new ID {new_id} to servo {current_id}")
                 success = False
 
-            time.sleep(0.01)
-            # lock EEPROM again
+        time.sleep(0.01)
+        # lock EEPROM again
+        with self.bus.transaction(PRIORITY_CONFIG):
             self._lockEEPROM(current_id)
-            time.sleep(0.01)
+        time.sleep(0.01)
 
         return success
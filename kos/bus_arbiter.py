@@ -0,0 +1,149 @@
+"""
+Prioritized access to one half-duplex servo bus.
+
+The control loop owns the bus: each tick it takes the bus for its own
+sync-write/sync-read (never skipping a tick because someone else holds
+it), polls telemetry, and then calls ``serve()`` with the time left before
+the next tick.  Other threads wrap their transactions in
+``transaction(priority, est_us)`` and are let onto the bus in that leftover
+window, highest priority first, for as long as their estimates fit:
+
+    with controller.bus.transaction(PRIORITY_DIAGNOSTICS, est_us=2_000):
+        packet_handler.readTxRx(...)
+
+A transaction always finishes before the control loop takes the bus
+again; an estimate that is too low delays the next tick instead of
+dropping it.  The first waiting transaction of a window is admitted even
+if its estimate does not fit, so long operations still make progress.
+
+Before the control loop starts (and after it stops) transactions are
+granted as soon as the bus is free, still in priority order.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+PRIORITY_CONTROL = 0
+PRIORITY_TELEMETRY = 1
+PRIORITY_CONFIG = 2
+PRIORITY_DIAGNOSTICS = 3
+
+PRIORITY_NAMES = {
+    PRIORITY_CONTROL: "control",
+    PRIORITY_TELEMETRY: "telemetry",
+    PRIORITY_CONFIG: "config",
+    PRIORITY_DIAGNOSTICS: "diagnostics",
+}
+
+DEFAULT_EST_US = 1_000
+
+
+class _Request:
+    __slots__ = ("priority", "est_ns", "granted")
+
+    def __init__(self, priority: int, est_us: float):
+        self.priority = priority
+        self.est_ns = int(est_us * 1_000)
+        self.granted = False
+
+
+class BusArbiter:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._busy = False
+        self._scheduled = False  # a control loop hands out leftover time
+        self._queue = []  # heap of (priority, seq, request)
+        self._seq = itertools.count()
+        self.granted: Dict[int, int] = {p: 0 for p in PRIORITY_NAMES}
+        self.max_wait_us: Dict[int, float] = {p: 0.0 for p in PRIORITY_NAMES}
+
+    # -- control loop side ----------------------------------------------------
+
+    def start_scheduling(self):
+        """From now on lower priorities only run inside serve() windows"""
+        with self._cond:
+            self._scheduled = True
+
+    def stop_scheduling(self):
+        with self._cond:
+            self._scheduled = False
+            self._grant_next()
+
+    @contextmanager
+    def control(self):
+        """Hold the bus for one control tick; waits only for a transaction
+        that is already on the wire"""
+        with self._cond:
+            while self._busy:
+                self._cond.wait()
+            self._busy = True
+        try:
+            yield
+        finally:
+            self._release()
+
+    def serve(self, deadline_ns: int) -> int:
+        """Let waiting transactions run until `deadline_ns` (monotonic);
+        returns how many ran"""
+        served = 0
+        with self._cond:
+            while self._queue and not self._busy:
+                request = self._queue[0][2]
+                now = time.monotonic_ns()
+                if now >= deadline_ns:
+                    break
+                if served and now + request.est_ns > deadline_ns:
+                    break
+                heapq.heappop(self._queue)
+                self._grant(request)
+                served += 1
+                while self._busy:
+                    self._cond.wait()
+        return served
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    # -- everyone else --------------------------------------------------------
+
+    @contextmanager
+    def transaction(self, priority: int = PRIORITY_DIAGNOSTICS, est_us: float = DEFAULT_EST_US):
+        """Hold the bus for a few transactions of class `priority`, expected to
+        take about `est_us` µs of bus time"""
+        request = _Request(priority, est_us)
+        start_ns = time.monotonic_ns()
+        with self._cond:
+            if not self._busy and not self._scheduled and not self._queue:
+                self._grant(request)
+            else:
+                heapq.heappush(self._queue, (priority, next(self._seq), request))
+                while not request.granted:
+                    self._cond.wait()
+        wait_us = (time.monotonic_ns() - start_ns) / 1_000
+        if wait_us > self.max_wait_us[priority]:
+            self.max_wait_us[priority] = wait_us
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _grant(self, request: _Request):
+        self._busy = True
+        request.granted = True
+        self.granted[request.priority] += 1
+        self._cond.notify_all()
+
+    def _grant_next(self):
+        if not self._busy and not self._scheduled and self._queue:
+            self._grant(heapq.heappop(self._queue)[2])
+
+    def _release(self):
+        with self._cond:
+            self._busy = False
+            self._grant_next()
+            self._cond.notify_all()
@@ -0,0 +1,162 @@
+"""
+Last-known bus topology and servo configuration, for warm starts.
+
+The cache is a small JSON file keyed by "<device>@<baudrate>".  Each entry
+lists the servos found by the last full scan with their model number,
+firmware version and the configuration registers the controller last
+wrote to them, so startup can verify the layout with one sync-read and
+only rewrite registers whose live value differs.
+
+Several controllers (one per bus, see kos/multi_bus.py) may share one
+cache file, from threads or from separate processes: every update holds
+a process-wide lock plus an flock on "<path>.lock" from read to replace,
+and writes through its own temporary file.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: the in-process lock only
+    fcntl = None
+
+from loguru import logger
+
+DEFAULT_TOPOLOGY_CACHE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "kos",
+    "feetech_topology.json",
+)
+
+
+class TopologyCache:
+    _lock = threading.Lock()  # shared by every instance in this process
+
+    def __init__(self, path: str = DEFAULT_TOPOLOGY_CACHE):
+        self.path = path
+
+    @staticmethod
+    def _key(device: str, baudrate: int) -> str:
+        return f"{device}@{baudrate}"
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"ignoring unreadable topology cache {self.path}: {e}")
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _make_directory(self) -> str:
+        """Create the cache's directory (the working directory for a bare
+        file name) and return it"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    @contextmanager
+    def _update(self):
+        """Hold the cache for a read → modify → write"""
+        with self._lock:
+            lock_file = None
+            if fcntl is not None:
+                try:
+                    self._make_directory()
+                    lock_file = open(f"{self.path}.lock", "a")
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                except OSError as e:
+                    logger.warning(f"could not lock topology cache {self.path}: {e}")
+            try:
+                yield
+            finally:
+                if lock_file is not None:
+                    lock_file.close()  # releases the flock
+
+    def _write(self, data: dict):
+        tmp = None
+        try:
+            directory = self._make_directory()
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix=".topology-", suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.path)
+            tmp = None
+        except OSError as e:
+            logger.warning(f"could not write topology cache {self.path}: {e}")
+        finally:
+            if tmp is not None:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+
+    def load(self, device: str, baudrate: int) -> Optional[List[dict]]:
+        """Servos last seen on this bus, or None if it was never scanned.
+
+        Each servo is {"id", "model_number", "firmware": (major, minor) or
+        None, "registers": {addr: value}}.
+        """
+        entries = self._read().get(self._key(device, baudrate))
+        if not entries:
+            return None
+        try:
+            return [
+                {
+                    "id": int(e["id"]),
+                    "model_number": int(e["model_number"]),
+                    "firmware": tuple(e["firmware"]) if e.get("firmware") else None,
+                    "registers": {
+                        int(addr): int(value)
+                        for addr, value in e.get("registers", {}).items()
+                    },
+                }
+                for e in entries
+            ]
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def store(self, device: str, baudrate: int, servos: List[dict]):
+        """Replace this bus's entry with a fresh scan, keeping cached registers
+        of servos that are still present"""
+        with self._update():
+            data = self._read()
+            key = self._key(device, baudrate)
+            old = {e.get("id"): e.get("registers", {}) for e in data.get(key) or []}
+            data[key] = [
+                {
+                    "id": s["id"],
+                    "model_number": s["model_number"],
+                    "firmware": list(s["firmware"]) if s.get("firmware") else None,
+                    "registers": old.get(s["id"], {}),
+                }
+                for s in servos
+            ]
+            self._write(data)
+
+    def store_registers(self, device: str, baudrate: int, registers: Dict[int, Dict[int, int]]):
+        """Merge {id: {addr: value}} into the cached servos' registers"""
+        with self._update():
+            data = self._read()
+            entries = data.get(self._key(device, baudrate))
+            if not entries:
+                return
+            for entry in entries:
+                values = registers.get(entry.get("id"))
+                if values:
+                    cached = entry.setdefault("registers", {})
+                    cached.update({str(addr): value for addr, value in values.items()})
+            self._write(data)
+
+    def invalidate(self, device: str, baudrate: int):
+        with self._update():
+            data = self._read()
+            if data.pop(self._key(device, baudrate), None) is not None:
+                self._write(data)
@@ -0,0 +1,106 @@
+"""
+Batched register configuration over SYNC WRITE / SYNC READ.
+
+Pending register changes are collected per servo, merged into contiguous
+byte runs, and servos that need the same run share one SYNC WRITE.  A
+single SYNC READ over the span of everything written then verifies all
+servos at once.  Reconfiguring kp/kd/acceleration/torque on a whole robot
+takes two writes and one read instead of four write round trips per servo.
+"""
+
+from typing import Dict, List, Tuple
+
+from .feetech import COMM_SUCCESS, GroupSyncRead
+from .feetech.register_codec import RegisterCodec
+
+
+class ConfigBatch:
+    def __init__(self, packet_handler, codec: RegisterCodec, verify_batch: int = 8):
+        """
+        codec          : compiled register table; values are encoded with it
+        verify_batch   : servos per verification SYNC READ, so the replies fit
+                         in one packet timeout
+        """
+        self.ph = packet_handler
+        self.codec = codec
+        self.verify_batch = verify_batch
+        self.pending: Dict[int, Dict[int, int]] = {}  # id → {addr: value}
+
+    def set(self, actuator_id: int, addr: int, value: int):
+        if addr not in self.codec:
+            raise KeyError(f"unknown register: {addr}")
+        self.pending.setdefault(actuator_id, {})[addr] = value
+
+    def __len__(self):
+        return sum(len(regs) for regs in self.pending.values())
+
+    def _bytes_of(self, regs: Dict[int, int]) -> Dict[int, int]:
+        out = {}
+        for addr, value in regs.items():
+            out.update(enumerate(self.codec.encode(addr, value), addr))
+        return out
+
+    @staticmethod
+    def _runs(addrs: List[int]) -> List[Tuple[int, int]]:
+        """Sorted byte addresses → [(start, length)] of contiguous runs"""
+        runs = []
+        for addr in sorted(addrs):
+            if runs and runs[-1][0] + runs[-1][1] == addr:
+                runs[-1] = (runs[-1][0], runs[-1][1] + 1)
+            else:
+                runs.append((addr, 1))
+        return runs
+
+    def plan(self) -> Dict[Tuple[int, int], List[int]]:
+        """(start, length) run → ids that write it, in one SYNC WRITE each"""
+        groups: Dict[Tuple[int, int], List[int]] = {}
+        for actuator_id, regs in sorted(self.pending.items()):
+            for run in self._runs(list(self._bytes_of(regs))):
+                groups.setdefault(run, []).append(actuator_id)
+        return groups
+
+    def commit(self, verify: bool = True) -> Dict[int, bool]:
+        """Write everything pending; returns id → True when every register of
+        that servo reads back as written (or was sent, with verify=False)"""
+        if not self.pending:
+            return {}
+        data = {aid: self._bytes_of(regs) for aid, regs in self.pending.items()}
+        sent = {aid: True for aid in self.pending}
+
+        for (start, length), ids in self.plan().items():
+            param = bytearray()
+            for actuator_id in ids:
+                param.append(actuator_id)
+                param.extend(data[actuator_id][start + i] for i in range(length))
+            result = self.ph.syncWriteTxOnly(start, length, param, len(param))
+            if result != COMM_SUCCESS:
+                for actuator_id in ids:
+                    sent[actuator_id] = False
+
+        if not verify:
+            self.pending = {}
+            return sent
+
+        ok = self.verify(data)
+        self.pending = {}
+        return {aid: sent[aid] and ok.get(aid, False) for aid in sent}
+
+    def verify(self, data: Dict[int, Dict[int, int]]) -> Dict[int, bool]:
+        """One SYNC READ (per verify_batch servos) over the span of all bytes"""
+        start = min(min(b) for b in data.values())
+        end = max(max(b) for b in data.values()) + 1
+        ids = sorted(data)
+        ok = {}
+        for i in range(0, len(ids), self.verify_batch):
+            group = GroupSyncRead(self.ph, start, end - start)
+            for actuator_id in ids[i : i + self.verify_batch]:
+                group.addParam(actuator_id)
+            if group.txRxPacket() != COMM_SUCCESS:
+                continue
+            for actuator_id in group.received_ids:
+                frame = group.data_dict[actuator_id]  # error byte + data
+                ok[actuator_id] = all(
+                    frame[1 + addr - start] == byte
+                    for addr, byte in data[actuator_id].items()
+                )
+        return ok
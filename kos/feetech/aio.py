@@ -0,0 +1,317 @@
+#!/usr/bin/env python
+"""
+asyncio transport and client for the Feetech SMS/STS bus.
+
+``AsyncTransport`` watches an open ``PortHandler``'s file descriptor with
+``loop.add_reader`` and parses status packets as bytes arrive, so waiting
+for a reply suspends the coroutine instead of a thread.  ``AsyncServoBus``
+puts the usual instructions on top as awaitables:
+
+    bus = AsyncServoBus(port_handler)
+    await bus.open()
+    data, result, error = await bus.read(1, SMS_STS_PRESENT_POSITION_L, 4)
+    states, result, errors = await bus.sync_read(SMS_STS_PRESENT_POSITION_L, 4, ids)
+    bus.close()
+
+Results use the blocking SDK's conventions (COMM_* codes, servo error
+byte).  Every call takes an optional ``timeout`` in seconds; by default it
+is the wire time of the expected reply clamped like
+``PortHandler.setPacketTimeout``.  A reply that does not complete before
+the deadline yields COMM_RX_TIMEOUT (nothing arrived) or COMM_RX_CORRUPT
+(partial frame).
+
+One transaction is on the wire at a time (the bus is half-duplex);
+concurrent callers queue on a lock in call order.  The port must not be
+used by blocking code at the same time.
+"""
+
+import asyncio
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+from .scservo_def import *
+from .port_handler import LATENCY_TIMER_US, MAX_BUSY_US, MIN_TIMEOUT_US
+from .protocol_packet_handler import (
+    CHK_LEN,
+    ERR_LEN,
+    ERR_MASK_MAX,
+    HDR_BYTE,
+    HEADER,
+    ID_BROADCAST_MAX,
+    MIN_FRAME_LEN,
+    PKT_ERROR,
+    PKT_ID,
+    PKT_LENGTH,
+    PKT_PARAMETER0,
+    RXPACKET_MAX_LEN,
+    TXPACKET_MAX_LEN,
+)
+from . import bus_timing
+
+EEPROM_WRITE_EXTRA_S = 0.1  # servo commits EEPROM before answering (see txRxPacket)
+EEPROM_END = 32
+READ_CHUNK = 4096
+
+
+def build_packet(scs_id: int, instruction: int, params=b"") -> bytes:
+    """FF FF ID LEN INST params CHK"""
+    body = bytes((scs_id, len(params) + 2, instruction)) + bytes(params)
+    return HEADER + body + bytes((~sum(body) & 0xFF,))
+
+
+class AsyncTransport:
+    """Frame-level reader/writer on a PortHandler's file descriptor"""
+
+    def __init__(self, port_handler, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.port_handler = port_handler
+        self.loop = loop
+        self._buf = bytearray()
+        self._waiter: Optional[asyncio.Future] = None
+        self._fd = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._fd is not None
+
+    def open(self):
+        if self._fd is not None:
+            return
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+        if not self.port_handler.is_open and not self.port_handler.openPort():
+            raise OSError(f"failed to open {self.port_handler.getPortName()}")
+        fd = self.port_handler.fileno()
+        if fd is None:
+            raise OSError(f"{self.port_handler.getPortName()}: no pollable file descriptor")
+        self.loop.add_reader(fd, self._on_readable)
+        self._fd = fd
+
+    def close(self):
+        if self._fd is None:
+            return
+        self.loop.remove_reader(self._fd)
+        self._fd = None
+        self._wake()
+
+    def _on_readable(self):
+        try:
+            chunk = os.read(self._fd, READ_CHUNK)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            self._wake(e)
+            return
+        if chunk:
+            self._buf += chunk
+            self._wake()
+
+    def _wake(self, exc: Optional[BaseException] = None):
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            if exc is None:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(exc)
+
+    def send(self, packet: bytes) -> int:
+        """Drop stale input and write one instruction packet"""
+        if len(packet) > TXPACKET_MAX_LEN:
+            return COMM_TX_ERROR
+        self._buf.clear()
+        written = self.port_handler.writePort(packet)
+        return COMM_SUCCESS if written == len(packet) else COMM_TX_FAIL
+
+    def _take_frame(self) -> Optional[Tuple[bytes, int]]:
+        """(frame, result) of the first complete status packet in the buffer,
+        resyncing past garbage the way rxPacket() does; None if incomplete"""
+        buf = self._buf
+        while True:
+            start = buf.find(HEADER)
+            if start < 0:
+                # keep a trailing 0xFF, it may be half of the next header
+                del buf[: len(buf) - 1 if buf and buf[-1] == HDR_BYTE else len(buf)]
+                return None
+            if start:
+                del buf[:start]
+            if len(buf) < MIN_FRAME_LEN:
+                return None
+            pkt_len = buf[PKT_LENGTH]
+            if (
+                buf[PKT_ID] > ID_BROADCAST_MAX
+                or pkt_len > RXPACKET_MAX_LEN
+                or pkt_len < ERR_LEN + CHK_LEN
+                or buf[PKT_ERROR] > ERR_MASK_MAX
+            ):
+                del buf[:1]  # drop first 0xFF and look for the next header
+                continue
+            total = 4 + pkt_len
+            if len(buf) < total:
+                return None
+            frame = bytes(buf[:total])
+            del buf[:total]
+            ok = frame[-1] == (~sum(frame[2:-1]) & 0xFF)
+            return frame, COMM_SUCCESS if ok else COMM_RX_CORRUPT
+
+    async def receive(self, deadline: float) -> Tuple[Optional[bytes], int]:
+        """Next status packet, or (None, COMM_RX_TIMEOUT/COMM_RX_CORRUPT) once
+        loop.time() passes `deadline`"""
+        loop = self.loop
+        while True:
+            taken = self._take_frame()
+            if taken is not None:
+                return taken
+            if self._fd is None:
+                return None, COMM_RX_FAIL
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None, COMM_RX_CORRUPT if self._buf else COMM_RX_TIMEOUT
+            self._waiter = loop.create_future()
+            handle = loop.call_later(remaining, self._wake)
+            try:
+                await self._waiter
+            finally:
+                handle.cancel()
+                self._waiter = None
+
+
+class AsyncServoBus:
+    """Awaitable ping/read/write/sync_read/sync_write on one bus"""
+
+    def __init__(self, port_handler, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.port_handler = port_handler
+        self.transport = AsyncTransport(port_handler, loop)
+        self._lock = asyncio.Lock()
+        self.return_delay_us = 0.0
+
+    async def open(self):
+        self.transport.open()
+
+    def close(self):
+        self.transport.close()
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    # -- deadlines ------------------------------------------------------------
+
+    def reply_timeout(self, reply_bytes: int, servo_count: int = 1) -> float:
+        """Seconds to wait for `reply_bytes` of status packets, clamped like
+        PortHandler.setPacketTimeout"""
+        us = reply_bytes * bus_timing.byte_time_us(self.port_handler.getBaudRate())
+        us += servo_count * self.return_delay_us + LATENCY_TIMER_US
+        return min(max(us, MIN_TIMEOUT_US), MAX_BUSY_US) / 1_000_000.0
+
+    async def _transact(self, scs_id: int, packet: bytes, timeout: float):
+        """Send `packet` and await the reply from `scs_id`: (frame, result, error)"""
+        async with self._lock:
+            result = self.transport.send(packet)
+            if result != COMM_SUCCESS:
+                return None, result, 0
+            deadline = self.transport.loop.time() + timeout
+            while True:
+                frame, result = await self.transport.receive(deadline)
+                if result != COMM_SUCCESS:
+                    return None, result, 0
+                if frame[PKT_ID] == scs_id:
+                    return frame, result, frame[PKT_ERROR]
+
+    # -- instructions ---------------------------------------------------------
+
+    async def ping(self, scs_id: int, timeout: Optional[float] = None):
+        """(model_number, result, error), like protocol_packet_handler.ping"""
+        if scs_id >= BROADCAST_ID:
+            return 0, COMM_NOT_AVAILABLE, 0
+        timeout = timeout if timeout is not None else self.reply_timeout(MIN_FRAME_LEN)
+        _, result, error = await self._transact(
+            scs_id, build_packet(scs_id, INST_PING), timeout
+        )
+        if result != COMM_SUCCESS:
+            return 0, result, error
+        data, result, error = await self.read(scs_id, 3, 2, timeout)  # Address 3 : Model Number
+        if result != COMM_SUCCESS:
+            return 0, result, error
+        return data[0] | (data[1] << 8), result, error
+
+    async def read(self, scs_id: int, address: int, length: int, timeout: Optional[float] = None):
+        """(data bytes, result, error)"""
+        if timeout is None:
+            timeout = self.reply_timeout(bus_timing.status_bytes(length))
+        frame, result, error = await self._transact(
+            scs_id, build_packet(scs_id, INST_READ, (address, length)), timeout
+        )
+        if result != COMM_SUCCESS:
+            return b"", result, error
+        data = frame[PKT_PARAMETER0 : PKT_PARAMETER0 + length]
+        if len(data) != length:
+            return b"", COMM_RX_CORRUPT, error
+        return data, result, error
+
+    async def write(self, scs_id: int, address: int, data, timeout: Optional[float] = None):
+        """(result, error); a broadcast write does not wait for a reply"""
+        packet = build_packet(scs_id, INST_WRITE, bytes((address,)) + bytes(data))
+        if scs_id == BROADCAST_ID:
+            async with self._lock:
+                return self.transport.send(packet), 0
+        if timeout is None:
+            timeout = self.reply_timeout(MIN_FRAME_LEN)
+            if address < EEPROM_END:
+                timeout += EEPROM_WRITE_EXTRA_S
+        _, result, error = await self._transact(scs_id, packet, timeout)
+        return result, error
+
+    async def sync_read(
+        self,
+        address: int,
+        length: int,
+        ids: Iterable[int],
+        timeout: Optional[float] = None,
+    ):
+        """({id: data bytes}, result, {id: error}) for every servo that answered.
+
+        result is COMM_SUCCESS only when all of them did; servos answer in
+        request order, so the call returns as soon as the last one has.
+        """
+        ids = list(ids)
+        if timeout is None:
+            timeout = self.reply_timeout(len(ids) * bus_timing.status_bytes(length), len(ids))
+        packet = build_packet(BROADCAST_ID, INST_SYNC_READ, bytes((address, length, *ids)))
+        data: Dict[int, bytes] = {}
+        errors: Dict[int, int] = {}
+        async with self._lock:
+            result = self.transport.send(packet)
+            if result != COMM_SUCCESS:
+                return data, result, errors
+            deadline = self.transport.loop.time() + timeout
+            pending = set(ids)
+            while pending:
+                frame, result = await self.transport.receive(deadline)
+                if frame is None:
+                    break  # timed out
+                scs_id = frame[PKT_ID]
+                payload = frame[PKT_PARAMETER0 : PKT_PARAMETER0 + length]
+                if result != COMM_SUCCESS or scs_id not in pending or len(payload) != length:
+                    continue
+                pending.discard(scs_id)
+                data[scs_id] = payload
+                errors[scs_id] = frame[PKT_ERROR]
+        if not pending:
+            result = COMM_SUCCESS
+        elif result == COMM_SUCCESS:
+            result = COMM_RX_CORRUPT
+        return data, result, errors
+
+    async def sync_write(self, address: int, length: int, values: Dict[int, bytes]) -> int:
+        """One SYNC WRITE of `length` bytes per servo; no reply"""
+        params = bytearray((address, length))
+        for scs_id, value in values.items():
+            value = bytes(value)
+            if len(value) != length:
+                return COMM_TX_ERROR
+            params.append(scs_id)
+            params += value
+        async with self._lock:
+            return self.transport.send(build_packet(BROADCAST_ID, INST_SYNC_WRITE, params))
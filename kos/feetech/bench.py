@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+"""
+Bus-level throughput/latency benchmark for the feetech protocol stack.
+
+Drives the packet handler against a ``VirtualBus`` and reports, per
+transaction type and baud rate, transactions/s, round-trip latency
+percentiles and CPU time per transaction as JSON:
+
+    python -m kos.feetech.bench --bauds 250000,500000,1000000 --output bench.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import traceback
+
+from .scservo_def import *
+from .port_handler import PortHandler
+from .sms_sts import *
+from .group_sync_read import GroupSyncRead
+from .virtual_bus import VirtualBus, VirtualServo
+
+DEFAULT_BAUDS = (250_000, 500_000, 1_000_000)
+DEFAULT_IDS = tuple(range(31, 36)) + tuple(range(41, 46))
+
+
+class BenchContext:
+    """Open port/handler pair plus the pre-built payloads each benchmark needs."""
+
+    def __init__(self, port_name, baudrate, ids):
+        self.ids = list(ids)
+        self.port = PortHandler(port_name)
+        self.port.baudrate = baudrate
+        if not self.port.openPort():
+            raise RuntimeError(f"failed to open {port_name}")
+        self.ph = sms_sts(self.port)
+
+        self.group = GroupSyncRead(self.ph, SMS_STS_PRESENT_POSITION_L, 4)
+        for scs_id in self.ids:
+            self.group.addParam(scs_id)
+
+        self.sync_write_param = bytearray()
+        for scs_id in self.ids:
+            self.sync_write_param.extend((scs_id, 0x00, 0x08, 0, 0, 0, 0))
+
+    def close(self):
+        self.port.closePort()
+
+
+def _ping(ctx):
+    return ctx.ph.ping(ctx.ids[0])[1]
+
+
+def _read(ctx):
+    return ctx.ph.readTxRx(ctx.ids[0], SMS_STS_PRESENT_POSITION_L, 4)[1]
+
+
+def _write(ctx):
+    return ctx.ph.writeTxRx(ctx.ids[0], SMS_STS_GOAL_POSITION_L, 2, [0x00, 0x08])[0]
+
+
+def _sync_read(ctx):
+    result = ctx.ph.syncReadTx(SMS_STS_PRESENT_POSITION_L, 4, ctx.ids, len(ctx.ids))
+    if result != COMM_SUCCESS:
+        return result
+    return ctx.ph.syncReadRx(4, len(ctx.ids))[0]
+
+
+def _sync_write(ctx):
+    param = ctx.sync_write_param
+    return ctx.ph.syncWriteTxOnly(SMS_STS_GOAL_POSITION_L, 6, param, len(param))
+
+
+def _group_sync_read(ctx):
+    result = ctx.group.txRxPacket()
+    if result == COMM_SUCCESS and not ctx.group.last_result:
+        return COMM_RX_TIMEOUT  # partial reply: some servo never answered
+    return result
+
+
+BENCHMARKS = {
+    "ping": _ping,
+    "readTxRx": _read,
+    "writeTxRx": _write,
+    "syncReadTx+syncReadRx": _sync_read,
+    "syncWriteTxOnly": _sync_write,
+    "GroupSyncRead.txRxPacket": _group_sync_read,
+}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = int(round(pct / 100.0 * (len(sorted_values) - 1)))
+    return sorted_values[rank]
+
+
+EXCEPTION_RESULT = "exception"
+
+
+def _call(ctx, fn, exceptions):
+    # a late status packet can be matched to the wrong request and leave the
+    # SDK indexing an empty payload.  That is not a comm error: count it in
+    # `exceptions` (by type and message), with the traceback printed the
+    # first time, so a real bug in the code under test stays visible
+    try:
+        return fn(ctx)
+    except (IndexError, TypeError) as e:
+        key = f"{type(e).__name__}: {e}"
+        if key not in exceptions:
+            traceback.print_exc(file=sys.stderr)
+        exceptions[key] = exceptions.get(key, 0) + 1
+        return EXCEPTION_RESULT
+
+
+def _settle(ctx, settle_s):
+    """Let late status bytes land, then drop them so they can't be matched to
+    the next request.  Returns the nanoseconds spent."""
+    t0 = time.perf_counter_ns()
+    time.sleep(settle_s)
+    ctx.port.ser.reset_input_buffer()
+    return time.perf_counter_ns() - t0
+
+
+def run_benchmark(ctx, fn, iterations, warmup=20, settle_s=0.005):
+    exceptions = {}
+    for _ in range(warmup):
+        if _call(ctx, fn, exceptions) != COMM_SUCCESS:
+            _settle(ctx, settle_s)
+
+    latencies_us = []
+    errors = {}
+    exceptions = {}
+    settle_ns = 0
+    cpu_start = time.thread_time_ns()
+    wall_start = time.perf_counter_ns()
+    for _ in range(iterations):
+        t0 = time.perf_counter_ns()
+        result = _call(ctx, fn, exceptions)
+        latencies_us.append((time.perf_counter_ns() - t0) / 1_000.0)
+        if result != COMM_SUCCESS:
+            if result != EXCEPTION_RESULT:
+                errors[result] = errors.get(result, 0) + 1
+            settle_ns += _settle(ctx, settle_s)
+    wall_s = (time.perf_counter_ns() - wall_start - settle_ns) / 1e9
+    cpu_us = (time.thread_time_ns() - cpu_start) / 1_000.0
+
+    latencies_us.sort()
+    return {
+        "iterations": iterations,
+        "ok": iterations - sum(errors.values()) - sum(exceptions.values()),
+        "errors": {
+            ctx.ph.getTxRxResult(code) or str(code): count for code, count in errors.items()
+        },
+        "exceptions": exceptions,
+        "tx_per_s": iterations / wall_s if wall_s else None,
+        "latency_us": {
+            "mean": sum(latencies_us) / len(latencies_us),
+            "p50": percentile(latencies_us, 50),
+            "p99": percentile(latencies_us, 99),
+            "p99.9": percentile(latencies_us, 99.9),
+            "max": latencies_us[-1],
+        },
+        "cpu_us_per_tx": cpu_us / iterations,
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(bauds=DEFAULT_BAUDS, ids=DEFAULT_IDS, iterations=1000, names=None,
+              return_delay_us=None, drop_rate=0.0, corrupt_rate=0.0, seed=0):
+    names = names or list(BENCHMARKS)
+    report = {
+        "meta": {
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "timestamp": time.time(),
+            "servos": len(ids),
+            "iterations": iterations,
+            "drop_rate": drop_rate,
+            "corrupt_rate": corrupt_rate,
+        },
+        "results": [],
+    }
+    for baudrate in bauds:
+        bus = VirtualBus(
+            [VirtualServo(scs_id) for scs_id in ids],
+            baudrate=baudrate,
+            return_delay_us=return_delay_us,
+            drop_rate=drop_rate,
+            corrupt_rate=corrupt_rate,
+            seed=seed,
+        )
+        # a forked bus keeps the emulator off the GIL of the code under test
+        bus.start(process=True)
+        ctx = BenchContext(bus.port_name, baudrate, ids)
+        try:
+            for name in names:
+                result = run_benchmark(ctx, BENCHMARKS[name], iterations)
+                result.update(benchmark=name, baudrate=baudrate)
+                report["results"].append(result)
+        finally:
+            ctx.close()
+            bus.close()
+    return report
+
+
+def print_summary(report, stream=sys.stderr):
+    print(
+        f"{'benchmark':<26} {'baud':>8} {'tx/s':>9} {'p50 us':>9} {'p99 us':>9} "
+        f"{'p99.9 us':>9} {'cpu us':>8} {'ok':>6}",
+        file=stream,
+    )
+    for r in report["results"]:
+        lat = r["latency_us"]
+        print(
+            f"{r['benchmark']:<26} {r['baudrate']:>8} {r['tx_per_s']:>9.0f} "
+            f"{lat['p50']:>9.1f} {lat['p99']:>9.1f} {lat['p99.9']:>9.1f} "
+            f"{r['cpu_us_per_tx']:>8.1f} {r['ok']:>6}",
+            file=stream,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the feetech protocol stack")
+    parser.add_argument("--bauds", default=",".join(str(b) for b in DEFAULT_BAUDS))
+    parser.add_argument("--ids", default=",".join(str(i) for i in DEFAULT_IDS))
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--benchmarks", default=None, help="comma separated subset of: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--return-delay-us", type=float, default=None)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--corrupt-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    report = run_suite(
+        bauds=[int(b) for b in args.bauds.split(",")],
+        ids=[int(i) for i in args.ids.split(",")],
+        iterations=args.iterations,
+        names=args.benchmarks.split(",") if args.benchmarks else None,
+        return_delay_us=args.return_delay_us,
+        drop_rate=args.drop_rate,
+        corrupt_rate=args.corrupt_rate,
+        seed=args.seed,
+    )
+    print_summary(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Wire-time estimates for Feetech half-duplex bus transactions.
+
+Every frame is FF FF ID LEN INST/ERR params CHK (6 bytes of overhead) and
+each byte costs 10 bit times (start + 8 data + stop).  A servo answers a
+request only after its Return Delay (register 7, 2 µs units), so a reply
+costs ``return_delay_us`` plus its own wire time.  These are lower bounds:
+USB/UART latency and host scheduling come on top.
+"""
+
+BITS_PER_BYTE = 10
+FRAME_OVERHEAD = 6                  # FF FF ID LEN INST/ERR ... CHK
+RETURN_DELAY_UNIT_US = 2.0          # register 7 counts in 2 µs steps
+TURNAROUND_BYTES = 2                # idle line left between two frames
+
+
+def turnaround_us(baudrate):
+    """Idle time between the end of one frame and the start of the next"""
+    return TURNAROUND_BYTES * byte_time_us(baudrate)
+
+
+def byte_time_us(baudrate):
+    return BITS_PER_BYTE * 1_000_000.0 / baudrate
+
+
+def status_bytes(data_length):
+    return FRAME_OVERHEAD + data_length
+
+
+def read_request_bytes():
+    return FRAME_OVERHEAD + 2                    # addr, length
+
+
+def sync_read_request_bytes(servo_count):
+    return FRAME_OVERHEAD + 2 + servo_count      # addr, length, ids
+
+
+def sync_write_bytes(servo_count, data_length):
+    return FRAME_OVERHEAD + 2 + servo_count * (1 + data_length)
+
+
+def read_us(baudrate, data_length, return_delay_us=0.0):
+    """One READ request plus its status packet"""
+    wire = read_request_bytes() + status_bytes(data_length)
+    return wire * byte_time_us(baudrate) + return_delay_us
+
+
+def sync_read_us(baudrate, servo_count, data_length, return_delay_us=0.0):
+    """One SYNC READ request plus every servo's status packet"""
+    wire = sync_read_request_bytes(servo_count) + servo_count * status_bytes(data_length)
+    return wire * byte_time_us(baudrate) + servo_count * return_delay_us
+
+
+def sync_write_us(baudrate, servo_count, data_length):
+    """One SYNC WRITE (no reply)"""
+    return sync_write_bytes(servo_count, data_length) * byte_time_us(baudrate)
+
+
+def max_rate_hz(baudrate, servo_count, write_length, read_length,
+                return_delay_us=0.0, overhead_us=0.0):
+    """Highest control rate at which a sync-write plus sync-read still fits a tick"""
+    tick_us = (
+        sync_write_us(baudrate, servo_count, write_length)
+        + sync_read_us(baudrate, servo_count, read_length, return_delay_us)
+        + overhead_us
+    )
+    return 1_000_000.0 / tick_us
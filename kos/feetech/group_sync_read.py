@@ -16,6 +16,26 @@ class GroupSyncRead:
         self.stamp_dict   = {}   # id → last‑ok monotonic time (s)
         self.max_age_s    = 0.05 # accept data that is ≤50 ms old
 
+        # streaming demux state
+        self.frame_length = data_length + 6   # FF FF ID LEN ERR data… CHK
+        self.arrival_dict = {}   # id → monotonic_ns its frame was decoded
+        self.received_ids = set()            # ids decoded by the last rxPacket
+        self.tx_stamp_ns  = 0                # monotonic_ns the last request left
+        self.crc_fail_dict = {}              # id → frames dropped for a bad checksum
+
+        # id → µs after tx_stamp_ns by which its frame is due (learned, see
+        # kos/link_quality.py); when set for every id the read gives up once
+        # the latest deadline of the servos still pending has passed, instead
+        # of the wire-time estimate of setPacketTimeout
+        self.deadline_us  = {}
+        self._rxbuf  = bytearray()
+        self._rxview = memoryview(self._rxbuf)
+
+        # every servo's [error, data…] lives in a fixed slot of one block so
+        # callers can decode all of them in a single struct.iter_unpack pass
+        self.slot_dict  = {}                 # id → slot index (param order)
+        self.data_block = bytearray()
+
         self.clearParam()
 
     def makeParam(self):
@@ -27,6 +47,22 @@ class GroupSyncRead:
         for scs_id in self.data_dict:
             self.param.append(scs_id)
 
+        self.layoutBlock()
+
+    def layoutBlock(self):
+        slot_len = self.data_length + 1
+        block = bytearray(slot_len * len(self.param))
+        view = memoryview(block)
+        self.slot_dict.clear()
+        for idx, scs_id in enumerate(self.param):
+            slot = view[idx * slot_len:(idx + 1) * slot_len]
+            old = self.data_dict[scs_id]
+            if len(old) == slot_len:
+                slot[:] = old                # keep last data across re-layouts
+            self.data_dict[scs_id] = slot
+            self.slot_dict[scs_id] = idx
+        self.data_block = block
+
     def addParam(self, scs_id):
         if scs_id in self.data_dict:  # scs_id already exist
             return False
@@ -56,30 +92,118 @@ class GroupSyncRead:
             self.makeParam()
             self.is_param_changed = False
 
+        if not self.last_result and self._rxview:
+            # a servo missed the last deadline: drop its late frame now so it
+            # is not taken for this request's reply
+            port = self.ph.portHandler
+            while port.readPortInto(self._rxview):
+                pass
+
+        self.tx_stamp_ns = time.monotonic_ns()
         return self.ph.syncReadTx(self.start_address, self.data_length, self.param, len(self.data_dict.keys()))
 
     def rxPacket(self):
-        self.last_result = True
+        """
+        Receive the status frames of a sync read, decoding each servo's frame
+        as soon as its bytes land instead of waiting for the whole burst.
 
-        result = COMM_RX_FAIL
+        Returns COMM_SUCCESS if at least one servo answered; ``last_result``
+        is False when some did not, and ``received_ids`` lists who did.  A
+        servo that stays silent only costs the remaining packet timeout and
+        keeps its previous data (subject to ``max_age_s``).
+        """
+        self.last_result = True
+        self.received_ids.clear()
 
         if len(self.data_dict.keys()) == 0:
             return COMM_NOT_AVAILABLE
 
-        result, rxpacket = self.ph.syncReadRx(self.data_length, len(self.data_dict.keys()))
-        # print(rxpacket)
-        if len(rxpacket) >= (self.data_length+6):
-            for scs_id in self.data_dict:
-                frame, result = self.readRx(rxpacket, scs_id, self.data_length)
-                if result == COMM_SUCCESS and frame:
-                    self.data_dict[scs_id]  = frame
-                    self.stamp_dict[scs_id] = time.monotonic()
-                else:
-                    self.last_result = False         # keep old data, just flag error
+        port        = self.ph.portHandler
+        frame_len   = self.frame_length
+        frame_tag   = self.data_length + 2      # LEN field of a valid frame
+        expected    = frame_len * len(self.data_dict)
+        if len(self._rxbuf) < expected + frame_len:
+            self._rxbuf  = bytearray(expected + frame_len)
+            self._rxview = memoryview(self._rxbuf)
+        buf, view   = self._rxbuf, self._rxview
+        buf_len     = len(buf)
+        pending     = len(self.data_dict)
+        head = tail = 0
+        got_bytes   = False
+
+        deadlines   = self.deadline_us
+        if deadlines and all(scs_id in deadlines for scs_id in self.data_dict):
+            tx_us = self.tx_stamp_ns / 1_000.0
+            port.setPacketTimeoutMicros(max(deadlines[i] for i in self.data_dict), tx_us)
         else:
-            self.last_result = False
-        # print(self.last_result)
-        return result
+            deadlines = None
+            port.setPacketTimeout(expected)
+        port.is_using = True
+        try:
+            while pending:
+                n = port.readPortInto(view[tail:])
+                if not n:
+                    if port.isPacketTimeout():
+                        break
+                    self.ph.waitRx()
+                    continue
+
+                now_ns    = time.monotonic_ns()
+                tail     += n
+                got_bytes = True
+
+                # decode every complete frame now sitting in the buffer
+                while tail - head >= frame_len:
+                    if buf[head] != 0xFF or buf[head + 1] != 0xFF:
+                        idx = buf.find(b"\xff\xff", head, tail)
+                        if idx < 0:
+                            idx = tail - 1 if buf[tail - 1] == 0xFF else tail
+                        head = idx
+                        continue
+
+                    scs_id = buf[head + 2]
+                    end    = head + frame_len
+                    if (buf[head + 3] != frame_tag or
+                            scs_id not in self.data_dict or
+                            scs_id in self.received_ids):
+                        head += 1                      # not ours → resync
+                        continue
+                    if (~sum(view[head + 2:end - 1]) & 0xFF) != buf[end - 1]:
+                        self.crc_fail_dict[scs_id] = self.crc_fail_dict.get(scs_id, 0) + 1
+                        head += 1                      # corrupt → resync
+                        continue
+
+                    frame = self.data_dict[scs_id]
+                    if len(frame) != self.data_length + 1:
+                        self.makeParam()               # ids changed since txPacket
+                        frame = self.data_dict[scs_id]
+                    frame[:] = view[head + 4:end - 1]  # error byte + data
+                    self.stamp_dict[scs_id]   = now_ns / 1e9
+                    self.arrival_dict[scs_id] = now_ns
+                    self.received_ids.add(scs_id)
+                    pending -= 1
+                    head = end
+                    if deadlines is not None and pending:
+                        # only wait as long as the servos still missing need
+                        port.packet_timeout = max(
+                            deadlines[i] for i in self.data_dict if i not in self.received_ids)
+
+                if head == tail:
+                    head = tail = 0
+                elif tail == buf_len:
+                    buf[0:tail - head] = buf[head:tail]
+                    tail -= head
+                    head  = 0
+        finally:
+            port.is_using = False
+
+        if pending == 0:
+            return COMM_SUCCESS
+
+        self.last_result = False                       # keep old data, just flag error
+        if self.received_ids:
+            return COMM_SUCCESS
+        return COMM_RX_CORRUPT if got_bytes else COMM_RX_TIMEOUT
 
     def txRxPacket(self):
         result = self.txPacket()
@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 
+import os
 import time
+import select
 import serial
 import sys
 import platform
@@ -24,12 +26,18 @@ class PortHandler(object):
         self.port_name = port_name
         self.ser = None
 
+        # Block in select() until bytes or a deadline arrive instead of
+        # spinning on readPort(); needs a handle with a real fileno()
+        self.rx_wait = True
+        self._rx_fd = None
+
     def openPort(self):
         return self.setBaudRate(self.baudrate)
 
     def closePort(self):
         self.ser.close()
         self.is_open = False
+        self._rx_fd = None
 
     def clearPort(self):
         self.ser.flush()
@@ -54,6 +62,11 @@ class PortHandler(object):
     def getBaudRate(self):
         return self.baudrate
 
+    def fileno(self):
+        """Descriptor the port reads from, for select()/event loops; None
+        while the port is closed or cannot be polled"""
+        return self._rx_fd
+
     def getBytesAvailable(self):
         return self.ser.in_waiting
 
@@ -63,9 +76,32 @@ class PortHandler(object):
         else:
             return [ord(ch) for ch in self.ser.read(length)]
 
+    def readPortInto(self, buf):
+        """
+        Read up to len(buf) bytes straight into ``buf`` (a writable buffer or
+        memoryview slice) without allocating.  Returns the number of bytes read.
+        """
+        if self._rx_fd is not None:
+            try:
+                return os.readv(self._rx_fd, (buf,))
+            except BlockingIOError:  # port is opened O_NONBLOCK
+                return 0
+        return self.ser.readinto(buf) or 0
+
     def writePort(self, packet):
         return self.ser.write(packet)
 
+    def waitForData(self, timeout_us):
+        """
+        Block until the port is readable or ``timeout_us`` elapses.
+        Returns True if bytes are waiting.  Without a pollable handle this
+        returns immediately and the caller keeps polling readPort().
+        """
+        if timeout_us <= 0 or not self.rx_wait or self._rx_fd is None:
+            return False
+        ready, _, _ = select.select((self._rx_fd,), (), (), timeout_us / 1_000_000.0)
+        return bool(ready)
+
 
     def setPacketTimeout(self, expected_bytes: int, extra_us: int = 0) -> None:
         """
@@ -87,6 +123,15 @@ class PortHandler(object):
         calc_timeout += extra_us
         self.packet_timeout = calc_timeout              # ***micro‑seconds***
 
+    def setPacketTimeoutMicros(self, timeout_us: float, start_us: float = None) -> None:
+        """
+        Explicit deadline: `timeout_us` after `start_us` (getCurrentTime_us()
+        clock, default now), not clamped.  For callers that learned how long
+        the reply really takes (see kos/link_quality.py).
+        """
+        self.packet_start_time = self.getCurrentTime_us() if start_us is None else start_us
+        self.packet_timeout = timeout_us
+
     def isPacketTimeout(self):
         if self.getTimeSinceStart() > self.packet_timeout:
             self.packet_timeout = 0
@@ -94,6 +139,9 @@ class PortHandler(object):
 
         return False
 
+    def getTimeoutRemaining_us(self):
+        return self.packet_timeout - self.getTimeSinceStart()
+
     def getTimeSinceStart(self):
         time_since = self.getCurrentTime_us() - self.packet_start_time
         if time_since < 0.0:
@@ -121,6 +169,11 @@ class PortHandler(object):
 
         self.is_open = True
 
+        try:
+            self._rx_fd = self.ser.fileno()
+        except (AttributeError, OSError, ValueError):
+            self._rx_fd = None  # e.g. Windows: fall back to polling
+
         self.ser.reset_input_buffer()
         self.tx_time_per_byte = (1000.0 / self.baudrate) * 10.0
 
@@ -25,6 +25,7 @@ MIN_FRAME_LEN     = len(HEADER) + CORE_LEN + ERR_LEN + CHK_LEN  # -> 6
 
 TXPACKET_MAX_LEN = 250
 RXPACKET_MAX_LEN = 250
+RX_BUFFER_LEN    = 2 * (RXPACKET_MAX_LEN + 4)   # a max frame plus resync slack
 # ──────────────────────────────────────────────────────────────────────────────
 
 
@@ -39,6 +40,10 @@ class protocol_packet_handler(object):
         self.IDLE_GAP_US = self.CHAR_TIME_US * 20                         # 2‑char idle gap (example: 500000 baud --> 40us)
         self.log = get_logger(__name__)
 
+        # preallocated receive buffer reused by every rxPacket() call
+        self._rxbuf  = bytearray(RX_BUFFER_LEN)
+        self._rxview = memoryview(self._rxbuf)
+
     def scs_getend(self):
         return self.scs_end
 
@@ -166,57 +171,74 @@ class protocol_packet_handler(object):
     def rxPacket(self):
         """
         Blocking receive‑and‑parse for a single status packet.
-        Returns (bytes(rx_packet), result_code)
+        Returns (rx_packet, result_code).  ``rx_packet`` is a memoryview into
+        the handler's preallocated receive buffer: it is only valid until the
+        next receive, so copy out anything that must outlive it.
         """
-        rxpacket         = bytearray()
-        result           = None                         # CHANGED: clearer init
-        wait_length      = MIN_FRAME_LEN
+        buf              = self._rxbuf
+        view             = self._rxview
+        head             = 0                            # first unconsumed byte
+        tail             = 0                            # one past last byte read
+        result           = None
+        wait_length      = MIN_FRAME_LEN                # bytes wanted from head
         last_byte_us     = self.portHandler.getCurrentTime_us()
         first_byte_seen  = False
 
         # mark port busy until we exit, even on exception
-        self.portHandler.is_using = True                # CHANGED: moved to top
+        self.portHandler.is_using = True
         try:
             while True:
-                chunk = self.portHandler.readPort(wait_length - len(rxpacket))
-                if chunk:
-                    rxpacket.extend(chunk)
-                    last_byte_us    = self.portHandler.getCurrentTime_us()
-                    first_byte_seen = True
-                else:
-                    # ── GAP DETECTION ────────────────────────────────────────────
-                    if (first_byte_seen and
-                        self.portHandler.getCurrentTime_us() - last_byte_us
-                            > self.IDLE_GAP_US):
-                        self.log.debug("RX gap > idle threshold → abort")  # CHANGED: print→log
-                        result = COMM_RX_CORRUPT
-                        break
+                need = head + wait_length - tail
+                if need > 0:
+                    if tail + need > RX_BUFFER_LEN:
+                        # compact: one memmove instead of per‑byte pops
+                        buf[0:tail - head] = buf[head:tail]
+                        tail -= head
+                        head = 0
+                    n = self.portHandler.readPortInto(view[tail:tail + need])
+                    if n:
+                        tail           += n
+                        last_byte_us    = self.portHandler.getCurrentTime_us()
+                        first_byte_seen = True
+                    else:
+                        # ── GAP DETECTION ────────────────────────────────────────
+                        if (first_byte_seen and
+                            self.portHandler.getCurrentTime_us() - last_byte_us
+                                > self.IDLE_GAP_US):
+                            self.log.debug("RX gap > idle threshold → abort")
+                            result = COMM_RX_CORRUPT
+                            break
+                        self.waitRx(first_byte_seen, last_byte_us)
 
                 # ── Have we read enough yet? ────────────────────────────────────
-                if len(rxpacket) < wait_length:
+                if tail - head < wait_length:
                     if self.portHandler.isPacketTimeout():
-                        result = (COMM_RX_TIMEOUT if not rxpacket
+                        result = (COMM_RX_TIMEOUT if tail == head
                                 else COMM_RX_CORRUPT)
                         break
                     continue
 
                 # ── Ensure header alignment ─────────────────────────────────────
-                if rxpacket[:2] != HEADER:
+                if buf[head] != HDR_BYTE or buf[head + 1] != HDR_BYTE:
                     # discard until we realign on FF FF
-                    while len(rxpacket) >= 2 and rxpacket[:2] != HEADER:
-                        rxpacket.pop(0)
+                    idx = buf.find(HEADER, head, tail)
+                    if idx < 0:
+                        # keep a trailing 0xFF, it may be half of the next header
+                        idx = tail - 1 if buf[tail - 1] == HDR_BYTE else tail
+                    head            = idx
                     first_byte_seen = False
                     last_byte_us    = self.portHandler.getCurrentTime_us()
                     wait_length     = MIN_FRAME_LEN
                     continue
 
                 # ── Sanity‑check ID, LEN, ERR ──────────────────────────────────
-                pkt_len = rxpacket[PKT_LENGTH]
-                if (rxpacket[PKT_ID]    > ID_BROADCAST_MAX or
-                    pkt_len             > RXPACKET_MAX_LEN or
-                    rxpacket[PKT_ERROR] > ERR_MASK_MAX):
+                pkt_len = buf[head + PKT_LENGTH]
+                if (buf[head + PKT_ID]    > ID_BROADCAST_MAX or
+                    pkt_len               > RXPACKET_MAX_LEN or
+                    pkt_len               < ERR_LEN + CHK_LEN or
+                    buf[head + PKT_ERROR] > ERR_MASK_MAX):
                     self.log.debug("Header sane‑check failed → resync")
-                    rxpacket.pop(0)                      # drop first 0xFF
+                    head           += 1                  # drop first 0xFF
                     first_byte_seen = False
                     last_byte_us    = self.portHandler.getCurrentTime_us()
                     wait_length     = MIN_FRAME_LEN
@@ -224,19 +246,33 @@ class protocol_packet_handler(object):
 
                 # ── Recompute expected total length ────────────────────────────
                 wait_length = 4 + pkt_len               #  2*FF + ID + LEN + LEN bytes
-                if len(rxpacket) < wait_length:
+                if tail - head < wait_length:
                     continue
 
                 # ── CHECKSUM ────────────────────────────────────────────────────
-                checksum = (~sum(rxpacket[2:wait_length-1]) & 0xFF)
-                result   = (COMM_SUCCESS if rxpacket[wait_length-1] == checksum
+                end      = head + wait_length
+                checksum = (~sum(view[head + 2:end - 1]) & 0xFF)
+                result   = (COMM_SUCCESS if buf[end - 1] == checksum
                             else COMM_RX_CORRUPT)
+                tail     = end
                 break                                            # done (good or bad)
         finally:
             self.portHandler.is_using = False
 
-        return bytes(rxpacket), result
+        return view[head:tail], result
+
 
+    def waitRx(self, first_byte_seen=False, last_byte_us=0.0):
+        """
+        Sleep until more bytes arrive, the packet timeout expires or (once a
+        frame has started) the inter-byte idle gap is exceeded, whichever
+        comes first.
+        """
+        wait_us = self.portHandler.getTimeoutRemaining_us()
+        if first_byte_seen:
+            gap_left_us = last_byte_us + self.IDLE_GAP_US - self.portHandler.getCurrentTime_us()
+            wait_us = min(wait_us, gap_left_us)
+        self.portHandler.waitForData(wait_us)
 
     def txRxPacket(self, txpacket):
         rxpacket = None
@@ -529,6 +565,7 @@ class protocol_packet_handler(object):
                     else:
                         result = COMM_RX_CORRUPT
                     break
+                self.waitRx()
         self.portHandler.is_using = False
         return result, rxpacket
 
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Precompiled register codec for the SMS/STS memory table.
+
+A register table (list of {"name", "addr", "size", ...} dicts, e.g.
+``SMS_STS_REGISTERS`` in sms_sts.py) is compiled once into a dense list indexed
+by address, so encoding or decoding a register is one list lookup plus a
+precompiled ``struct`` call instead of a scan over the table.
+
+buster/scservo_sdk carries a vendored copy; it only depends on the standard
+library.  Change both copies together.
+
+Optional keys per register:
+
+    sign_bit   bit holding the sign of a sign-magnitude value (see
+               scs_tohost/scs_toscs).  Two-byte registers default to bit 15,
+               one-byte registers to unsigned; None forces unsigned.
+    scale      engineering units per raw count (default 1)
+    unit       name of those units, for display
+"""
+
+import struct
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+TABLE_SIZE = 256  # addresses are one byte on the wire
+
+_FORMATS = {1: struct.Struct("<B"), 2: struct.Struct("<H")}
+
+
+class Register(NamedTuple):
+    name: str
+    addr: int
+    size: int
+    sign_mask: int      # 0 for unsigned registers
+    raw_mask: int       # 0xFF / 0xFFFF
+    scale: float
+    unit: str
+    fmt: struct.Struct
+
+
+class RegisterCodec:
+    def __init__(self, registers: Iterable[dict]):
+        self.table: List[Optional[Register]] = [None] * TABLE_SIZE
+        self.by_name: Dict[str, Register] = {}
+        for reg in registers:
+            size = reg["size"]
+            if size not in _FORMATS:
+                raise ValueError(f"{reg['name']}: unsupported register size {size}")
+            sign_bit = reg.get("sign_bit", 15 if size == 2 else None)
+            compiled = Register(
+                name=reg["name"],
+                addr=reg["addr"],
+                size=size,
+                sign_mask=(1 << sign_bit) if sign_bit is not None else 0,
+                raw_mask=(1 << (8 * size)) - 1,
+                scale=reg.get("scale", 1),
+                unit=reg.get("unit", ""),
+                fmt=_FORMATS[size],
+            )
+            self.table[compiled.addr] = compiled
+            self.by_name[compiled.name] = compiled
+
+    def __getitem__(self, addr: int) -> Register:
+        reg = self.table[addr]
+        if reg is None:
+            raise KeyError(f"unknown register: {addr}")
+        return reg
+
+    def __contains__(self, addr: int) -> bool:
+        return 0 <= addr < TABLE_SIZE and self.table[addr] is not None
+
+    def get(self, addr: int) -> Optional[Register]:
+        return self.table[addr] if 0 <= addr < TABLE_SIZE else None
+
+    def sizes(self) -> Dict[int, int]:
+        """addr → size in bytes of every register"""
+        return {reg.addr: reg.size for reg in self.table if reg is not None}
+
+    # -- raw register word ↔ host integer -------------------------------------
+
+    def to_host(self, addr: int, raw: int) -> int:
+        """Raw register word → signed host value (scs_tohost)"""
+        mask = self[addr].sign_mask
+        if raw & mask:
+            return -(raw & ~mask)
+        return raw
+
+    def to_raw(self, addr: int, value: int) -> int:
+        """Host value → raw register word (scs_toscs), truncated to the register"""
+        reg = self[addr]
+        if value < 0 and reg.sign_mask:
+            value = -value | reg.sign_mask
+        return value & reg.raw_mask
+
+    # -- bytes ----------------------------------------------------------------
+
+    def encode_raw(self, addr: int, raw: int) -> bytes:
+        """Little-endian register bytes of a raw word, no sign conversion"""
+        reg = self[addr]
+        return reg.fmt.pack(raw & reg.raw_mask)
+
+    def encode(self, addr: int, value: int) -> bytes:
+        """Little-endian register bytes for a host value"""
+        return self[addr].fmt.pack(self.to_raw(addr, value))
+
+    def decode(self, addr: int, data, offset: int = 0) -> int:
+        """Host value of the register stored at data[offset:]"""
+        reg = self[addr]
+        raw = reg.fmt.unpack_from(data, offset)[0]
+        if raw & reg.sign_mask:
+            return -(raw & ~reg.sign_mask)
+        return raw
+
+    # -- engineering units ----------------------------------------------------
+
+    def to_units(self, addr: int, value: int) -> float:
+        return value * self[addr].scale
+
+    def from_units(self, addr: int, value: float) -> int:
+        return int(round(value / self[addr].scale))
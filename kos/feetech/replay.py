@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+"""
+Record the byte stream at the ``PortHandler`` boundary and replay it.
+
+``CapturePortHandler`` is a drop-in ``PortHandler`` that appends every
+write and every non-empty read to a capture file, stamped with
+``time.monotonic_ns()``.  Nothing is decoded while capturing: an event is
+a 16-byte header plus the bytes themselves, handed to a buffered file.
+
+    controller = SCSMotorController(device="/dev/ttyUSB0", capture="incident.kosp")
+
+A capture is split into transactions (one write plus the bytes read until
+the next write) and re-driven against a ``VirtualBus``, either on the
+recorded schedule (``speed=1.0``, or faster/slower) or back to back
+(``speed=0``), so a parser or loop change can be profiled on production
+traffic with the same request sequence every run:
+
+    python -m kos.feetech.replay incident.kosp --speed 0 --output replay.json
+
+The replay reports round-trip latency percentiles, CPU time per
+transaction and how many replies came back byte-identical to the
+recording.  The virtual servos start from their factory state, so status
+payloads (positions, loads) of a real capture differ from the recording;
+frame counts and timing are what is comparable.
+
+File layout (little-endian): header "KOSP", version u16, reserved u16,
+baud rate u32; then events t_ns u64 (since capture start), kind u8,
+3 pad bytes, length u32, followed by `length` bytes.
+"""
+
+import argparse
+import json
+import struct
+import sys
+import time
+
+from .scservo_def import *
+from .port_handler import PortHandler, LATENCY_TIMER_US, MAX_BUSY_US, MIN_TIMEOUT_US
+from .virtual_bus import VirtualBus, VirtualServo, _parse_ids, _sleep_until
+from .bench import percentile
+
+MAGIC = b"KOSP"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHI")  # magic, version, reserved, baud rate
+_EVENT = struct.Struct("<QBxxxI")  # t_ns, kind, length
+
+EVENT_TX = 1
+EVENT_RX = 2
+EVENT_BAUD = 3  # payload: new baud rate, u32
+
+
+class CapturePortHandler(PortHandler):
+    """PortHandler that records every byte written and read"""
+
+    def __init__(self, port_name, capture_path, buffer_size=1 << 20):
+        super().__init__(port_name)
+        self.capture_path = capture_path
+        self._capture = open(capture_path, "wb", buffering=buffer_size)
+        self._capture.write(_HEADER.pack(MAGIC, VERSION, 0, self.baudrate))
+        self._event = bytearray(_EVENT.size)
+        self._t0_ns = time.monotonic_ns()
+
+    def _record(self, kind, data):
+        if self._capture is None:
+            return
+        _EVENT.pack_into(self._event, 0, time.monotonic_ns() - self._t0_ns, kind, len(data))
+        self._capture.write(self._event)
+        self._capture.write(data)
+
+    def setBaudRate(self, baudrate):
+        ok = super().setBaudRate(baudrate)
+        if ok:
+            self._record(EVENT_BAUD, struct.pack("<I", baudrate))
+        return ok
+
+    def readPort(self, length):
+        data = super().readPort(length)
+        if data:
+            self._record(EVENT_RX, bytes(data))
+        return data
+
+    def readPortInto(self, buf):
+        n = super().readPortInto(buf)
+        if n:
+            self._record(EVENT_RX, buf[:n])
+        return n
+
+    def writePort(self, packet):
+        written = super().writePort(packet)
+        self._record(EVENT_TX, bytes(packet))
+        return written
+
+    def closePort(self):
+        super().closePort()
+        if self._capture is not None:
+            self._capture.flush()
+
+    def closeCapture(self):
+        if self._capture is not None:
+            self._capture.close()
+            self._capture = None
+
+
+# ── reading a capture ─────────────────────────────────────────────────────────
+def load_capture(path):
+    """(baud rate at capture start, [(t_ns, kind, bytes)])"""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, _, baudrate = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a bus capture")
+    if version != VERSION:
+        raise ValueError(f"{path}: capture version {version}, expected {VERSION}")
+
+    events = []
+    off = _HEADER.size
+    while off + _EVENT.size <= len(data):
+        t_ns, kind, length = _EVENT.unpack_from(data, off)
+        off += _EVENT.size
+        if off + length > len(data):
+            break  # capture cut short (process killed mid-write)
+        events.append((t_ns, kind, data[off : off + length]))
+        off += length
+    return baudrate, events
+
+
+def transactions(events):
+    """[(t_ns, tx bytes, rx bytes)]: each write with everything read before
+    the next write.  Bytes read before the first write are dropped."""
+    out = []
+    for t_ns, kind, payload in events:
+        if kind == EVENT_TX:
+            out.append((t_ns, payload, bytearray()))
+        elif kind == EVENT_RX and out:
+            out[-1][2].extend(payload)
+    return [(t_ns, tx, bytes(rx)) for t_ns, tx, rx in out]
+
+
+def responder_ids(txns):
+    """IDs of the servos that sent status packets in a capture"""
+    ids = set()
+    for _, _, rx in txns:
+        i = rx.find(b"\xff\xff")
+        while 0 <= i and i + 4 <= len(rx):
+            if rx[i + 2] < BROADCAST_ID:
+                ids.add(rx[i + 2])
+            # next frame: header, id, length, then `length` bytes
+            i = rx.find(b"\xff\xff", i + 4 + rx[i + 3])
+    return sorted(ids)
+
+
+# ── replay ────────────────────────────────────────────────────────────────────
+def replay(port, txns, speed=1.0):
+    """Write every transaction of `txns` to `port` (an open PortHandler) and
+    read back as many bytes as were recorded for it.
+
+    speed : 1.0 replays on the recorded schedule, 2.0 twice as fast, and
+            0 back to back as fast as the bus answers
+    """
+    if not txns:
+        return {"transactions": 0}
+    buf = bytearray(max(4096, max(len(rx) for _, _, rx in txns)))
+    view = memoryview(buf)
+    byte_us = 10 * 1_000_000 / port.getBaudRate()
+    latencies_us = []
+    identical = short = stray_bytes = 0
+
+    t_first = txns[0][0]
+    cpu_start = time.thread_time_ns()
+    wall_start = time.monotonic()
+    for t_ns, tx, rx in txns:
+        if speed:
+            _sleep_until(wall_start + (t_ns - t_first) / 1e9 / speed)
+
+        # replies the previous transaction did not wait for
+        while port.getBytesAvailable():
+            stray_bytes += port.readPortInto(view)
+
+        t0 = time.monotonic_ns()
+        port.writePort(tx)
+        expected = len(rx)
+        if not expected:
+            latencies_us.append((time.monotonic_ns() - t0) / 1_000)
+            continue
+
+        # same budget as setPacketTimeout(): wire time + latency, clamped
+        timeout_us = min(max(expected * byte_us + LATENCY_TIMER_US, MIN_TIMEOUT_US), MAX_BUSY_US)
+        deadline = t0 + int(timeout_us * 1_000)
+        got = 0
+        while got < expected:
+            remaining = deadline - time.monotonic_ns()
+            if remaining <= 0:
+                break
+            port.waitForData(remaining / 1_000)
+            got += port.readPortInto(view[got:expected])
+        latencies_us.append((time.monotonic_ns() - t0) / 1_000)
+        if got < expected:
+            short += 1
+        elif buf[:expected] == rx:
+            identical += 1
+    wall_s = time.monotonic() - wall_start
+    cpu_us = (time.thread_time_ns() - cpu_start) / 1_000
+
+    replies = sum(1 for _, _, rx in txns if rx)
+    latencies_us.sort()
+    return {
+        "transactions": len(txns),
+        "replies_expected": replies,
+        "replies_identical": identical,
+        "replies_short": short,
+        "stray_bytes": stray_bytes,
+        "recorded_s": (txns[-1][0] - t_first) / 1e9,
+        "wall_s": wall_s,
+        "tx_per_s": len(txns) / wall_s if wall_s else None,
+        "latency_us": {
+            "mean": sum(latencies_us) / len(latencies_us),
+            "p50": percentile(latencies_us, 50),
+            "p99": percentile(latencies_us, 99),
+            "p99.9": percentile(latencies_us, 99.9),
+            "max": latencies_us[-1],
+        },
+        "cpu_us_per_tx": cpu_us / len(txns),
+    }
+
+
+def replay_on_virtual_bus(path, speed=1.0, ids=None, process=True, **bus_kwargs):
+    """Replay a capture against a fresh VirtualBus of the servos that
+    answered in it (or `ids`); `bus_kwargs` go to VirtualBus"""
+    baudrate, events = load_capture(path)
+    for _, kind, payload in events:
+        if kind == EVENT_BAUD:
+            baudrate = struct.unpack("<I", payload)[0]
+    txns = transactions(events)
+    ids = responder_ids(txns) if ids is None else ids
+
+    bus = VirtualBus([VirtualServo(i) for i in ids], baudrate=baudrate, **bus_kwargs)
+    bus.start(process=process)
+    port = PortHandler(bus.port_name)
+    port.baudrate = baudrate
+    try:
+        if not port.openPort():
+            raise RuntimeError(f"failed to open {bus.port_name}")
+        report = replay(port, txns, speed)
+        port.closePort()
+    finally:
+        bus.close()
+    report["baudrate"] = baudrate
+    report["ids"] = ids
+    report["bus"] = dict(bus.stats)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a bus capture against a virtual bus")
+    parser.add_argument("capture")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = recorded schedule, 0 = back to back")
+    parser.add_argument("--ids", default=None, help="servo IDs of the virtual bus (default: from the capture)")
+    parser.add_argument("--return-delay-us", type=float, default=None)
+    parser.add_argument("--thread", action="store_true", help="serve the virtual bus in-process")
+    parser.add_argument("--output", default=None, help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    report = replay_on_virtual_bus(
+        args.capture,
+        speed=args.speed,
+        ids=_parse_ids(args.ids) if args.ids else None,
+        process=not args.thread,
+        return_delay_us=args.return_delay_us,
+    )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    latency = report.get("latency_us")
+    if latency:
+        print(
+            f"{report['transactions']} transactions in {report['wall_s']:.2f} s "
+            f"(recorded {report['recorded_s']:.2f} s), p50 {latency['p50']:.0f} us, "
+            f"p99 {latency['p99']:.0f} us, {report['replies_identical']}/{report['replies_expected']} "
+            f"replies identical, {report['replies_short']} short",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ from .scservo_def import *
 from .protocol_packet_handler import *
 from .group_sync_read import *
 from .group_sync_write import *
+from .register_codec import RegisterCodec
 
 #波特率定义
 SMS_STS_1M = 0
@@ -23,10 +24,14 @@ SMS_STS_MODEL_H = 4
 #-------EPROM(读写)--------
 SMS_STS_ID = 5
 SMS_STS_BAUD_RATE = 6
+SMS_STS_RETURN_DELAY = 7
 SMS_STS_MIN_ANGLE_LIMIT_L = 9
 SMS_STS_MIN_ANGLE_LIMIT_H = 10
 SMS_STS_MAX_ANGLE_LIMIT_L = 11
 SMS_STS_MAX_ANGLE_LIMIT_H = 12
+SMS_STS_MAX_TEMP_LIMIT = 13
+SMS_STS_MAX_INPUT_VOLTAGE = 14
+SMS_STS_MIN_INPUT_VOLTAGE = 15
 SMS_STS_CW_DEAD = 26
 SMS_STS_CCW_DEAD = 27
 SMS_STS_OFS_L = 31
@@ -53,6 +58,7 @@ SMS_STS_PRESENT_LOAD_L = 60
 SMS_STS_PRESENT_LOAD_H = 61
 SMS_STS_PRESENT_VOLTAGE = 62
 SMS_STS_PRESENT_TEMPERATURE = 63
+SMS_STS_STATUS = 65
 SMS_STS_MOVING = 66
 SMS_STS_PRESENT_CURRENT_L = 69
 SMS_STS_PRESENT_CURRENT_H = 70
@@ -66,11 +72,157 @@ SMS_STS_DEFAULT_VMAX = 84
 SMS_STS_DEFAULT_AMAX = 85
 SMS_STS_DEFAULT_KACC = 86
 
+# Register table: sign_bit / scale / unit are explained in register_codec.py.
+# Decode registers through SMS_STS_CODEC rather than by hand.
+SMS_STS_REGISTERS = [
+    {"name": "Model", "addr": SMS_STS_MODEL_L, "size": 2, "type": "uint16", "sign_bit": None},
+    {"name": "ID", "addr": SMS_STS_ID, "size": 1, "type": "uint8"},
+    {"name": "Baudrate", "addr": SMS_STS_BAUD_RATE, "size": 1, "type": "uint8"},
+    {"name": "Return Delay", "addr": SMS_STS_RETURN_DELAY, "size": 1, "type": "uint8", "scale": 2, "unit": "us"},
+    {"name": "Response Status Level", "addr": 8, "size": 1, "type": "uint8"},
+    {
+        "name": "Min Angle Limit",
+        "addr": SMS_STS_MIN_ANGLE_LIMIT_L,
+        "size": 2,
+        "type": "uint16",
+    },
+    {
+        "name": "Max Angle Limit",
+        "addr": SMS_STS_MAX_ANGLE_LIMIT_L,
+        "size": 2,
+        "type": "uint16",
+    },
+    {"name": "Max Temperature Limit", "addr": SMS_STS_MAX_TEMP_LIMIT, "size": 1, "type": "uint8"},
+    {"name": "Max Voltage Limit", "addr": SMS_STS_MAX_INPUT_VOLTAGE, "size": 1, "type": "uint8", "scale": 0.1, "unit": "V"},
+    {"name": "Min Voltage Limit", "addr": SMS_STS_MIN_INPUT_VOLTAGE, "size": 1, "type": "uint8", "scale": 0.1, "unit": "V"},
+    {"name": "Max Torque Limit", "addr": 16, "size": 2, "type": "uint16"},
+    {"name": "Phase", "addr": 18, "size": 1, "type": "uint8"},
+    {"name": "Unloading Condition", "addr": 19, "size": 1, "type": "uint8"},
+    {"name": "LED Alarm Condition", "addr": 20, "size": 1, "type": "uint8"},
+    {"name": "P Coefficient", "addr": 21, "size": 1, "type": "uint8"},
+    {"name": "D Coefficient", "addr": 22, "size": 1, "type": "uint8"},
+    {"name": "I Coefficient", "addr": 23, "size": 1, "type": "uint8"},
+    {"name": "Minimum Startup Force", "addr": 24, "size": 2, "type": "uint16"},
+    {"name": "CW Dead Zone", "addr": SMS_STS_CW_DEAD, "size": 1, "type": "uint8"},
+    {"name": "CCW Dead Zone", "addr": SMS_STS_CCW_DEAD, "size": 1, "type": "uint8"},
+    {"name": "Protection Current", "addr": 28, "size": 2, "type": "uint16"},
+    {"name": "Angular Resolution", "addr": 30, "size": 1, "type": "uint8"},
+    {"name": "Offset", "addr": SMS_STS_OFS_L, "size": 2, "type": "int16", "sign_bit": 11},
+    {"name": "Mode", "addr": SMS_STS_MODE, "size": 1, "type": "uint8"},
+    {"name": "Protective Torque", "addr": 34, "size": 1, "type": "uint8"},
+    {"name": "Protection Time", "addr": 35, "size": 1, "type": "uint8"},
+    {"name": "Overload Torque", "addr": 36, "size": 1, "type": "uint8"},
+    {
+        "name": "Speed closed loop P proportional coefficient",
+        "addr": 37,
+        "size": 1,
+        "type": "uint8",
+    },
+    {"name": "Over Current Protection Time", "addr": 38, "size": 1, "type": "uint8"},
+    {
+        "name": "Velocity closed loop I integral coefficient",
+        "addr": 39,
+        "size": 1,
+        "type": "uint8",
+    },
+    {
+        "name": "Torque Enable",
+        "addr": SMS_STS_TORQUE_ENABLE,
+        "size": 1,
+        "type": "uint8",
+    },
+    {"name": "Acceleration", "addr": SMS_STS_ACC, "size": 1, "type": "uint8"},
+    {
+        "name": "Goal Position",
+        "addr": SMS_STS_GOAL_POSITION_L,
+        "size": 2,
+        "type": "uint16",
+    },
+    {"name": "Goal Time", "addr": SMS_STS_GOAL_TIME_L, "size": 2, "type": "uint16", "sign_bit": None},
+    {"name": "Goal Speed", "addr": SMS_STS_GOAL_SPEED_L, "size": 2, "type": "int16"},
+    {"name": "Lock", "addr": SMS_STS_LOCK, "size": 1, "type": "uint8"},
+    {
+        "name": "Present Position",
+        "addr": SMS_STS_PRESENT_POSITION_L,
+        "size": 2,
+        "type": "uint16",
+    },
+    {
+        "name": "Present Speed",
+        "addr": SMS_STS_PRESENT_SPEED_L,
+        "size": 2,
+        "type": "int16",
+    },
+    {
+        "name": "Present Load",
+        "addr": SMS_STS_PRESENT_LOAD_L,
+        "size": 2,
+        "type": "int16",
+        "sign_bit": 10,
+        "scale": 0.1,
+        "unit": "%",
+    },
+    {
+        "name": "Present Voltage",
+        "addr": SMS_STS_PRESENT_VOLTAGE,
+        "size": 1,
+        "type": "uint8",
+        "scale": 0.1,
+        "unit": "V",
+    },
+    {
+        "name": "Present Temperature",
+        "addr": SMS_STS_PRESENT_TEMPERATURE,
+        "size": 1,
+        "type": "uint8",
+    },
+    {"name": "Status", "addr": SMS_STS_STATUS, "size": 1, "type": "uint8"},
+    {"name": "Moving", "addr": SMS_STS_MOVING, "size": 1, "type": "uint8"},
+    {
+        "name": "Present Current",
+        "addr": SMS_STS_PRESENT_CURRENT_L,
+        "size": 2,
+        "type": "uint16",
+        "scale": 6.5,
+        "unit": "mA",
+    },
+    {
+        "name": "Default Moving Threshold",
+        "addr": SMS_STS_DEFAULT_MOVING_THRESHOLD,
+        "size": 1,
+        "type": "uint8",
+    },
+    {"name": "Default DTS", "addr": SMS_STS_DEFAULT_DTS_MS, "size": 1, "type": "uint8"},
+    {"name": "Default VK", "addr": SMS_STS_DEFAULT_VK_MS, "size": 1, "type": "uint8"},
+    {"name": "Default VMIN", "addr": SMS_STS_DEFAULT_VMIN, "size": 1, "type": "uint8"},
+    {"name": "Default VMAX", "addr": SMS_STS_DEFAULT_VMAX, "size": 1, "type": "uint8"},
+    {"name": "Default AMAX", "addr": SMS_STS_DEFAULT_AMAX, "size": 1, "type": "uint8"},
+    {"name": "Default KACC", "addr": SMS_STS_DEFAULT_KACC, "size": 1, "type": "uint8"},
+]
+SMS_STS_CODEC = RegisterCodec(SMS_STS_REGISTERS)
+
 
 class sms_sts(protocol_packet_handler):
     def __init__(self, portHandler):
         protocol_packet_handler.__init__(self, portHandler, 0)
 
+    def ReadRegs(self, scs_id, address, count=1):
+        """Read `count` consecutive registers from `address` in one READ and
+        decode them with SMS_STS_CODEC. Returns ([values], comm_result, error)"""
+        regs = []
+        end = address
+        for _ in range(count):
+            reg = SMS_STS_CODEC[end]
+            regs.append(reg)
+            end += reg.size
+        data, scs_comm_result, scs_error = self.readTxRx(scs_id, address, end - address)
+        if scs_comm_result != COMM_SUCCESS:
+            return None, scs_comm_result, scs_error
+        if len(data) != end - address:
+            return None, COMM_RX_CORRUPT, scs_error
+        data = bytes(data)
+        return [SMS_STS_CODEC.decode(reg.addr, data, reg.addr - address) for reg in regs], scs_comm_result, scs_error
+
     def LockEprom(self, scs_id):
         return self.write1ByteTxRx(scs_id, SMS_STS_LOCK, 1)
 
@@ -0,0 +1,507 @@
+#!/usr/bin/env python
+"""
+Virtual Feetech SMS/STS servo bus served over a pseudo-terminal.
+
+The bus exposes a pty slave path that can be handed to ``PortHandler`` exactly
+like a real ``/dev/tty*`` so the whole protocol stack (and the motor
+controller on top of it) can be exercised without hardware.
+
+    bus = VirtualBus([VirtualServo(i) for i in range(31, 36)], baudrate=500_000)
+    bus.start()
+    port = PortHandler(bus.port_name)
+    ...
+    bus.stop()
+
+Wire timing is emulated per frame: a response is written once its last byte
+would have arrived on a real half-duplex line, i.e. after the servo's Return
+Delay (register 7, 2 µs units) plus the response's wire time at
+``byte_time_us`` per byte.  The request's own wire time is not added: on real
+hardware ``PortHandler.clearPort`` drains the UART before the receive timeout
+starts, on a pty that drain returns immediately.
+"""
+
+import argparse
+import multiprocessing
+import os
+import pty
+import random
+import select
+import threading
+import time
+import tty
+
+from .scservo_def import *
+from .sms_sts import *
+from .port_handler import DEFAULT_BAUDRATE
+from kos_zbot.utils.logging import get_logger
+
+SERVO_MEMORY_SIZE = 256
+RETURN_DELAY_UNIT_US = 2.0        # register 7 counts in 2 µs steps
+
+ADDR_FIRMWARE_MAJOR = 0
+ADDR_FIRMWARE_MINOR = 1
+ADDR_RETURN_DELAY = 7
+ADDR_STATUS_LEVEL = 8
+ADDR_STATUS = 65
+
+# EEPROM/SRAM addresses the host may not write
+READ_ONLY_ADDRS = frozenset(
+    [ADDR_FIRMWARE_MAJOR, ADDR_FIRMWARE_MINOR, SMS_STS_MODEL_L, SMS_STS_MODEL_H]
+    + list(range(SMS_STS_PRESENT_POSITION_L, SMS_STS_PRESENT_CURRENT_H + 1))
+)
+
+# Factory defaults of an STS3215 (addr → (value, size))
+DEFAULT_REGISTERS = {
+    ADDR_FIRMWARE_MAJOR: (3, 1),
+    ADDR_FIRMWARE_MINOR: (10, 1),
+    SMS_STS_MODEL_L: (777, 2),
+    SMS_STS_BAUD_RATE: (SMS_STS_1M, 1),
+    ADDR_RETURN_DELAY: (0, 1),
+    ADDR_STATUS_LEVEL: (1, 1),
+    SMS_STS_MIN_ANGLE_LIMIT_L: (0, 2),
+    SMS_STS_MAX_ANGLE_LIMIT_L: (4095, 2),
+    13: (70, 1),                  # Max Temperature Limit
+    14: (140, 1),                 # Max Voltage Limit
+    15: (40, 1),                  # Min Voltage Limit
+    16: (1000, 2),                # Max Torque Limit
+    18: (12, 1),                  # Phase
+    19: (44, 1),                  # Unloading Condition
+    20: (47, 1),                  # LED Alarm Condition
+    21: (32, 1),                  # P Coefficient
+    22: (32, 1),                  # D Coefficient
+    23: (0, 1),                   # I Coefficient
+    24: (16, 2),                  # Minimum Startup Force
+    SMS_STS_CW_DEAD: (1, 1),
+    SMS_STS_CCW_DEAD: (1, 1),
+    28: (500, 2),                 # Protection Current
+    30: (1, 1),                   # Angular Resolution
+    SMS_STS_OFS_L: (0, 2),
+    SMS_STS_MODE: (0, 1),
+    34: (20, 1),                  # Protective Torque
+    35: (200, 1),                 # Protection Time
+    36: (80, 1),                  # Overload Torque
+    37: (10, 1),                  # Speed closed loop P
+    38: (200, 1),                 # Over Current Protection Time
+    39: (200, 1),                 # Velocity closed loop I
+    SMS_STS_LOCK: (1, 1),
+    SMS_STS_PRESENT_VOLTAGE: (120, 1),
+    SMS_STS_PRESENT_TEMPERATURE: (30, 1),
+    SMS_STS_DEFAULT_MOVING_THRESHOLD: (2, 1),
+    SMS_STS_DEFAULT_DTS_MS: (32, 1),
+    SMS_STS_DEFAULT_VK_MS: (32, 1),
+    SMS_STS_DEFAULT_VMIN: (1, 1),
+    SMS_STS_DEFAULT_VMAX: (254, 1),
+    SMS_STS_DEFAULT_AMAX: (50, 1),
+    SMS_STS_DEFAULT_KACC: (8, 1),
+}
+
+
+def _to_sign_magnitude(value, bit=15):
+    return (-value | (1 << bit)) if value < 0 else value
+
+
+def _from_sign_magnitude(value, bit=15):
+    return -(value & ~(1 << bit)) if value & (1 << bit) else value
+
+
+class VirtualServo:
+    """Register-level model of a single SMS/STS servo."""
+
+    def __init__(self, scs_id, model=777, position=2048, return_delay=0):
+        self.mem = bytearray(SERVO_MEMORY_SIZE)
+        for addr, (value, size) in DEFAULT_REGISTERS.items():
+            self._poke(addr, value, size)
+        self._poke(SMS_STS_MODEL_L, model, 2)
+        self._poke(SMS_STS_ID, scs_id, 1)
+        self._poke(ADDR_RETURN_DELAY, return_delay, 1)
+        self._poke(SMS_STS_GOAL_POSITION_L, position, 2)
+        self._poke(SMS_STS_PRESENT_POSITION_L, position, 2)
+
+        self.error = 0               # error byte reported in status packets
+        self.responsive = True       # False → servo never answers (dead link)
+        self.pending_write = None    # (address, data) buffered by REG_WRITE
+        self._position = float(position)
+        self._last_update = time.monotonic()
+
+    @property
+    def scs_id(self):
+        return self.mem[SMS_STS_ID]
+
+    @property
+    def return_delay_us(self):
+        return self.mem[ADDR_RETURN_DELAY] * RETURN_DELAY_UNIT_US
+
+    @property
+    def status_level(self):
+        return self.mem[ADDR_STATUS_LEVEL]
+
+    def _poke(self, address, value, size):
+        self.mem[address] = value & 0xFF
+        if size == 2:
+            self.mem[address + 1] = (value >> 8) & 0xFF
+
+    def _peek(self, address, size):
+        if size == 2:
+            return self.mem[address] | (self.mem[address + 1] << 8)
+        return self.mem[address]
+
+    def update(self, now=None):
+        """Advance the motion model: slew towards the goal at the goal speed."""
+        now = time.monotonic() if now is None else now
+        dt = now - self._last_update
+        self._last_update = now
+        if not self.mem[SMS_STS_TORQUE_ENABLE]:
+            self._poke(SMS_STS_PRESENT_SPEED_L, 0, 2)
+            self.mem[SMS_STS_MOVING] = 0
+            return
+
+        goal = _from_sign_magnitude(self._peek(SMS_STS_GOAL_POSITION_L, 2))
+        speed = abs(_from_sign_magnitude(self._peek(SMS_STS_GOAL_SPEED_L, 2)))
+        error = goal - self._position
+        if speed == 0 or abs(error) <= speed * dt:
+            velocity = error / dt if (dt > 0 and speed) else 0.0
+            self._position = float(goal)
+        else:
+            velocity = speed if error > 0 else -speed
+            self._position += velocity * dt
+
+        self._poke(SMS_STS_PRESENT_POSITION_L, _to_sign_magnitude(int(round(self._position))), 2)
+        self._poke(SMS_STS_PRESENT_SPEED_L, _to_sign_magnitude(int(velocity)), 2)
+        self.mem[SMS_STS_MOVING] = 1 if self._position != goal else 0
+
+    def read(self, address, length):
+        self.update()
+        return bytes(self.mem[address:address + length])
+
+    def write(self, address, data):
+        self.update()
+        for offset, value in enumerate(data):
+            addr = address + offset
+            if addr >= SERVO_MEMORY_SIZE:
+                break
+            if addr not in READ_ONLY_ADDRS:
+                self.mem[addr] = value
+
+
+class VirtualBus:
+    """Half-duplex bus of ``VirtualServo`` instances behind a pty."""
+
+    def __init__(
+        self,
+        servos=None,
+        baudrate=DEFAULT_BAUDRATE,
+        byte_time_us=None,
+        return_delay_us=None,
+        drop_rate=0.0,
+        corrupt_rate=0.0,
+        chunk_bytes=None,
+        seed=None,
+    ):
+        """
+        baudrate        : used to derive ``byte_time_us`` (10 bits per byte)
+        byte_time_us    : override the per-byte wire time (0 → no wire delay)
+        return_delay_us : override every servo's Return Delay register
+        drop_rate       : probability a status frame is never sent
+        corrupt_rate    : probability a status frame has one byte flipped
+        chunk_bytes     : write responses in chunks of this many bytes, each at
+                          its own wire deadline (None → whole frame at once)
+        """
+        self.servos = {}
+        for servo in servos or []:
+            self.add_servo(servo)
+
+        self.baudrate = baudrate
+        self.byte_time_us = (
+            10.0 * 1_000_000 / baudrate if byte_time_us is None else byte_time_us
+        )
+        self.return_delay_us = return_delay_us
+        self.drop_rate = drop_rate
+        self.corrupt_rate = corrupt_rate
+        self.chunk_bytes = chunk_bytes
+        self.rng = random.Random(seed)
+
+        self.stats = {
+            "rx_frames": 0,
+            "rx_bytes": 0,
+            "rx_corrupt": 0,
+            "tx_frames": 0,
+            "tx_bytes": 0,
+            "dropped": 0,
+            "corrupted": 0,
+        }
+
+        self.log = get_logger(__name__)
+        self._master_fd, self._slave_fd = pty.openpty()
+        tty.setraw(self._master_fd)
+        tty.setraw(self._slave_fd)
+        self.port_name = os.ttyname(self._slave_fd)
+
+        self._rx = bytearray()
+        self._running = False
+        self._thread = None
+        self._process = None
+        self._stop_event = None
+        self._stats_rx = None
+        self._lock = threading.Lock()
+
+    # ── servo management ──────────────────────────────────────────────────────
+    def add_servo(self, servo):
+        self.servos[servo.scs_id] = servo
+        return servo
+
+    def remove_servo(self, scs_id):
+        return self.servos.pop(scs_id, None)
+
+    # ── lifecycle ─────────────────────────────────────────────────────────────
+    def start(self, process=False):
+        """
+        Serve the bus from a background thread, or from a forked process when
+        ``process`` is True.  In-process serving shares the GIL with the host
+        under test, which skews any timing measurement; servo state mutated by
+        a forked bus is not visible to the parent (``stats`` is copied back on
+        ``stop``).
+        """
+        if self._running:
+            return self
+        self._running = True
+        if process:
+            ctx = multiprocessing.get_context("fork")
+            self._stop_event = ctx.Event()
+            self._stats_rx, stats_tx = ctx.Pipe(duplex=False)
+            self._process = ctx.Process(
+                target=self._serve_process, args=(self._stop_event, stats_tx), daemon=True
+            )
+            self._process.start()
+            stats_tx.close()
+            self._stats_rx.recv()  # child is serving
+        else:
+            self._thread = threading.Thread(target=self._serve, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._process is not None:
+            self._stop_event.set()
+            if self._stats_rx.poll(1.0):
+                self.stats.update(self._stats_rx.recv())
+            self._process.join()
+            self._stats_rx.close()
+            self._process = None
+
+    def close(self):
+        self.stop()
+        os.close(self._master_fd)
+        os.close(self._slave_fd)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ── receive side ──────────────────────────────────────────────────────────
+    def _serve_process(self, stop_event, stats_tx):
+        threading.Thread(target=self._watch_stop, args=(stop_event,), daemon=True).start()
+        stats_tx.send(None)
+        self._serve()
+        stats_tx.send(self.stats)
+        stats_tx.close()
+
+    def _watch_stop(self, stop_event):
+        stop_event.wait()
+        self._running = False
+
+    def _serve(self):
+        while self._running:
+            ready, _, _ = select.select([self._master_fd], [], [], 0.05)
+            if not ready:
+                continue
+            try:
+                chunk = os.read(self._master_fd, 4096)
+            except OSError:
+                continue
+            rx_time = time.monotonic()
+            self.stats["rx_bytes"] += len(chunk)
+            self._rx.extend(chunk)
+            with self._lock:
+                self._parse(rx_time)
+
+    def _parse(self, rx_time):
+        buf = self._rx
+        while True:
+            start = buf.find(b"\xff\xff")
+            if start < 0:
+                # keep a trailing 0xFF, it may be the first half of a header
+                del buf[: len(buf) - 1 if buf.endswith(b"\xff") else len(buf)]
+                return
+            del buf[:start]
+            if len(buf) < 4:
+                return
+            length = buf[PKT_LENGTH]
+            if length < 2:
+                del buf[:1]
+                continue
+            total = length + 4
+            if len(buf) < total:
+                return
+            frame = bytes(buf[:total])
+            del buf[:total]
+
+            if (~sum(frame[2:-1]) & 0xFF) != frame[-1]:
+                self.stats["rx_corrupt"] += 1
+                self.log.debug(f"virtual bus: bad checksum in {frame.hex()}")
+                continue
+
+            self.stats["rx_frames"] += 1
+            self._dispatch(frame[PKT_ID], frame[PKT_INSTRUCTION], frame[5:-1], rx_time)
+
+    def _dispatch(self, scs_id, instruction, params, t0):
+        if instruction == INST_SYNC_READ:
+            self._sync_read(params[0], params[1], params[2:], t0)
+            return
+
+        if instruction == INST_SYNC_WRITE:
+            address, length = params[0], params[1]
+            step = length + 1
+            for idx in range(2, len(params) - length, step):
+                servo = self.servos.get(params[idx])
+                if servo is not None:
+                    servo.write(address, params[idx + 1 : idx + step])
+                    self._rekey(servo, params[idx])
+            return
+
+        targets = (
+            list(self.servos.values())
+            if scs_id == BROADCAST_ID
+            else [self.servos[scs_id]] if scs_id in self.servos else []
+        )
+        for servo in targets:
+            old_id = servo.scs_id
+            reply = b""
+            if instruction == INST_PING:
+                pass
+            elif instruction == INST_READ:
+                reply = servo.read(params[0], params[1])
+            elif instruction == INST_WRITE:
+                servo.write(params[0], params[1:])
+            elif instruction == INST_REG_WRITE:
+                servo.pending_write = (params[0], bytes(params[1:]))
+            elif instruction == INST_ACTION:
+                if servo.pending_write is not None:
+                    servo.write(*servo.pending_write)
+                    servo.pending_write = None
+            else:
+                continue
+            self._rekey(servo, old_id)
+
+            if scs_id == BROADCAST_ID:
+                continue
+            if servo.status_level == 0 and instruction not in (INST_PING, INST_READ):
+                continue
+            self._respond(servo, reply, t0)
+
+    def _rekey(self, servo, old_id):
+        if servo.scs_id != old_id and self.servos.get(old_id) is servo:
+            del self.servos[old_id]
+            self.servos[servo.scs_id] = servo
+
+    def _sync_read(self, address, length, ids, t0):
+        t = t0
+        for scs_id in ids:
+            servo = self.servos.get(scs_id)
+            if servo is None:
+                continue
+            t = self._respond(servo, servo.read(address, length), t)
+
+    # ── transmit side ─────────────────────────────────────────────────────────
+    def _respond(self, servo, params, t0):
+        """Send a status frame for ``servo``; returns the wire time it ends at."""
+        if not servo.responsive:
+            return t0
+
+        delay_us = (
+            servo.return_delay_us if self.return_delay_us is None else self.return_delay_us
+        )
+        frame = bytearray((0xFF, 0xFF, servo.scs_id, len(params) + 2, servo.error))
+        frame.extend(params)
+        frame.append(~sum(frame[2:]) & 0xFF)
+
+        start = t0 + delay_us / 1e6
+        end = start + len(frame) * self.byte_time_us / 1e6
+
+        if self.drop_rate and self.rng.random() < self.drop_rate:
+            self.stats["dropped"] += 1
+            return end
+        if self.corrupt_rate and self.rng.random() < self.corrupt_rate:
+            self.stats["corrupted"] += 1
+            frame[self.rng.randrange(2, len(frame))] ^= 1 << self.rng.randrange(8)
+
+        self._transmit(frame, start)
+        self.stats["tx_frames"] += 1
+        self.stats["tx_bytes"] += len(frame)
+        return end
+
+    def _transmit(self, frame, start):
+        chunk = self.chunk_bytes or len(frame)
+        byte_s = self.byte_time_us / 1e6
+        for idx in range(0, len(frame), chunk):
+            part = frame[idx : idx + chunk]
+            _sleep_until(start + (idx + len(part)) * byte_s)
+            os.write(self._master_fd, part)
+
+
+def _sleep_until(deadline, spin_s=0.0002):
+    """Coarse sleep, then spin the last ``spin_s`` for sub-scheduler accuracy."""
+    remaining = deadline - time.monotonic()
+    if remaining > spin_s:
+        time.sleep(remaining - spin_s)
+    while time.monotonic() < deadline:
+        pass
+
+
+def _parse_ids(spec):
+    ids = []
+    for part in spec.split(","):
+        if "-" in part:
+            lo, hi = part.split("-")
+            ids.extend(range(int(lo), int(hi) + 1))
+        elif part:
+            ids.append(int(part))
+    return ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a virtual Feetech servo bus on a pty")
+    parser.add_argument("--ids", default="31-35,41-45", help="servo IDs, e.g. 1-10,20")
+    parser.add_argument("--baudrate", type=int, default=DEFAULT_BAUDRATE)
+    parser.add_argument("--byte-time-us", type=float, default=None)
+    parser.add_argument("--return-delay-us", type=float, default=None)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--corrupt-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    bus = VirtualBus(
+        [VirtualServo(i) for i in _parse_ids(args.ids)],
+        baudrate=args.baudrate,
+        byte_time_us=args.byte_time_us,
+        return_delay_us=args.return_delay_us,
+        drop_rate=args.drop_rate,
+        corrupt_rate=args.corrupt_rate,
+        seed=args.seed,
+    )
+    with bus:
+        print(bus.port_name, flush=True)
+        try:
+            while True:
+                time.sleep(1.0)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""
+Binary ring-buffer recorder of per-tick joint state, commands and faults.
+
+The update loop appends one fixed-width record per tick: the state store's
+arrays (slot order) and the raw sync-write parameters of the tick, copied
+byte for byte, with no formatting and no I/O on the hot path.  Faults
+(no reply, servo error byte, failed sync-read, quarantine, overrun) are
+records of the same width carrying a numeric code.  Records live in a
+preallocated ``mmap`` (of a file, or anonymous memory), so after a fall
+the last ``capacity`` ticks are on disk as the page cache left them.
+
+File layout (little-endian):
+
+    header   magic "KOSR", version, record size, capacity, joints, head
+             (records ever written), padded to 64 bytes
+    records  capacity x record size, record k at (k % capacity)
+
+    record   t_ns u64, tick u32, kind u8, command count u8, reserved u16
+      tick   ids u8[J], valid u8[J], voltage u8[J], temperature u8[J],
+             position i32[J], velocity i32[J], load i32[J] (raw counts),
+             sync-write params (id, position, time, speed) x command count
+      fault  actuator id u8, code u8, reserved u16, detail i32
+
+Decode offline with ``read_log()`` / ``to_csv()`` / ``to_dataframes()``, or:
+
+    python -m kos.flight_recorder robot.kosr --csv robot
+"""
+
+import argparse
+import csv
+import mmap
+import struct
+import time
+from typing import Dict, List, Optional, Tuple
+
+MAGIC = b"KOSR"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sIIIIQ")  # magic, version, record size, capacity, joints, head
+_HEADER_LEN = 64
+_HEAD_OFFSET = 24
+_RECORD = struct.Struct("<QIBBH")  # t_ns, tick, kind, command count, reserved
+_FAULT = struct.Struct("<BBHi")  # actuator id, code, reserved, detail
+_COMMAND = struct.Struct("<BHHH")  # sync-write params of one servo
+COMMAND_LEN = _COMMAND.size  # 7: id + goal position, time, speed
+
+KIND_TICK = 1
+KIND_FAULT = 2
+
+FAULT_OTHER = 0
+FAULT_NO_REPLY = 1
+FAULT_SERVO_ERROR = 2  # detail: error byte of the status packet
+FAULT_SYNC_READ = 3  # detail: COMM_* result
+FAULT_SERVO_STATUS = 4  # detail: status register (telemetry)
+FAULT_QUARANTINED = 5
+FAULT_RECOVERED = 6
+FAULT_OVERRUN = 7  # detail: µs past the tick
+
+FAULT_NAMES = {
+    FAULT_OTHER: "other",
+    FAULT_NO_REPLY: "no_reply",
+    FAULT_SERVO_ERROR: "servo_error",
+    FAULT_SYNC_READ: "sync_read",
+    FAULT_SERVO_STATUS: "servo_status",
+    FAULT_QUARANTINED: "quarantined",
+    FAULT_RECOVERED: "recovered",
+    FAULT_OVERRUN: "overrun",
+}
+
+
+def _layout(joints: int) -> Tuple[Dict[str, int], int]:
+    """Offsets of the tick sections inside a record, and the record size"""
+    offsets = {}
+    off = _RECORD.size
+    for name, width in (
+        ("ids", 1),
+        ("valid", 1),
+        ("voltages", 1),
+        ("temperatures", 1),
+        ("positions", 4),
+        ("velocities", 4),
+        ("loads", 4),
+        ("commands", COMMAND_LEN),
+    ):
+        offsets[name] = off
+        off += width * joints
+    return offsets, (off + 7) & ~7
+
+
+class FlightRecorder:
+    def __init__(self, path: Optional[str], capacity: int, joints: int):
+        """
+        path     : file to map (created / overwritten), None for anonymous memory
+        capacity : records kept; older ones are overwritten
+        joints   : state store capacity (slots per tick record)
+        """
+        self.path = path
+        self.capacity = capacity
+        self.joints = joints
+        self._offsets, self.record_size = _layout(joints)
+        size = _HEADER_LEN + capacity * self.record_size
+
+        if path is None:
+            self._file = None
+            self._map = mmap.mmap(-1, size)
+        else:
+            self._file = open(path, "w+b")
+            self._file.truncate(size)
+            self._map = mmap.mmap(self._file.fileno(), size)
+        self._buf = memoryview(self._map)
+        _HEADER.pack_into(self._buf, 0, MAGIC, VERSION, self.record_size, capacity, joints, 0)
+
+        self.head = 0
+        self.tick = 0
+        self._store = None
+        self._store_views = None
+        self._store_layout = None
+
+    def _attach(self, store):
+        """Byte views of the store's arrays (they are never reallocated)"""
+        self._store = store
+        self._store_views = [
+            (self._offsets[name], memoryview(getattr(store, name)).cast("B"))
+            for name in ("valid", "voltages", "temperatures", "positions", "velocities", "loads")
+        ]
+        self._store_layout = None
+
+    def _next_record(self) -> int:
+        return _HEADER_LEN + (self.head % self.capacity) * self.record_size
+
+    def _commit(self):
+        self.head += 1
+        struct.pack_into("<Q", self._buf, _HEAD_OFFSET, self.head)
+
+    # -- update thread --------------------------------------------------------
+
+    def record_tick(self, t_ns: int, store, commands, command_len: int):
+        """Append the state store and `command_len` bytes of sync-write
+        params (`commands`, 7 bytes per servo) as one tick record"""
+        if store is not self._store:
+            self._attach(store)
+        buf = self._buf
+        off = self._next_record()
+        count = min(command_len // COMMAND_LEN, self.joints)
+        _RECORD.pack_into(buf, off, t_ns, self.tick, KIND_TICK, count, 0)
+
+        layout = store.layout
+        if layout is not self._store_layout:
+            # slot → id map changes only when actuators come or go
+            slot_ids = bytearray(self.joints)
+            for actuator_id, slot in zip(layout[0], layout[1]):
+                slot_ids[slot] = actuator_id
+            self._slot_ids = bytes(slot_ids)
+            self._store_layout = layout
+        start = off + self._offsets["ids"]
+        buf[start : start + self.joints] = self._slot_ids
+
+        for section, view in self._store_views:
+            start = off + section
+            buf[start : start + len(view)] = view
+        start = off + self._offsets["commands"]
+        buf[start : start + count * COMMAND_LEN] = commands[: count * COMMAND_LEN]
+
+        self.tick += 1
+        self._commit()
+
+    def fault(self, actuator_id: int, code: int, detail: int = 0, t_ns: Optional[int] = None):
+        """Append a fault record (any thread that holds the bus)"""
+        off = self._next_record()
+        _RECORD.pack_into(
+            self._buf, off, time.monotonic_ns() if t_ns is None else t_ns, self.tick, KIND_FAULT, 0, 0
+        )
+        _FAULT.pack_into(self._buf, off + _RECORD.size, actuator_id, code, 0, detail)
+        self._commit()
+
+    # -- lifecycle --------------------------------------------------------------
+
+    def flush(self):
+        self._map.flush()
+
+    def close(self):
+        if self._map is None:
+            return
+        self._store_views = None
+        self._buf.release()
+        self._map.flush()
+        self._map.close()
+        self._map = None
+        if self._file is not None:
+            self._file.close()
+
+
+# -- offline decoding -----------------------------------------------------------
+
+
+def read_log(path: str) -> Tuple[List[dict], List[dict]]:
+    """(tick rows, fault rows) of a recorder file, oldest first.
+
+    A tick row is one joint of one tick: t_ns, tick, id, valid, position,
+    velocity, load, voltage, temperature (raw counts) and the goal position
+    / speed sent that tick (None when the joint was not in the sync-write).
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, record_size, capacity, joints, head = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a flight recorder log")
+    if version != VERSION:
+        raise ValueError(f"{path}: recorder version {version}, expected {VERSION}")
+    offsets, _ = _layout(joints)
+
+    ticks: List[dict] = []
+    faults: List[dict] = []
+    for index in range(max(0, head - capacity), head):
+        off = _HEADER_LEN + (index % capacity) * record_size
+        t_ns, tick, kind, count, _ = _RECORD.unpack_from(data, off)
+        if kind == KIND_FAULT:
+            actuator_id, code, _, detail = _FAULT.unpack_from(data, off + _RECORD.size)
+            faults.append(
+                {
+                    "t_ns": t_ns,
+                    "tick": tick,
+                    "id": actuator_id,
+                    "fault": FAULT_NAMES.get(code, str(code)),
+                    "detail": detail,
+                }
+            )
+            continue
+        if kind != KIND_TICK:
+            continue
+
+        commands = {}
+        for k in range(count):
+            actuator_id, position, _, speed = _COMMAND.unpack_from(
+                data, off + offsets["commands"] + k * COMMAND_LEN
+            )
+            commands[actuator_id] = (position, speed)
+
+        def column(name, fmt):
+            return struct.unpack_from(f"<{joints}{fmt}", data, off + offsets[name])
+
+        ids = column("ids", "B")
+        valid = column("valid", "B")
+        voltages = column("voltages", "B")
+        temperatures = column("temperatures", "B")
+        positions = column("positions", "i")
+        velocities = column("velocities", "i")
+        loads = column("loads", "i")
+        for slot, actuator_id in enumerate(ids):
+            if not actuator_id:
+                continue
+            goal = commands.get(actuator_id, (None, None))
+            ticks.append(
+                {
+                    "t_ns": t_ns,
+                    "tick": tick,
+                    "id": actuator_id,
+                    "valid": valid[slot],
+                    "position": positions[slot],
+                    "velocity": velocities[slot],
+                    "load": loads[slot],
+                    "voltage": voltages[slot],
+                    "temperature": temperatures[slot],
+                    "goal_position": goal[0],
+                    "goal_speed": goal[1],
+                }
+            )
+    return ticks, faults
+
+
+def to_dataframes(path: str):
+    """(ticks, faults) as pandas DataFrames"""
+    import pandas as pd
+
+    ticks, faults = read_log(path)
+    return pd.DataFrame(ticks), pd.DataFrame(faults)
+
+
+def to_csv(path: str, prefix: str) -> Tuple[str, str]:
+    """Write <prefix>_ticks.csv and <prefix>_faults.csv; returns their paths"""
+    ticks, faults = read_log(path)
+    written = []
+    for name, rows, fields in (
+        ("ticks", ticks, ticks[0].keys() if ticks else ()),
+        ("faults", faults, faults[0].keys() if faults else ()),
+    ):
+        out = f"{prefix}_{name}.csv"
+        with open(out, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(fields))
+            writer.writeheader()
+            writer.writerows(rows)
+        written.append(out)
+    return written[0], written[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode a flight recorder log")
+    parser.add_argument("log")
+    parser.add_argument("--csv", help="write <CSV>_ticks.csv and <CSV>_faults.csv")
+    args = parser.parse_args()
+
+    if args.csv:
+        for out in to_csv(args.log, args.csv):
+            print(out)
+        return
+    ticks, faults = read_log(args.log)
+    print(f"{len({row['tick'] for row in ticks})} ticks, {len(faults)} faults")
+    for row in faults:
+        print(f"{row['t_ns'] / 1e9:14.6f}  tick {row['tick']:>8}  id {row['id']:>3}  {row['fault']:<13}{row['detail']}")
+
+
+if __name__ == "__main__":
+    main()
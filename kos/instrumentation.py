@@ -0,0 +1,238 @@
+"""
+Per-phase timing of the control loop.
+
+Every tick of ``SCSMotorController._update_loop`` is split into phases
+(waiting for the bus, merging targets, sync-write, write→read gap,
+sync-read, decode, state swap, flight recorder, telemetry, serving other
+bus users, sleep, spin).  Each phase feeds a fixed-size log-bucketed histogram, so the
+update thread records a sample with one ``frexp`` and one array store:
+no allocation, no lock.  Readers copy the bucket array and compute
+percentiles from the copy.
+
+Garbage-collector pauses are timed through ``gc.callbacks`` and show up
+as their own phase.  When a tick overruns, its phase breakdown is kept in
+a short ring of overrun events, so a hard overrun can be traced to the
+bus, the collector or a wait on a lock:
+
+    controller.get_timing_stats()["read"]["p99"]
+    controller.instrumentation.overruns()
+    print(controller.instrumentation.dump())
+"""
+
+import gc
+import math
+import time
+from array import array
+from collections import deque
+from typing import Dict, List, Optional
+
+SUB_BUCKETS = 8  # buckets per power of two: ~9% resolution
+OCTAVES = 24  # 1 µs .. ~16 s
+BUCKETS = 1 + SUB_BUCKETS * OCTAVES  # bucket 0 holds everything below 1 µs
+
+# loop phases, in tick order
+PHASES = (
+    "bus_wait",  # entering bus.control(): a transaction was still on the wire
+    "merge",  # queued targets, shared-memory targets, keyframes
+    "trajectory",  # servo-side trajectory SYNC WRITE
+    "write",  # sync-write serialisation + TX
+    "gap",  # waiting for the sync-write to leave the wire
+    "read",  # sync-read TX + status packets
+    "decode",  # status packets → state store
+    "swap",  # state store commit + shared-memory publish
+    "record",  # flight recorder tick record
+    "telemetry",
+    "probe",  # pinging quarantined servos
+    "serve",  # configuration/diagnostics transactions in the idle window
+    "sleep",
+    "spin",
+    "gc",  # collector pauses (any thread)
+)
+# whole-tick figures
+TICK_STATS = (
+    "tick_jitter_us",  # tick start vs schedule
+    "tick_work_us",  # bus work per tick
+    "write_read_gap_us",  # sync-write returned ↔ sync-read TX (write-then-read ticks only)
+)
+
+MINOR_OVERRUN_US = 500
+OVERRUN_US = 2_000
+HARD_OVERRUN_US = 5_000
+
+
+def bucket_of(us: float) -> int:
+    if us < 1.0:
+        return 0
+    mantissa, exponent = math.frexp(us)  # us = mantissa * 2**exponent, 0.5 <= mantissa < 1
+    index = 1 + (exponent - 1) * SUB_BUCKETS + int((2 * mantissa - 1) * SUB_BUCKETS)
+    return index if index < BUCKETS else BUCKETS - 1
+
+
+def bucket_upper_us(index: int) -> float:
+    """Upper edge of a bucket in µs"""
+    if index == 0:
+        return 1.0
+    octave, sub = divmod(index - 1, SUB_BUCKETS)
+    return 2.0 ** octave * (1 + (sub + 1) / SUB_BUCKETS)
+
+
+class Histogram:
+    """Log-bucketed histogram of µs values; one writer, any number of readers"""
+
+    __slots__ = ("buckets", "total", "max")
+
+    def __init__(self):
+        self.buckets = array("Q", bytes(8 * BUCKETS))
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, us: float):
+        if us < 0:
+            raise ValueError(f"negative duration: {us} us")
+        self.buckets[bucket_of(us)] += 1
+        self.total += us
+        if us > self.max:
+            self.max = us
+
+    def reset(self):
+        self.buckets = array("Q", bytes(8 * BUCKETS))
+        self.total = 0.0
+        self.max = 0.0
+
+    def summary(self, percentiles=(50, 90, 99, 99.9)) -> Optional[dict]:
+        """count, mean, percentiles (bucket upper edges, capped at max) and max"""
+        buckets = self.buckets[:]  # one C-level copy: consistent enough to read
+        count = sum(buckets)
+        if not count:
+            return None
+        peak = self.max
+        out = {"count": count, "mean": self.total / count}
+        targets = [(p, math.ceil(count * p / 100)) for p in percentiles]
+        seen = 0
+        index = 0
+        for p, rank in targets:
+            while seen < rank:
+                seen += buckets[index]
+                index += 1
+            out[f"p{p:g}"] = min(bucket_upper_us(index - 1), peak)
+        out["max"] = peak
+        return out
+
+
+class LoopInstrumentation:
+    def __init__(self, max_overruns: int = 32):
+        self.histograms: Dict[str, Histogram] = {
+            name: Histogram() for name in PHASES + TICK_STATS
+        }
+        self._tick = dict.fromkeys(PHASES, 0.0)  # µs per phase in the current tick
+        self._gc_start_ns = 0
+        self._gc_installed = False
+        self.overrun_counts = {"minor": 0, "overrun": 0, "hard": 0}
+        self._overruns: deque = deque(maxlen=max_overruns)
+
+    # -- update thread --------------------------------------------------------
+
+    def begin_tick(self):
+        tick = self._tick
+        for phase in tick:
+            tick[phase] = 0.0
+
+    def lap(self, phase: str, since_ns: int) -> int:
+        """Record `phase` as having run from `since_ns` until now; returns now"""
+        now = time.monotonic_ns()
+        us = (now - since_ns) / 1_000
+        self.histograms[phase].add(us)
+        self._tick[phase] += us
+        return now
+
+    def add(self, name: str, us: float):
+        self.histograms[name].add(us)
+        if name in self._tick:
+            self._tick[name] += us
+
+    def overrun(self, over_us: float) -> Optional[str]:
+        """Count an overrun of the tick just finished; returns its class
+        ("minor", "overrun", "hard") or None when it was on time"""
+        if over_us > HARD_OVERRUN_US:
+            kind = "hard"
+        elif over_us > OVERRUN_US:
+            kind = "overrun"
+        elif over_us > MINOR_OVERRUN_US:
+            kind = "minor"
+        else:
+            return None
+        self.overrun_counts[kind] += 1
+        if kind != "minor":
+            self._overruns.append(
+                {
+                    "time": time.time(),
+                    "kind": kind,
+                    "over_us": over_us,
+                    "phases_us": {p: us for p, us in self._tick.items() if us},
+                }
+            )
+        return kind
+
+    def worst_phases(self, n: int = 3) -> str:
+        """The `n` longest phases of the current tick, for log lines"""
+        ranked = sorted(self._tick.items(), key=lambda item: item[1], reverse=True)
+        return ", ".join(f"{phase} {us / 1000:.2f} ms" for phase, us in ranked[:n] if us)
+
+    # -- garbage collector ----------------------------------------------------
+
+    def _on_gc(self, phase: str, info: dict):
+        if phase == "start":
+            self._gc_start_ns = time.monotonic_ns()
+        elif self._gc_start_ns:
+            self.lap("gc", self._gc_start_ns)
+            self._gc_start_ns = 0
+
+    def install_gc_hook(self):
+        if not self._gc_installed:
+            gc.callbacks.append(self._on_gc)
+            self._gc_installed = True
+
+    def remove_gc_hook(self):
+        if self._gc_installed:
+            gc.callbacks.remove(self._on_gc)
+            self._gc_installed = False
+
+    # -- readers --------------------------------------------------------------
+
+    def summary(self) -> Dict[str, Optional[dict]]:
+        """Summary (µs) of every phase and tick figure"""
+        return {name: hist.summary() for name, hist in self.histograms.items()}
+
+    def overruns(self) -> List[dict]:
+        """Latest overruns (beyond OVERRUN_US) with their phase breakdown"""
+        return list(self._overruns)
+
+    def reset(self):
+        for hist in self.histograms.values():
+            hist.reset()
+        for kind in self.overrun_counts:
+            self.overrun_counts[kind] = 0
+        self._overruns.clear()
+
+    def dump(self) -> str:
+        """Table of every histogram plus overrun counts"""
+        lines = [
+            f"{'phase':<18}{'count':>9}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'p99.9':>10}{'max':>10}  (µs)"
+        ]
+        for name, stats in self.summary().items():
+            if stats is None:
+                continue
+            lines.append(
+                f"{name:<18}{stats['count']:>9}{stats['mean']:>10.1f}{stats['p50']:>10.1f}"
+                f"{stats['p90']:>10.1f}{stats['p99']:>10.1f}{stats['p99.9']:>10.1f}{stats['max']:>10.1f}"
+            )
+        counts = self.overrun_counts
+        lines.append(
+            f"overruns: {counts['minor']} minor, {counts['overrun']} overrun, {counts['hard']} hard"
+        )
+        for event in self._overruns:
+            phases = ", ".join(
+                f"{p} {us:.0f}" for p, us in sorted(event["phases_us"].items(), key=lambda i: -i[1])
+            )
+            lines.append(f"  {event['kind']:<8}{event['over_us']:>9.0f} us  [{phases}]")
+        return "\n".join(lines)
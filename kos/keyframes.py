@@ -0,0 +1,151 @@
+"""
+Host-side keyframe interpolation for the control loop.
+
+A policy that calls ``set_targets`` has to do so at the bus rate to get
+smooth motion.  Instead it can hand over sparse keyframes (a position and
+optionally a velocity per joint at a future time) and let the update
+thread evaluate the motion between them every tick:
+
+    controller.set_keyframes([
+        (0.10, {31: {"position": 10.0}, 41: {"position": -10.0}}),
+        (0.20, {31: {"position": 20.0, "velocity": 0.0}, 41: {"position": -20.0, "velocity": 0.0}}),
+    ])
+
+Between two keyframes every joint follows a cubic Hermite segment (linear
+when neither end gives a velocity).  All joints of a track share the
+keyframe times, so a segment is stored as four flat coefficient arrays
+and one tick evaluates every joint in a single pass at one ``tau``, into
+the track's preallocated ``positions``/``speeds`` arrays.
+
+A goal speed of 0 means "as fast as possible" on these servos, so the
+speed written is never 0: it is at least the current segment's average
+speed (kept while holding the last pose, so a servo that lags behind
+still catches up) and at least 1 count/s.
+
+``push()`` may be called from any thread: keyframes go through a deque
+(append/popleft are atomic), so the policy never takes a lock the update
+thread waits on.  ``sample()`` belongs to the update thread.
+"""
+
+from array import array
+from collections import deque
+from typing import Callable, Optional, Sequence, Tuple
+
+# (time, positions, velocities or None), positions/velocities indexed like ids
+Keyframe = Tuple[float, array, Optional[array]]
+
+
+class KeyframeTrack:
+    def __init__(self, ids: Sequence[int], seed: Callable[[], Sequence[float]]):
+        """
+        ids  : joints of the track, in the order of every keyframe's values
+        seed : positions to start from when the track is idle and new
+               keyframes arrive (the joints' current commands)
+        """
+        self.ids = list(ids)
+        self.seed = seed
+        n = len(self.ids)
+        self._pending: deque = deque()
+        self._frames: deque = deque()
+        self._start: Optional[Keyframe] = None  # keyframe the current segment leaves
+        self._next: Optional[Keyframe] = None  # keyframe it arrives at
+        self._end_time = 0.0
+        # p(tau) = a + b*tau + c*tau^2 + d*tau^3, tau = t - start time
+        self._a = array("d", bytes(8 * n))
+        self._b = array("d", bytes(8 * n))
+        self._c = array("d", bytes(8 * n))
+        self._d = array("d", bytes(8 * n))
+        self._min_speed = array("d", [1.0] * n)  # |average slope| of the segment, >= 1
+        # targets of the last sample(): counts and goal speed (counts/s, > 0)
+        self.positions = array("d", bytes(8 * n))
+        self.speeds = array("d", bytes(8 * n))
+        self.playing = False
+        self.segments = 0
+
+    def push(self, t: float, positions: Sequence[float], velocities: Optional[Sequence[float]] = None):
+        """Queue a keyframe at time.monotonic() `t`; keyframes must come in time order"""
+        if len(positions) != len(self.ids) or (velocities is not None and len(velocities) != len(self.ids)):
+            raise ValueError("a keyframe needs one value per joint of the track")
+        self._pending.append(
+            (t, array("d", positions), array("d", velocities) if velocities is not None else None)
+        )
+
+    def clear(self):
+        """Drop every keyframe not yet reached"""
+        self._pending.clear()
+        self._frames.clear()
+
+    def _begin(self, start: Keyframe, end: Keyframe):
+        """Compile the segment start → end into the coefficient arrays"""
+        t0, p0, v0 = start
+        t1, p1, v1 = end
+        h = t1 - t0
+        a, b, c, d = self._a, self._b, self._c, self._d
+        min_speed = self._min_speed
+        for i in range(len(p0)):
+            slope = (p1[i] - p0[i]) / h
+            min_speed[i] = max(abs(slope), 1.0)
+            m0 = v0[i] if v0 is not None else slope
+            m1 = v1[i] if v1 is not None else slope
+            a[i] = p0[i]
+            b[i] = m0
+            c[i] = (3 * slope - 2 * m0 - m1) / h
+            d[i] = (m0 + m1 - 2 * slope) / (h * h)
+        self._start = start
+        self._next = end
+        self._end_time = t1
+        self.segments += 1
+
+    def _hold(self, frame: Keyframe):
+        """Stand still at `frame` until the next keyframe arrives (the speed
+        floor of the segment that led here stays)"""
+        t, p, _ = frame
+        self._a[:] = p
+        for coeffs in (self._b, self._c, self._d):
+            for i in range(len(coeffs)):
+                coeffs[i] = 0.0
+        self._start = (t, p, None)
+        self._next = None
+        self._end_time = t
+
+    def sample(self, now: float) -> bool:
+        """Evaluate the targets at `now` into `positions`/`speeds`.
+
+        Returns False when the track has nothing to play (idle, nothing
+        written); after the last keyframe the track writes its final pose
+        once more and then goes idle.
+        """
+        pending = self._pending
+        while pending:
+            self._frames.append(pending.popleft())
+
+        if not self.playing:
+            if not self._frames:
+                return False
+            # start from where the joints are commanded now, at rest
+            self._hold((now, array("d", self.seed()), None))
+            self.playing = True
+
+        if now >= self._end_time:
+            frames = self._frames
+            reached = self._next if self._next is not None else self._start
+            # keyframes already in the past are reached immediately
+            while frames and frames[0][0] <= now:
+                reached = frames.popleft()
+            if frames:
+                self._begin(reached, frames.popleft())
+            else:
+                self._hold(reached)
+                self.playing = False  # hold the last pose once, then idle
+
+        tau = now - self._start[0]
+        tau2 = 2 * tau
+        tau3 = 3 * tau * tau
+        a, b, c, d = self._a, self._b, self._c, self._d
+        positions, speeds, min_speed = self.positions, self.speeds, self._min_speed
+        for i in range(len(a)):
+            bi, ci, di = b[i], c[i], d[i]
+            positions[i] = a[i] + tau * (bi + tau * (ci + tau * di))
+            speed = abs(bi + tau2 * ci + tau3 * di)
+            speeds[i] = speed if speed > min_speed[i] else min_speed[i]
+        return True
@@ -0,0 +1,149 @@
+"""
+Per-servo link quality and learned sync-read deadlines.
+
+After every sync-read the tracker records, for each servo, whether its
+status frame arrived, how long after the request it arrived, and how many
+of its frames were dropped for a bad checksum.  From the arrival-latency
+histogram of each servo it learns a deadline (high percentile plus a
+margin) and hands the deadlines to ``GroupSyncRead.deadline_us``: a servo
+that stays silent then stalls the tick only until its own deadline, not
+for the wire-time estimate of the whole burst plus the port's fixed
+floor.
+
+A deadline is only learned once a servo has ``MIN_SAMPLES`` replies.  If
+a servo that still answers starts missing its deadline (more than
+``TIGHT_TIMEOUT_RATE`` of a window), the learned deadlines are dropped
+and relearned with a wider margin, so a servo that became slower is not
+cut off for good.
+"""
+
+from typing import Dict, Iterable, Optional
+
+from .instrumentation import Histogram
+
+MIN_SAMPLES = 200  # replies before a servo's deadline is trusted
+PERCENTILE = 99.9
+MARGIN = 1.25  # deadline = percentile latency * margin + slack
+MAX_MARGIN = 4.0
+SLACK_US = 150.0
+WINDOW = 500  # sync-reads between deadline updates
+TIGHT_TIMEOUT_RATE = 0.01
+
+
+class ServoLink:
+    __slots__ = ("latency", "requests", "replies", "crc_errors", "window_requests", "window_replies")
+
+    def __init__(self):
+        self.latency = Histogram()  # µs from request to status frame
+        self.requests = 0
+        self.replies = 0
+        self.crc_errors = 0
+        self.window_requests = 0
+        self.window_replies = 0
+
+    def summary(self, deadline_us: Optional[float]) -> dict:
+        timeouts = self.requests - self.replies
+        return {
+            "requests": self.requests,
+            "replies": self.replies,
+            "timeouts": timeouts,
+            "timeout_rate": timeouts / self.requests if self.requests else 0.0,
+            "crc_errors": self.crc_errors,
+            "crc_rate": self.crc_errors / (self.replies + self.crc_errors)
+            if self.replies + self.crc_errors
+            else 0.0,
+            "latency_us": self.latency.summary(),
+            "deadline_us": deadline_us,
+        }
+
+
+class LinkQuality:
+    def __init__(self, floor_us: float = 0.0, cap_us: Optional[float] = None):
+        """
+        floor_us : shortest deadline handed out (e.g. wire time of one frame)
+        cap_us   : longest deadline handed out (None: unlimited)
+        """
+        self.links: Dict[int, ServoLink] = {}
+        self.deadline_us: Dict[int, float] = {}
+        self.floor_us = floor_us
+        self.cap_us = cap_us
+        self.margin = MARGIN
+        self.relearned = 0
+        self._reads = 0
+        self._crc_seen: Dict[int, int] = {}
+
+    def _link(self, actuator_id: int) -> ServoLink:
+        link = self.links.get(actuator_id)
+        if link is None:
+            link = self.links[actuator_id] = ServoLink()
+        return link
+
+    def record_sync_read(self, gsr):
+        """Account the sync-read `gsr` just completed (update thread)"""
+        tx_ns = gsr.tx_stamp_ns
+        received, arrival = gsr.received_ids, gsr.arrival_dict
+        for actuator_id in gsr.param:
+            link = self.links.get(actuator_id) or self._link(actuator_id)
+            link.requests += 1
+            link.window_requests += 1
+            if actuator_id in received:
+                link.replies += 1
+                link.window_replies += 1
+                link.latency.add((arrival[actuator_id] - tx_ns) / 1_000)
+
+        for actuator_id, count in gsr.crc_fail_dict.items():
+            seen = self._crc_seen.get(actuator_id, 0)
+            if count != seen:
+                self._link(actuator_id).crc_errors += count - seen
+                self._crc_seen[actuator_id] = count
+
+        self._reads += 1
+        if self._reads % WINDOW == 0:
+            self._update_deadlines(gsr.param)
+            gsr.deadline_us = self.deadline_us
+
+    def _update_deadlines(self, ids: Iterable[int]):
+        tight = False
+        for actuator_id in ids:
+            link = self.links[actuator_id]
+            missed = link.window_requests - link.window_replies
+            if (
+                actuator_id in self.deadline_us
+                and link.window_replies
+                and missed > TIGHT_TIMEOUT_RATE * link.window_requests
+            ):
+                tight = True
+            link.window_requests = link.window_replies = 0
+
+        if tight:
+            # replies come later than learned: start over with more headroom
+            self.margin = min(self.margin * 1.5, MAX_MARGIN)
+            self.relearned += 1
+            for link in self.links.values():
+                link.latency.reset()
+            self.deadline_us = {}
+            return
+
+        deadlines = {}
+        for actuator_id in ids:
+            stats = self.links[actuator_id].latency.summary(percentiles=(PERCENTILE,))
+            if stats is None or stats["count"] < MIN_SAMPLES:
+                continue
+            deadline = max(stats[f"p{PERCENTILE:g}"] * self.margin + SLACK_US, self.floor_us)
+            if self.cap_us is not None:
+                deadline = min(deadline, self.cap_us)
+            deadlines[actuator_id] = deadline
+        self.deadline_us = deadlines
+
+    def forget(self, actuator_id: int):
+        """Drop everything learned about a servo (removed or replaced)"""
+        self.links.pop(actuator_id, None)
+        self.deadline_us.pop(actuator_id, None)
+        self._crc_seen.pop(actuator_id, None)
+
+    def summary(self) -> Dict[int, dict]:
+        """Per-servo counters, rates, latency distribution (µs) and deadline"""
+        return {
+            actuator_id: link.summary(self.deadline_us.get(actuator_id))
+            for actuator_id, link in sorted(self.links.items())
+        }
@@ -0,0 +1,236 @@
+"""
+Several servo buses driven in parallel behind one controller interface.
+
+Each bus (serial adapter) gets its own ``SCSMotorController`` restricted to
+the actuators wired to it, with its update loop pinned to its own core.
+Bus time is then spent in parallel: two legs on two adapters halve the
+wire time of every tick.  All loops tick on one shared grid (same period,
+same epoch), so the state of every bus comes from the same control
+instant.
+
+    controller = MultiBusController(
+        [
+            {"device": "/dev/ttyUSB0", "actuator_ids": LEFT_LEG_JOINT_IDS, "cpu_core": 1},
+            {"device": "/dev/ttyUSB1", "actuator_ids": RIGHT_LEG_JOINT_IDS, "cpu_core": 2},
+        ],
+        rate=100,
+    )
+    controller.start()
+    controller.set_targets({31: {"position": 0.0, "velocity": 0.0}, 41: ...})
+"""
+
+import os
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from .actuator import SCSMotorController
+from .bus_cache import DEFAULT_TOPOLOGY_CACHE
+from .state_store import JointStateSnapshot
+
+# keys of a bus spec that are SCSMotorController arguments
+BUS_KEYS = ("device", "baudrate", "actuator_ids", "cpu_core", "capture", "topology_cache")
+
+
+def _bus_cache_path(base: str, device: str) -> str:
+    """Per-bus topology cache next to `base`: <base>-<device name>.json"""
+    root, ext = os.path.splitext(base)
+    return f"{root}-{os.path.basename(device)}{ext or '.json'}"
+
+
+class MultiBusController:
+    def __init__(self, buses: List[dict], rate=50, **kwargs):
+        """
+        buses  : one dict per port with "device" and "actuator_ids", optionally
+                 "baudrate", "cpu_core" (default: bus index + 1) and
+                 "capture" (file recording the port's bytes for replay) and
+                 "topology_cache" (default: one file per bus derived from
+                 the topology_cache keyword, None disables it)
+        kwargs : passed to every SCSMotorController (robot_metadata,
+                 extended_state, telemetry_rate, read_first, ...)
+        """
+        self.log = logger
+        self.rate = rate
+        self.period = 1.0 / rate
+
+        # buses discover in parallel: each gets its own topology cache file
+        cache_base = kwargs.pop("topology_cache", DEFAULT_TOPOLOGY_CACHE)
+        specs = []
+        for index, bus in enumerate(buses):
+            unknown = set(bus) - set(BUS_KEYS)
+            if unknown:
+                raise ValueError(f"unknown bus settings: {sorted(unknown)}")
+            spec = dict(bus)
+            spec.setdefault("cpu_core", index + 1)
+            if "topology_cache" not in spec:
+                spec["topology_cache"] = (
+                    _bus_cache_path(cache_base, spec["device"]) if cache_base is not None else None
+                )
+            specs.append(spec)
+
+        assigned = [aid for spec in specs for aid in spec["actuator_ids"]]
+        if len(assigned) != len(set(assigned)):
+            raise ValueError("an actuator is assigned to more than one bus")
+        caches = [spec["topology_cache"] for spec in specs if spec["topology_cache"] is not None]
+        if len(caches) != len(set(caches)):
+            raise ValueError("buses share a topology cache file")
+
+        # discovery and initial configuration take about a second per bus;
+        # the buses are independent, so do them side by side
+        self.controllers: List[Optional[SCSMotorController]] = [None] * len(specs)
+        errors = []
+
+        def build(i, spec):
+            try:
+                self.controllers[i] = SCSMotorController(rate=rate, **spec, **kwargs)
+            except Exception as e:
+                errors.append((spec["device"], e))
+
+        threads = [
+            threading.Thread(target=build, args=(i, spec), daemon=True)
+            for i, spec in enumerate(specs)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            for controller in self.controllers:
+                if controller is not None:
+                    controller.port_handler.closePort()
+            for device, error in errors:
+                self.log.error(f"could not start bus {device}: {error}")
+            raise errors[0][1]
+
+        self._owner: Dict[int, SCSMotorController] = {}
+        for controller in self.controllers:
+            for actuator_id in controller.actuator_ids:
+                self._owner[actuator_id] = controller
+
+    @property
+    def actuator_ids(self):
+        return set(self._owner)
+
+    def controller_for(self, actuator_id: int) -> Optional[SCSMotorController]:
+        return self._owner.get(actuator_id)
+
+    def _split(self, per_actuator: Dict[int, dict]) -> Dict[SCSMotorController, dict]:
+        shards: Dict[SCSMotorController, dict] = {}
+        for actuator_id, value in per_actuator.items():
+            controller = self._owner.get(actuator_id)
+            if controller is None:
+                self.log.error(f"actuator {actuator_id} is not on any bus")
+                continue
+            shards.setdefault(controller, {})[actuator_id] = value
+        return shards
+
+    # -- lifecycle ------------------------------------------------------------
+
+    def start(self):
+        """Start every bus loop on one shared tick grid"""
+        epoch_ns = time.monotonic_ns()
+        for controller in self.controllers:
+            controller.tick_epoch_ns = epoch_ns
+            controller.start()
+
+    def stop(self):
+        for controller in self.controllers:
+            controller.running = False
+        for controller in self.controllers:
+            controller.stop()
+
+    # -- commands -------------------------------------------------------------
+
+    def set_targets(self, target_dict: Dict[int, Dict[str, float]]):
+        """Like SCSMotorController.set_targets; each bus gets its share"""
+        for controller, targets in self._split(target_dict).items():
+            controller.set_targets(targets)
+
+    def configure_actuators(self, configs: Dict[int, dict]) -> Dict[int, bool]:
+        results = {actuator_id: False for actuator_id in configs}
+        for controller, shard in self._split(configs).items():
+            results.update(controller.configure_actuators(shard))
+        return results
+
+    def configure_actuator(self, actuator_id: int, config: dict) -> bool:
+        return self.configure_actuators({actuator_id: config}).get(actuator_id, False)
+
+    # -- state ----------------------------------------------------------------
+
+    def get_position(self, actuator_id: int) -> Optional[float]:
+        controller = self._owner.get(actuator_id)
+        return controller.get_position(actuator_id) if controller else None
+
+    def get_velocity(self, actuator_id: int) -> Optional[float]:
+        controller = self._owner.get(actuator_id)
+        return controller.get_velocity(actuator_id) if controller else None
+
+    def get_state(self, actuator_id: int) -> Optional[dict]:
+        controller = self._owner.get(actuator_id)
+        return controller.get_state(actuator_id) if controller else None
+
+    def get_telemetry(self, actuator_id: int) -> Optional[dict]:
+        controller = self._owner.get(actuator_id)
+        return controller.get_telemetry(actuator_id) if controller else None
+
+    def get_torque_enabled(self, actuator_id: int) -> bool:
+        controller = self._owner.get(actuator_id)
+        return controller.get_torque_enabled(actuator_id) if controller else False
+
+    def get_states(self) -> Dict[int, Optional[dict]]:
+        """Every actuator of every bus; buses tick on the same grid, so the
+        samples come from the same control instant"""
+        states = {}
+        for controller in self.controllers:
+            states.update(controller.get_states())
+        return states
+
+    def get_state_snapshot(self) -> JointStateSnapshot:
+        """One snapshot over all buses, joints ordered by bus then slot.
+
+        generation is the number of ticks every bus has completed.
+        """
+        snaps = [controller.get_state_snapshot() for controller in self.controllers]
+        ids: List[int] = []
+        for snap in snaps:
+            ids.extend(snap.ids)
+        merged = {}
+        for field in JointStateSnapshot._fields[2:]:
+            parts = [getattr(snap, field) for snap in snaps]
+            out = array(parts[0].typecode)
+            for part in parts:
+                out.extend(part)
+            merged[field] = out
+        return JointStateSnapshot(
+            generation=min(snap.generation for snap in snaps),
+            ids=ids,
+            **merged,
+        )
+
+    def get_timing_stats(self) -> Dict[str, Dict[str, Optional[dict]]]:
+        """Timing statistics per device"""
+        return {
+            controller.port_handler.getPortName(): controller.get_timing_stats()
+            for controller in self.controllers
+        }
+
+    def get_health(self) -> Dict[int, dict]:
+        """Health state of the servos of every bus"""
+        health = {}
+        for controller in self.controllers:
+            health.update(controller.get_health())
+        return health
+
+    def get_link_stats(self) -> Dict[int, dict]:
+        """Per-servo link statistics of every bus"""
+        stats = {}
+        for controller in self.controllers:
+            stats.update(controller.get_link_stats())
+        return stats
+
+    def bus_budget_us(self) -> float:
+        """Bus time of the busiest bus; the buses run in parallel"""
+        return max(controller.bus_budget_us() for controller in self.controllers)
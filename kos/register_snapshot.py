@@ -0,0 +1,108 @@
+"""
+Whole-table register snapshots for diagnostics.
+
+Instead of one READ per register, the EEPROM (0–39) and RAM (40–86) tables
+are fetched as two contiguous blocks, sync-read across as many servos as
+fit in one packet timeout, and every register of a compiled register table
+(see kos/feetech/register_codec.py) is decoded from the block in one pass.
+"""
+
+from contextlib import nullcontext
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from .feetech import COMM_SUCCESS, GroupSyncRead
+from .feetech import bus_timing
+from .feetech.port_handler import LATENCY_TIMER_US, MAX_BUSY_US
+from .feetech.register_codec import RegisterCodec
+
+EEPROM_BLOCK = (0, 40)  # (start address, length)
+RAM_BLOCK = (40, 47)
+SNAPSHOT_BLOCKS = (EEPROM_BLOCK, RAM_BLOCK)
+
+
+def servos_per_sync_read(baudrate: int, length: int) -> int:
+    """How many status packets of `length` data bytes fit in one packet timeout"""
+    budget_us = MAX_BUSY_US - LATENCY_TIMER_US
+    per_servo_us = bus_timing.status_bytes(length) * bus_timing.byte_time_us(baudrate)
+    return max(1, int(budget_us // per_servo_us))
+
+
+def read_blocks(
+    packet_handler,
+    actuator_ids: Iterable[int],
+    blocks: Tuple[Tuple[int, int], ...] = SNAPSHOT_BLOCKS,
+    transaction: Optional[Callable] = None,
+) -> Dict[int, Dict[int, int]]:
+    """{id: {addr: byte}} for every address of every block.
+
+    Each block is sync-read across the servos; a servo that does not answer
+    the sync-read gets one plain READ of the block instead.  Servos that
+    answer neither are missing from the result.
+
+    transaction(est_us) returns a context manager held around each bus
+    transaction (e.g. BusArbiter.transaction), so a snapshot can be spread
+    over the idle time of several control ticks.
+    """
+    if transaction is None:
+        transaction = lambda est_us: nullcontext()
+    ids = sorted(actuator_ids)
+    memory: Dict[int, Dict[int, int]] = {}
+    baudrate = packet_handler.portHandler.getBaudRate()
+    for start, length in blocks:
+        per_read = servos_per_sync_read(baudrate, length)
+        for i in range(0, len(ids), per_read):
+            batch = ids[i : i + per_read]
+            group = GroupSyncRead(packet_handler, start, length)
+            for actuator_id in batch:
+                group.addParam(actuator_id)
+            received = set()
+            with transaction(bus_timing.sync_read_us(baudrate, len(batch), length)):
+                result = group.txRxPacket()
+            if result == COMM_SUCCESS:
+                received = set(group.received_ids)
+                for actuator_id in received:
+                    frame = group.data_dict[actuator_id]  # error byte + data
+                    memory.setdefault(actuator_id, {}).update(
+                        zip(range(start, start + length), frame[1:])
+                    )
+            for actuator_id in batch:
+                if actuator_id in received:
+                    continue
+                with transaction(bus_timing.read_us(baudrate, length)):
+                    data, result, _ = packet_handler.readTxRx(actuator_id, start, length)
+                if result == COMM_SUCCESS and len(data) == length:
+                    memory.setdefault(actuator_id, {}).update(
+                        zip(range(start, start + length), data)
+                    )
+    return memory
+
+
+def decode_registers(codec: RegisterCodec, memory: Dict[int, int]) -> Dict[str, dict]:
+    """{name: {"value", "addr"}} for every register of `codec` present in `memory`"""
+    params = {}
+    for reg in codec.by_name.values():
+        addr = reg.addr
+        try:
+            data = bytes(memory[a] for a in range(addr, addr + reg.size))
+        except KeyError:
+            continue
+        params[reg.name] = {"value": codec.decode(addr, data), "addr": addr}
+    return params
+
+
+def read_snapshot(
+    packet_handler,
+    codec: RegisterCodec,
+    actuator_ids: Iterable[int],
+    blocks: Tuple[Tuple[int, int], ...] = SNAPSHOT_BLOCKS,
+    transaction: Optional[Callable] = None,
+) -> Dict[int, Optional[Dict[str, dict]]]:
+    """{id: decoded registers}; None for servos that could not be read"""
+    ids = list(actuator_ids)
+    memory = read_blocks(packet_handler, ids, blocks, transaction)
+    return {
+        actuator_id: decode_registers(codec, memory[actuator_id])
+        if actuator_id in memory
+        else None
+        for actuator_id in ids
+    }
@@ -0,0 +1,148 @@
+"""
+Health state of each servo on the bus.
+
+    healthy ──miss──▶ suspect ──QUARANTINE_AFTER misses in a row──▶ quarantined
+       ▲                 │                                             │
+       └──── reply ──────┘◀────────── RECOVER_AFTER probe replies ─────┘
+
+A quarantined servo is taken out of the per-tick sync-read, so the other
+servos stop paying its timeout every tick; its last good state stays in
+the state store, flagged invalid.  The controller pings quarantined
+servos in the idle time of a tick, one probe per servo every
+``probe_interval`` (doubling after every failed probe up to
+``MAX_PROBE_INTERVAL_S``), and puts a servo back into the sync-read after
+``RECOVER_AFTER`` probes in a row were answered.
+
+A probe is a READ of the state block that counts as answered only if the
+reply came within the servo's sync-read deadline, so a servo that answers
+but too late for the sync-read stays out.  A servo quarantined again soon
+after it recovered waits longer before its first probe: the delay doubles
+with every quarantine within ``ESCALATION_RESET_S`` of the previous one.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+HEALTHY = "healthy"
+SUSPECT = "suspect"
+QUARANTINED = "quarantined"
+
+QUARANTINE_AFTER = 10  # sync-reads in a row without a reply
+RECOVER_AFTER = 3  # probes in a row with a reply
+PROBE_INTERVAL_S = 0.2
+MAX_PROBE_INTERVAL_S = 2.0
+MAX_QUARANTINE_DELAY_S = 30.0  # first probe after repeated quarantines
+ESCALATION_RESET_S = 60.0  # quarantines further apart start over at PROBE_INTERVAL_S
+
+
+class ServoHealth:
+    def __init__(
+        self,
+        quarantine_after: int = QUARANTINE_AFTER,
+        recover_after: int = RECOVER_AFTER,
+        probe_interval: float = PROBE_INTERVAL_S,
+    ):
+        self.quarantine_after = quarantine_after
+        self.recover_after = recover_after
+        self.probe_interval_ns = int(probe_interval * 1e9)
+        self.state: Dict[int, str] = {}
+        self.misses: Dict[int, int] = {}  # sync-reads in a row without a reply
+        self.quarantined: Dict[int, int] = {}  # id → monotonic_ns of next probe
+        self._backoff_ns: Dict[int, int] = {}
+        self._probe_hits: Dict[int, int] = {}
+        self.quarantine_count: Dict[int, int] = {}
+        self._escalation: Dict[int, int] = {}  # quarantines in a row, see ESCALATION_RESET_S
+        self._released_ns: Dict[int, int] = {}  # when each servo last recovered
+
+    def update(self, ids: Iterable[int], received) -> List[int]:
+        """Account one sync-read of `ids`; returns the ids to quarantine now"""
+        newly = []
+        misses, state = self.misses, self.state
+        for actuator_id in ids:
+            if actuator_id in received:
+                if misses.get(actuator_id):
+                    misses[actuator_id] = 0
+                    state[actuator_id] = HEALTHY
+                continue
+            count = misses.get(actuator_id, 0) + 1
+            misses[actuator_id] = count
+            if count >= self.quarantine_after:
+                newly.append(actuator_id)
+            else:
+                state[actuator_id] = SUSPECT
+        return newly
+
+    def quarantine(self, actuator_id: int, now_ns: int):
+        released = self._released_ns.get(actuator_id)
+        if released is not None and now_ns - released < ESCALATION_RESET_S * 1e9:
+            level = self._escalation.get(actuator_id, 0) + 1
+        else:
+            level = 0
+        self._escalation[actuator_id] = level
+        delay = min(self.probe_interval_ns << level, int(MAX_QUARANTINE_DELAY_S * 1e9))
+
+        self.state[actuator_id] = QUARANTINED
+        self.misses[actuator_id] = 0
+        self._backoff_ns[actuator_id] = delay
+        self._probe_hits[actuator_id] = 0
+        self.quarantined[actuator_id] = now_ns + delay
+        self.quarantine_count[actuator_id] = self.quarantine_count.get(actuator_id, 0) + 1
+
+    def next_probe(self, now_ns: int) -> Optional[int]:
+        """The quarantined servo most overdue for a probe, if any is due"""
+        due = None
+        for actuator_id, probe_ns in self.quarantined.items():
+            if probe_ns <= now_ns and (due is None or probe_ns < self.quarantined[due]):
+                due = actuator_id
+        return due
+
+    def probe_result(self, actuator_id: int, answered: bool, now_ns: int) -> bool:
+        """Account a probe; returns True when the servo has recovered"""
+        if answered:
+            hits = self._probe_hits[actuator_id] + 1
+            self._probe_hits[actuator_id] = hits
+            if hits >= self.recover_after:
+                self.forget(actuator_id)
+                self.state[actuator_id] = HEALTHY
+                self._released_ns[actuator_id] = now_ns
+                return True
+            self._backoff_ns[actuator_id] = self.probe_interval_ns
+            # confirm quickly: next probe on the next idle window
+            self.quarantined[actuator_id] = now_ns
+        else:
+            self._probe_hits[actuator_id] = 0
+            backoff = min(
+                2 * self._backoff_ns[actuator_id],
+                max(int(MAX_PROBE_INTERVAL_S * 1e9), self._backoff_ns[actuator_id]),
+            )
+            self._backoff_ns[actuator_id] = backoff
+            self.quarantined[actuator_id] = now_ns + backoff
+        return False
+
+    def is_quarantined(self, actuator_id: int) -> bool:
+        return actuator_id in self.quarantined
+
+    def forget(self, actuator_id: int):
+        """Drop quarantine bookkeeping for a servo (recovered or removed)"""
+        self.quarantined.pop(actuator_id, None)
+        self._backoff_ns.pop(actuator_id, None)
+        self._probe_hits.pop(actuator_id, None)
+        self.misses.pop(actuator_id, None)
+        self.state.pop(actuator_id, None)
+
+    def reset(self, actuator_id: int):
+        """forget() plus the quarantine history behind the escalation, for a
+        servo whose link changed (new baud rate) or that was removed"""
+        self.forget(actuator_id)
+        self._escalation.pop(actuator_id, None)
+        self._released_ns.pop(actuator_id, None)
+
+    def summary(self) -> Dict[int, dict]:
+        return {
+            actuator_id: {
+                "state": self.state.get(actuator_id, HEALTHY),
+                "misses": self.misses.get(actuator_id, 0),
+                "quarantined": self.quarantine_count.get(actuator_id, 0),
+                "escalation": self._escalation.get(actuator_id, 0),
+            }
+            for actuator_id in sorted(set(self.state) | set(self.quarantine_count))
+        }
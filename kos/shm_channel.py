@@ -0,0 +1,235 @@
+"""
+Shared-memory joint state/command channel for policies in another process.
+
+The controller process creates the segment and, every tick, publishes the
+latest joint state into it and picks up any target batch a client left
+there.  A policy process attaches by name and reads state / sends targets
+without pickling, pipes or the controller's GIL.
+
+Layout (little-endian, every section 8-byte aligned):
+
+    header   magic "KOSC", version, capacity, joint count, state seq, command seq
+    ids      uint32[capacity]   actuator id of each joint index
+    state    float64[capacity] x3 (position deg, velocity deg/s, monotonic time)
+             uint8[capacity]   valid flag
+    command  float64[capacity] x2 (position deg, velocity deg/s)
+             uint8[capacity]   1 where the joint is part of the batch
+
+Each direction has exactly one writer and is guarded by its own sequence
+counter (seqlock): the writer makes it odd, writes, makes it even again;
+the reader copies and retries when the counter was odd or moved.  State is
+written by the controller only, commands by a single client only.
+"""
+
+import struct
+import sys
+import time
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence
+
+MAGIC = b"KOSC"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sIIIQQ")  # magic, version, capacity, count, state seq, cmd seq
+_HEADER_LEN = 64  # room for future fields without moving the data sections
+
+
+def _align8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+class SharedStateChannel:
+    """One shared-memory segment; use create() in the controller, attach() in clients"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+
+        magic, version, capacity, _, _, _ = _HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{shm.name}: not a joint state channel")
+        if version != VERSION:
+            raise ValueError(f"{shm.name}: channel version {version}, expected {VERSION}")
+        self.capacity = capacity
+
+        buf = shm.buf
+        self._count = buf[12:16].cast("I")
+        self._seq = buf[16:32].cast("Q")  # [state seq, command seq]
+
+        off = _HEADER_LEN
+        self._ids = buf[off : off + 4 * capacity].cast("I")
+        off = _align8(off + 4 * capacity)
+        self._state_pos = buf[off : off + 8 * capacity].cast("d")
+        off += 8 * capacity
+        self._state_vel = buf[off : off + 8 * capacity].cast("d")
+        off += 8 * capacity
+        self._state_ts = buf[off : off + 8 * capacity].cast("d")
+        off += 8 * capacity
+        self._state_valid = buf[off : off + capacity]
+        off = _align8(off + capacity)
+        self._cmd_pos = buf[off : off + 8 * capacity].cast("d")
+        off += 8 * capacity
+        self._cmd_vel = buf[off : off + 8 * capacity].cast("d")
+        off += 8 * capacity
+        self._cmd_mask = buf[off : off + capacity]
+
+        self._last_cmd_seq = self._seq[1]
+
+    @staticmethod
+    def size_for(capacity: int) -> int:
+        return (
+            _HEADER_LEN
+            + _align8(4 * capacity)
+            + 3 * 8 * capacity
+            + _align8(capacity)
+            + 2 * 8 * capacity
+            + _align8(capacity)
+        )
+
+    @classmethod
+    def create(cls, name: Optional[str] = None, capacity: int = 20) -> "SharedStateChannel":
+        """Create a new segment (controller side)"""
+        shm = shared_memory.SharedMemory(name=name, create=True, size=cls.size_for(capacity))
+        shm.buf[: shm.size] = bytes(shm.size)
+        _HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, capacity, 0, 0, 0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedStateChannel":
+        """Attach to a segment created by the controller (policy side)"""
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            # keep the segment away from the resource tracker, which would
+            # unlink it when this process exits and pull it out from under
+            # the controller
+            from multiprocessing import resource_tracker
+
+            register = resource_tracker.register
+            resource_tracker.register = lambda name, rtype: None
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+        return cls(shm, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self):
+        for view in (
+            self._count, self._seq, self._ids,
+            self._state_pos, self._state_vel, self._state_ts, self._state_valid,
+            self._cmd_pos, self._cmd_vel, self._cmd_mask,
+        ):
+            view.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- controller side ------------------------------------------------------
+
+    def set_ids(self, ids: Sequence[int]):
+        """Publish the joint index → actuator id table"""
+        if len(ids) > self.capacity:
+            raise ValueError(f"{len(ids)} joints, channel capacity is {self.capacity}")
+        seq = self._seq
+        seq[0] += 1
+        for i, actuator_id in enumerate(ids):
+            self._ids[i] = actuator_id
+            self._state_valid[i] = 0
+        self._count[0] = len(ids)
+        seq[0] += 1
+
+    def publish_state(self, positions, velocities, timestamps, valid):
+        """Write one tick of state, indexed like the ids table.
+
+        positions/velocities/timestamps are array('d'), valid array('B') or bytes.
+        """
+        seq = self._seq
+        seq[0] += 1
+        n = self._count[0]
+        self._state_pos[:n] = positions
+        self._state_vel[:n] = velocities
+        self._state_ts[:n] = timestamps
+        self._state_valid[:n] = valid
+        seq[0] += 1
+
+    def take_targets(self, max_retries: int = 100) -> Optional[Dict[int, Dict[str, float]]]:
+        """The batch a client sent since the last call, in set_targets() form"""
+        seq = self._seq
+        for _ in range(max_retries):
+            cmd_seq = seq[1]
+            if cmd_seq == self._last_cmd_seq:
+                return None
+            if cmd_seq & 1:
+                time.sleep(0)
+                continue
+            n = self._count[0]
+            ids = self._ids[:n].tolist()
+            mask = bytes(self._cmd_mask[:n])
+            pos = self._cmd_pos[:n].tolist()
+            vel = self._cmd_vel[:n].tolist()
+            if seq[1] == cmd_seq:
+                self._last_cmd_seq = cmd_seq
+                return {
+                    ids[i]: {"position": pos[i], "velocity": vel[i]}
+                    for i in range(n)
+                    if mask[i]
+                }
+        return None
+
+    # -- client side ----------------------------------------------------------
+
+    def read_ids(self) -> List[int]:
+        return self._ids[: self._count[0]].tolist()
+
+    @property
+    def generation(self) -> int:
+        """Number of state ticks published so far"""
+        return self._seq[0] >> 1
+
+    def read_state(self, max_retries: int = 100):
+        """Consistent (generation, ids, positions, velocities, timestamps, valid)"""
+        seq = self._seq
+        for _ in range(max_retries):
+            state_seq = seq[0]
+            if state_seq & 1:
+                time.sleep(0)
+                continue
+            n = self._count[0]
+            state = (
+                state_seq >> 1,
+                self._ids[:n].tolist(),
+                self._state_pos[:n].tolist(),
+                self._state_vel[:n].tolist(),
+                self._state_ts[:n].tolist(),
+                bytes(self._state_valid[:n]),
+            )
+            if seq[0] == state_seq:
+                return state
+        raise RuntimeError(f"{self.name}: state writer did not finish in time")
+
+    def send_targets(self, target_dict: Dict[int, Dict[str, float]]):
+        """Queue a batch like SCSMotorController.set_targets(); replaces any batch
+        the controller has not picked up yet"""
+        index = {actuator_id: i for i, actuator_id in enumerate(self.read_ids())}
+        unknown = set(target_dict) - set(index)
+        if unknown:
+            raise KeyError(f"actuators not on this channel: {sorted(unknown)}")
+        seq = self._seq
+        seq[1] += 1
+        self._cmd_mask[: self.capacity] = bytes(self.capacity)
+        for actuator_id, targets in target_dict.items():
+            i = index[actuator_id]
+            self._cmd_pos[i] = targets["position"]
+            self._cmd_vel[i] = targets.get("velocity", 0.0)
+            self._cmd_mask[i] = 1
+        seq[1] += 1
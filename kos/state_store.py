@@ -0,0 +1,212 @@
+"""
+Array-backed joint state shared between the update thread and its readers.
+
+One writer (the controller's update thread) and any number of readers.
+Each actuator gets a fixed slot; positions, velocities and sample times
+live in typed arrays indexed by that slot.  Consistency uses a sequence
+counter (seqlock): the writer makes it odd while it writes and even
+again when it is done, and a reader retries its copy if the counter was
+odd or changed underneath it.  Readers never block the writer.
+"""
+
+import time
+from array import array
+from typing import Dict, List, NamedTuple, Optional
+
+
+class JointStateSnapshot(NamedTuple):
+    """Consistent copy of every joint at one write generation.
+
+    Arrays are indexed like ``ids``; ``valid[i]`` is 0 when joint ``ids[i]``
+    has no usable sample (never read, or its last read failed).  ``stale[i]``
+    is 1 while the joint is quarantined (see kos/servo_health.py): its
+    arrays then hold the last good sample, with ``valid[i]`` 0.
+    """
+
+    generation: int
+    ids: List[int]
+    positions: array
+    velocities: array
+    loads: array
+    voltages: array
+    temperatures: array
+    valid: array
+    timestamps: array  # time.monotonic() of each joint's sample
+    stale: array
+
+
+class JointStateStore:
+    def __init__(self, capacity: int = 20):
+        self.capacity = capacity
+        self._seq = 0
+        self._slot_of: Dict[int, int] = {}
+        # (ids, slots, contiguous) in slot order, rebound as one tuple so a
+        # reader never sees ids and slots from different layouts
+        self._layout = ([], [], True)
+
+        # raw counts, written in place by the update thread
+        self.positions = array("i", bytes(4 * capacity))
+        self.velocities = array("i", bytes(4 * capacity))
+        self.loads = array("i", bytes(4 * capacity))
+        self.voltages = array("B", bytes(capacity))
+        self.temperatures = array("B", bytes(capacity))
+        self.valid = array("B", bytes(capacity))
+        self.stale = array("B", bytes(capacity))  # last good sample kept, not refreshed
+        self.timestamps = array("d", bytes(8 * capacity))
+
+    # -- slots ----------------------------------------------------------------
+
+    def add(self, actuator_id: int) -> Optional[int]:
+        """Give an actuator a slot; returns it, or None when the store is full"""
+        if actuator_id in self._slot_of:
+            return self._slot_of[actuator_id]
+        used = set(self._slot_of.values())
+        free = [slot for slot in range(self.capacity) if slot not in used]
+        if not free:
+            return None
+        slot = free[0]
+        self.begin_write()
+        self.positions[slot] = 0
+        self.velocities[slot] = 0
+        self.loads[slot] = 0
+        self.voltages[slot] = 0
+        self.temperatures[slot] = 0
+        self.valid[slot] = 0
+        self.stale[slot] = 0
+        self.timestamps[slot] = 0.0
+        self._slot_of[actuator_id] = slot
+        self._relayout()
+        self.end_write()
+        return slot
+
+    def remove(self, actuator_id: int):
+        slot = self._slot_of.get(actuator_id)
+        if slot is None:
+            return
+        self.begin_write()
+        self.valid[slot] = 0
+        self.stale[slot] = 0
+        del self._slot_of[actuator_id]
+        self._relayout()
+        self.end_write()
+
+    def _relayout(self):
+        ids = sorted(self._slot_of, key=self._slot_of.__getitem__)
+        slots = [self._slot_of[aid] for aid in ids]
+        self._layout = (ids, slots, slots == list(range(len(slots))))
+
+    def slot(self, actuator_id: int) -> Optional[int]:
+        return self._slot_of.get(actuator_id)
+
+    def __contains__(self, actuator_id: int) -> bool:
+        return actuator_id in self._slot_of
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    # -- writer ---------------------------------------------------------------
+
+    def begin_write(self):
+        """Start a batch of writes; readers retry until end_write()"""
+        self._seq += 1
+
+    def end_write(self):
+        self._seq += 1
+
+    @property
+    def layout(self) -> tuple:
+        """(ids, slots, contiguous); replaced, never mutated, on add/remove"""
+        return self._layout
+
+    @property
+    def generation(self) -> int:
+        """Number of completed write batches"""
+        return self._seq >> 1
+
+    # -- readers --------------------------------------------------------------
+
+    def read(self, actuator_id: int, max_retries: int = 100) -> Optional[tuple]:
+        """(position, velocity, timestamp, stale) counts of one joint, or None
+        if it has no usable sample; a stale joint returns its last good one"""
+        slot = self._slot_of.get(actuator_id)
+        if slot is None:
+            return None
+        for _ in range(max_retries):
+            seq = self._seq
+            if seq & 1:
+                time.sleep(0)
+                continue
+            sample = (
+                self.valid[slot],
+                self.positions[slot],
+                self.velocities[slot],
+                self.timestamps[slot],
+                bool(self.stale[slot]),
+            )
+            if self._seq == seq:
+                return sample[1:] if sample[0] or sample[-1] else None
+        raise RuntimeError("state store: writer did not finish in time")
+
+    def read_extended(self, actuator_id: int, max_retries: int = 100) -> Optional[tuple]:
+        """(position, velocity, load, voltage, temperature, timestamp, stale) or None"""
+        slot = self._slot_of.get(actuator_id)
+        if slot is None:
+            return None
+        for _ in range(max_retries):
+            seq = self._seq
+            if seq & 1:
+                time.sleep(0)
+                continue
+            sample = (
+                self.valid[slot],
+                self.positions[slot],
+                self.velocities[slot],
+                self.loads[slot],
+                self.voltages[slot],
+                self.temperatures[slot],
+                self.timestamps[slot],
+                bool(self.stale[slot]),
+            )
+            if self._seq == seq:
+                return sample[1:] if sample[0] or sample[-1] else None
+        raise RuntimeError("state store: writer did not finish in time")
+
+    def snapshot(self, max_retries: int = 100) -> JointStateSnapshot:
+        """Copy every joint at once, in slot order"""
+        for _ in range(max_retries):
+            seq = self._seq
+            if seq & 1:
+                time.sleep(0)
+                continue
+            ids, idx, contiguous = self._layout
+            n = len(ids)
+            if not contiguous:
+                # slots have holes (an actuator was removed): gather by slot
+                snap = JointStateSnapshot(
+                    seq >> 1,
+                    ids,
+                    array("i", [self.positions[i] for i in idx]),
+                    array("i", [self.velocities[i] for i in idx]),
+                    array("i", [self.loads[i] for i in idx]),
+                    array("B", [self.voltages[i] for i in idx]),
+                    array("B", [self.temperatures[i] for i in idx]),
+                    array("B", [self.valid[i] for i in idx]),
+                    array("d", [self.timestamps[i] for i in idx]),
+                    array("B", [self.stale[i] for i in idx]),
+                )
+            else:
+                snap = JointStateSnapshot(
+                    seq >> 1,
+                    ids,
+                    self.positions[:n],
+                    self.velocities[:n],
+                    self.loads[:n],
+                    self.voltages[:n],
+                    self.temperatures[:n],
+                    self.valid[:n],
+                    self.timestamps[:n],
+                    self.stale[:n],
+                )
+            if self._seq == seq:
+                return snap
+        raise RuntimeError("state store: writer did not finish in time")
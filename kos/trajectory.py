@@ -0,0 +1,158 @@
+"""
+Servo-side trajectory streaming, one SYNC WRITE per segment.
+
+Time-stamped joint waypoints are interpolated on the host onto a grid of
+segments (``segment_s`` long, several control ticks each).  At each segment
+edge a single broadcast SYNC WRITE carries every joint's goal position and
+goal speed (the speed that covers the segment in exactly its duration); all
+servos latch it at the end of the same frame, so every joint starts its
+move on the same edge.  The servos' own position loops run the segment in
+between, so the bus carries one frame per segment instead of a sync-write
+per tick, and nothing on it expects a reply.
+
+REG WRITE / ACTION would stage the goals the same way, but a servo at the
+default status level answers every REG WRITE, so it costs a round trip per
+joint per segment, and even unanswered it is one frame per joint plus the
+ACTION instead of a single frame.
+
+    streamer = controller.stream_trajectory(
+        [(0.0, {31: 0.0, 41: 0.0}), (0.5, {31: 30.0, 41: -30.0}), (1.0, {31: 0.0, 41: 0.0})]
+    )
+    while streamer.active:
+        time.sleep(0.01)
+
+The streamer is driven from the controller's update thread (``tick()``),
+which owns the bus.
+"""
+
+import bisect
+import struct
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .feetech import COMM_SUCCESS, SMS_STS_GOAL_POSITION_L
+from .feetech import bus_timing
+
+# goal position, goal time (unused, 0), goal speed: same layout as the
+# controller's per-tick sync-write
+SEGMENT_STRUCT = struct.Struct("<HHH")
+
+Waypoints = Sequence[Tuple[float, Dict[int, float]]]
+
+
+def interpolate(waypoints: Waypoints, times: Sequence[float]) -> List[Dict[int, float]]:
+    """Piecewise-linear joint positions at `times` (clamped to the ends)"""
+    stamps = [t for t, _ in waypoints]
+    if any(b <= a for a, b in zip(stamps, stamps[1:])):
+        raise ValueError("waypoint times must be strictly increasing")
+    joints = set(waypoints[0][1])
+    for _, positions in waypoints:
+        if set(positions) != joints:
+            raise ValueError("every waypoint must give a position for the same joints")
+
+    samples = []
+    for t in times:
+        i = bisect.bisect_right(stamps, t)
+        if i == 0:
+            samples.append(dict(waypoints[0][1]))
+        elif i == len(stamps):
+            samples.append(dict(waypoints[-1][1]))
+        else:
+            (t0, p0), (t1, p1) = waypoints[i - 1], waypoints[i]
+            a = (t - t0) / (t1 - t0)
+            samples.append({j: p0[j] + a * (p1[j] - p0[j]) for j in joints})
+    return samples
+
+
+class TrajectoryStreamer:
+    def __init__(
+        self,
+        packet_handler,
+        waypoints: Waypoints,
+        to_counts: Callable[[int, float], int],
+        segment_s: float = 0.05,
+    ):
+        """
+        waypoints : [(t seconds from start, {actuator_id: position deg})]
+        to_counts : (actuator_id, degrees) → goal position counts, with any
+                    joint limits applied
+        segment_s : spacing of the interpolated segments, one SYNC WRITE
+                    each
+        """
+        if len(waypoints) < 2:
+            raise ValueError("a trajectory needs at least two waypoints")
+        if segment_s <= 0:
+            raise ValueError("segment_s must be positive")
+        self.ph = packet_handler
+        self.ids = sorted(waypoints[0][1])
+
+        duration = waypoints[-1][0] - waypoints[0][0]
+        count = max(1, int(round(duration / segment_s)))
+        times = [waypoints[0][0] + duration * k / count for k in range(count + 1)]
+        samples = interpolate(waypoints, times)
+
+        # segment k: from sample k to sample k+1, latched at offset times[k]
+        self.offsets_ns = [int((t - times[0]) * 1e9) for t in times[:-1]]
+        self.end_offset_ns = int(duration * 1e9)
+        counts = [{j: to_counts(j, s[j]) for j in self.ids} for s in samples]
+        # segment k as SYNC WRITE parameters: (id, goal position, time, speed) per joint
+        self.segments: List[bytes] = []
+        for k in range(count):
+            dt = times[k + 1] - times[k]
+            param = bytearray()
+            for j in self.ids:
+                goal = counts[k + 1][j]
+                # speed 0 means "as fast as possible": crawl instead when standing still
+                speed = max(1, int(round(abs(goal - counts[k][j]) / dt)))
+                param.append(j)
+                param += SEGMENT_STRUCT.pack(goal, 0, speed)
+            self.segments.append(bytes(param))
+        self.final_counts = counts[-1]
+
+        self.start_ns: Optional[int] = None
+        self.next_segment = 0  # next segment to send
+        self.finished = False
+        self.cancelled = False
+        self.errors = 0
+        self.late_ns = 0  # worst SYNC WRITE lateness vs its scheduled edge
+
+    @property
+    def active(self) -> bool:
+        return not (self.finished or self.cancelled)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def _send(self, k: int) -> int:
+        """SYNC WRITE segment k to every joint; returns wire bytes sent (none
+        of them answered)"""
+        param = self.segments[k]
+        result = self.ph.syncWriteTxOnly(
+            SMS_STS_GOAL_POSITION_L, SEGMENT_STRUCT.size, param, len(param)
+        )
+        if result != COMM_SUCCESS:
+            self.errors += 1
+        return bus_timing.sync_write_bytes(len(self.ids), SEGMENT_STRUCT.size)
+
+    def tick(self, now_ns: int, period_ns: int) -> int:
+        """Called once per control tick on the bus-owning thread.
+
+        Sends each segment on the tick nearest its edge.  Returns the wire
+        bytes sent, none of which get a reply.
+        """
+        if not self.active:
+            return 0
+        if self.start_ns is None:
+            self.start_ns = now_ns
+
+        k = self.next_segment
+        if k >= len(self.segments):
+            if now_ns - self.start_ns >= self.end_offset_ns:
+                self.finished = True
+            return 0
+
+        edge_ns = self.start_ns + self.offsets_ns[k]
+        if now_ns + period_ns // 2 < edge_ns:
+            return 0
+        self.late_ns = max(self.late_ns, now_ns - edge_ns)
+        self.next_segment = k + 1
+        return self._send(k)